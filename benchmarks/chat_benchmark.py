@@ -0,0 +1,238 @@
+"""Load and latency benchmark for the chat API
+
+Runs the real FastAPI app against an in-process Mongo stand-in seeded with a
+synthetic FAQ corpus and a fake chat model, and reports latency percentiles and
+throughput for the FAQ-hit, fuzzy-fallback and GPT paths.
+
+    python -m benchmarks.chat_benchmark --corpus-sizes 100 1000 10000 \
+        --concurrency 1 8 32 --requests 200 --output benchmark_results.json
+
+With --mock-openai the GPT path goes through the real OpenAI client and the pooled
+HTTP client to a local mock OpenAI-compatible server instead of the fake model.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import string
+import time
+from contextlib import AsyncExitStack
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+# The app reads its settings on import; point it at the stand-ins before that happens
+os.environ.setdefault("MONGODB_DB", "benchmark")
+os.environ.setdefault("COLLECTION_FAQ", "faq")
+
+import httpx
+
+from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.main import app
+from com.mhire.app.services.helper_bot.faq_index import flatten_faq_document
+from com.mhire.app.services.helper_bot.helper_bot import HelperBot
+from com.mhire.app.services.helper_bot.llm_http import close_llm_http_client, llm_http_stats
+from com.mhire.app.services.helper_bot.response_cache import NullResponseCache
+from com.mhire.app.testing.mock_openai_server import MockOpenAIState, serve_mock_openai
+from com.mhire.app.testing.stand_ins import FakeChatModel, InMemoryMongoClient, synthetic_faq_documents
+
+logger = logging.getLogger("benchmarks.chat_benchmark")
+
+SCENARIOS = ("faq_hit", "fuzzy_fallback", "gpt")
+
+
+def _misspell(word: str, rng: random.Random) -> str:
+    """Swap two inner letters so the word no longer matches an index term"""
+    if len(word) < 4:
+        return word + word[-1]
+    position = rng.randrange(1, len(word) - 2)
+    return word[:position] + word[position + 1] + word[position] + word[position + 2:]
+
+
+def _query_factories(documents: List[Dict[str, Any]], seed: int) -> Dict[str, Callable[[], Dict[str, str]]]:
+    """Build request generators that exercise each response path"""
+    rng = random.Random(seed)
+    records = [record for document in documents for record in flatten_faq_document(document)]
+
+    def faq_hit() -> Dict[str, str]:
+        record = rng.choice(records)
+        return {"message": record["question"], "user_type": record["user_type"]}
+
+    def fuzzy_fallback() -> Dict[str, str]:
+        record = rng.choice(records)
+        words = record["question"].rstrip("?").split()
+        # Keep the leading "How do I" so only the content words are misspelled
+        message = " ".join(words[:3] + [_misspell(word, rng) for word in words[3:]])
+        return {"message": message, "user_type": record["user_type"]}
+
+    def gpt() -> Dict[str, str]:
+        # Unique nonsense so neither the FAQ nor request coalescing can answer it
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9))) for _ in range(4)]
+        return {"message": " ".join(words), "user_type": rng.choice(["customer", "engineer"])}
+
+    return {"faq_hit": faq_hit, "fuzzy_fallback": fuzzy_fallback, "gpt": gpt}
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(percentile / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    make_request: Callable[[], Dict[str, str]],
+    concurrency: int,
+    total_requests: int
+) -> Dict[str, Any]:
+    """Issue total_requests chat calls from `concurrency` parallel clients"""
+    payloads = [make_request() for _ in range(total_requests)]
+    latencies: List[float] = []
+    sources: Dict[str, int] = {}
+    errors = 0
+    position = 0
+
+    async def worker() -> None:
+        nonlocal position, errors
+        while position < len(payloads):
+            payload = payloads[position]
+            position += 1
+            start = time.perf_counter()
+            response = await client.post("/api/v1/chat", json=payload)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code != 200:
+                errors += 1
+                continue
+            source = response.json().get("source", "unknown")
+            sources[source] = sources.get(source, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": total_requests,
+        "errors": errors,
+        "sources": sources,
+        "duration_s": round(elapsed, 4),
+        "rps": round(total_requests / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 3)
+    }
+
+
+async def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Benchmark every corpus size, scenario and concurrency level"""
+    config = Config()
+    results: List[Dict[str, Any]] = []
+    exit_stack = AsyncExitStack()
+    mock_state: Optional[MockOpenAIState] = None
+    if args.mock_openai:
+        mock_state = MockOpenAIState(
+            latency=args.llm_latency,
+            tokens_per_second=args.llm_tokens_per_second,
+            response_tokens=args.llm_response_tokens
+        )
+        config.openai_base_url = await exit_stack.enter_async_context(serve_mock_openai(mock_state))
+        config.openai_api_key = config.openai_api_key or "benchmark"
+        config.openai_model = config.openai_model or "gpt-4o-mini"
+
+    for corpus_size in args.corpus_sizes:
+        documents = synthetic_faq_documents(corpus_size, seed=args.seed)
+        mongo = InMemoryMongoClient(latency=args.mongo_latency)
+        await mongo[config.mongodb_db][config.collection_faq].insert_many(documents)
+
+        llm = None if args.mock_openai else FakeChatModel(
+            latency=args.llm_latency,
+            tokens_per_second=args.llm_tokens_per_second,
+            response_tokens=args.llm_response_tokens
+        )
+        # Caching would turn repeated GPT-path queries into cache hits
+        bot = HelperBot(
+            db_manager=DBManager(client=mongo),
+            response_cache=NullResponseCache(),
+            llm=llm
+        )
+        await bot.startup()
+        app.state.helper_bot = bot
+
+        factories = _query_factories(documents, seed=args.seed)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            for scenario in args.scenarios:
+                for concurrency in args.concurrency:
+                    stats = await _run_scenario(client, factories[scenario], concurrency, args.requests)
+                    result = {"corpus_size": corpus_size, "scenario": scenario, "concurrency": concurrency, **stats}
+                    results.append(result)
+                    print(
+                        f"corpus={corpus_size:>6} scenario={scenario:<15} concurrency={concurrency:>3} "
+                        f"rps={stats['rps']:>9.2f} p50={stats['p50_ms']:>9.3f}ms "
+                        f"p95={stats['p95_ms']:>9.3f}ms p99={stats['p99_ms']:>9.3f}ms "
+                        f"sources={stats['sources']} errors={stats['errors']}"
+                    )
+        await bot.close()
+
+    pool_stats = llm_http_stats()
+    await close_llm_http_client()
+    await exit_stack.aclose()
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "corpus_sizes": args.corpus_sizes,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "scenarios": args.scenarios,
+            "llm_latency_s": args.llm_latency,
+            "llm_tokens_per_second": args.llm_tokens_per_second,
+            "llm_response_tokens": args.llm_response_tokens,
+            "mongo_latency_s": args.mongo_latency,
+            "faq_search_mode": config.faq_search_mode,
+            "mock_openai": args.mock_openai,
+            "seed": args.seed
+        },
+        "results": results,
+        "llm_http_pool": pool_stats,
+        "mock_openai_server": mock_state.stats() if mock_state else None
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the chat API against local stand-ins")
+    parser.add_argument("--corpus-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario and concurrency level")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="Fake LLM time to first token in seconds")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--llm-response-tokens", type=int, default=40)
+    parser.add_argument("--mock-openai", action="store_true",
+                        help="Call a local mock OpenAI server through the real client instead of the fake model")
+    parser.add_argument("--mongo-latency", type=float, default=0.0, help="Simulated Mongo round trip in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="benchmark_results.json", help="Machine-readable results file")
+    parser.add_argument("--log-level", default="WARNING")
+    args = parser.parse_args()
+
+    # Per-request INFO logs would dominate the measurements
+    logging.getLogger().setLevel(args.log_level)
+    logging.getLogger("com.mhire").setLevel(args.log_level)
+
+    report = asyncio.run(run_benchmark(args))
+    with open(args.output, "w", encoding="utf-8") as output:
+        json.dump(report, output, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,11 @@ class ValidationError(BaseError):
     def __init__(self, message: str, error_code: int = 40001, http_status_code: int = 400):
         super().__init__(message, error_code, http_status_code)
 
+class ForbiddenError(BaseError):
+    """Exception raised when a request lacks valid credentials for an admin operation"""
+    def __init__(self, message: str, error_code: int = 40301, http_status_code: int = 403):
+        super().__init__(message, error_code, http_status_code)
+
 class NotFoundError(BaseError):
     """Exception raised when a resource is not found"""
     def __init__(self, message: str, error_code: int = 40401, http_status_code: int = 404):
@@ -31,4 +36,10 @@ class ConfigurationError(BaseError):
 class ExternalServiceError(BaseError):
     """Exception raised for external service errors (e.g., OpenAI API)"""
     def __init__(self, message: str, error_code: int = 50003, http_status_code: int = 503):
-        super().__init__(message, error_code, http_status_code)
\ No newline at end of file
+        super().__init__(message, error_code, http_status_code)
+
+class ServiceOverloadedError(ExternalServiceError):
+    """Exception raised when a request is shed because the service is at capacity"""
+    def __init__(self, message: str, retry_after: int = 5, error_code: int = 50301, http_status_code: int = 503):
+        self.retry_after = retry_after
+        super().__init__(message, error_code, http_status_code)
@@ -0,0 +1,194 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from com.mhire.app.config.config import Config
+
+# Correlation ID of the request being handled, attached to every log record
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+# Records dropped by sampling during the current request, replayed if the request turns out slow
+_sampled_out_var: ContextVar[Optional[List[logging.LogRecord]]] = ContextVar("sampled_out", default=None)
+
+# Cap on sampled-out records kept per request
+_MAX_BUFFERED_RECORDS = 200
+
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def start_request_context(request_id: str) -> None:
+    """Bind a request ID and an empty sampling buffer to the current context"""
+    request_id_var.set(request_id)
+    _sampled_out_var.set([])
+
+
+def flush_sampled_records() -> None:
+    """Emit the records sampling dropped during this request, e.g. because it was slow"""
+    buffered = _sampled_out_var.get()
+    if not buffered:
+        return
+    _sampled_out_var.set([])
+    for record in buffered:
+        record.replayed = True
+        logging.getLogger(record.name).handle(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the request ID and any extra fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage()
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the current request ID and apply the level threshold and per-level sampling
+
+    Records below the threshold are held back like sampled-out ones, so a slow request
+    still gets its detail. Slow-request and replayed records are always written.
+    Runs on the calling thread, where the request context is visible.
+    """
+
+    def __init__(self, sample_rates: Dict[int, float], level: int = logging.NOTSET):
+        super().__init__()
+        self.sample_rates = sample_rates
+        self.level = level
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        if getattr(record, "replayed", False) or getattr(record, "slow_request", False):
+            return True
+
+        if record.levelno >= self.level:
+            rate = self.sample_rates.get(record.levelno, 1.0)
+            if rate >= 1.0 or random.random() < rate:
+                return True
+
+        buffered = _sampled_out_var.get()
+        if buffered is not None and len(buffered) < _MAX_BUFFERED_RECORDS:
+            buffered.append(record)
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queue handler that defers formatting to the listener thread and never blocks the caller"""
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]"):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting, including msg % args, happens on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def _parse_sample_rates(spec: str) -> Dict[int, float]:
+    """Parse 'DEBUG=0.05,INFO=1' into {level: rate}"""
+    rates: Dict[int, float] = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        level = logging.getLevelName(name.strip().upper())
+        if isinstance(level, int):
+            rates[level] = max(0.0, min(float(value or 1.0), 1.0))
+    return rates
+
+
+def _level(name: str) -> int:
+    level = logging.getLevelName(name)
+    return level if isinstance(level, int) else logging.INFO
+
+
+class _LoggingPipeline:
+    """Owns the queue and background writer so they can be recreated after a fork"""
+
+    def __init__(self, config: Config):
+        self.config = config
+        stream_handler = logging.StreamHandler(sys.stdout)
+        if config.log_format == "json":
+            stream_handler.setFormatter(JsonFormatter())
+        else:
+            stream_handler.setFormatter(logging.Formatter(
+                '%(asctime)s - %(levelname)s - %(name)s - [%(request_id)s] - %(message)s'
+            ))
+        self.stream_handler = stream_handler
+        self.queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=config.log_queue_size))
+        self.queue_handler.addFilter(RequestContextFilter(
+            _parse_sample_rates(config.log_sample_rates), level=_level(config.log_level)
+        ))
+        self.listener: Optional[QueueListener] = None
+
+    def start(self) -> None:
+        self.listener = QueueListener(self.queue_handler.queue, self.stream_handler, respect_handler_level=True)
+        self.listener.start()
+
+    def restart_in_child(self) -> None:
+        # The writer thread does not survive fork; give the child its own queue and thread
+        self.queue_handler.queue = queue.Queue(maxsize=self.config.log_queue_size)
+        self.start()
+
+    def stop(self) -> None:
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+
+_pipeline: Optional[_LoggingPipeline] = None
+
+
+def configure_logging() -> None:
+    """Route all logging through a bounded queue to a background JSON writer"""
+    global _pipeline
+    if _pipeline is not None:
+        return
+
+    config = Config()
+    _pipeline = _LoggingPipeline(config)
+    _pipeline.start()
+
+    root = logging.getLogger()
+    root.handlers = [_pipeline.queue_handler]
+    root.setLevel(logging.INFO)
+    # Application loggers record DEBUG too, so slow requests can replay it whatever LOG_LEVEL
+    # says; the queue handler's filter applies LOG_LEVEL. Third-party libraries stay at INFO
+    logging.getLogger("com.mhire").setLevel(min(_level(config.log_level), logging.DEBUG))
+
+    if hasattr(os, "register_at_fork"):
+        os.register_at_fork(after_in_child=_pipeline.restart_in_child)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and stop the background writer"""
+    if _pipeline is not None:
+        _pipeline.stop()
@@ -0,0 +1,193 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess
+)
+
+from com.mhire.app.common.profiling import current_profile
+
+# Sub-millisecond buckets for in-process FAQ search, seconds-scale for LLM calls
+_SEARCH_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+_LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+_TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 768, 1024, 1536, 2048, 3072, 4096)
+
+REQUEST_LATENCY = Histogram(
+    "helper_bot_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "endpoint"]
+)
+FAQ_SEARCH_LATENCY = Histogram(
+    "helper_bot_faq_search_duration_seconds",
+    "FAQ search latency by phase",
+    ["phase"],
+    buckets=_SEARCH_BUCKETS
+)
+LLM_LATENCY = Histogram(
+    "helper_bot_llm_duration_seconds",
+    "LLM call latency",
+    ["mode"],
+    buckets=_LLM_BUCKETS
+)
+RESPONSES = Counter(
+    "helper_bot_responses_total",
+    "Chat responses by source and confidence band",
+    ["user_type", "source", "confidence_band"]
+)
+LLM_TOKENS = Counter(
+    "helper_bot_llm_tokens_total",
+    "LLM token usage",
+    ["kind"]
+)
+RESPONSE_CACHE_REQUESTS = Counter(
+    "helper_bot_response_cache_requests_total",
+    "LLM response cache lookups",
+    ["result"]
+)
+LLM_PROMPT_TOKENS = Histogram(
+    "helper_bot_llm_prompt_tokens_estimated",
+    "Prompt size counted locally before each LLM call",
+    buckets=_TOKEN_BUCKETS
+)
+LLM_CALL_TOKENS = Histogram(
+    "helper_bot_llm_call_tokens",
+    "Tokens per LLM call as reported by the model",
+    ["kind"],
+    buckets=_TOKEN_BUCKETS
+)
+LLM_FAILURES = Counter(
+    "helper_bot_llm_failures_total",
+    "LLM calls skipped or failed, by reason",
+    ["reason"]
+)
+# Gauges are summed over live workers in multi-process mode
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "helper_bot_admission_queue_depth",
+    "Requests waiting for a slot, by stage",
+    ["stage"],
+    multiprocess_mode="livesum"
+)
+ADMISSION_ACTIVE = Gauge(
+    "helper_bot_admission_active",
+    "Requests holding a slot, by stage",
+    ["stage"],
+    multiprocess_mode="livesum"
+)
+ADMISSION_REJECTIONS = Counter(
+    "helper_bot_admission_rejections_total",
+    "Requests rejected because the stage queue was full",
+    ["stage"]
+)
+LLM_HTTP_CONNECTIONS = Gauge(
+    "helper_bot_llm_http_connections",
+    "Pooled connections to the LLM API, by state",
+    ["state"],
+    multiprocess_mode="livesum"
+)
+LLM_HTTP_CONNECTIONS_OPENED = Counter(
+    "helper_bot_llm_http_connections_opened_total",
+    "New connections opened to the LLM API"
+)
+LLM_HTTP_RETRIES = Counter(
+    "helper_bot_llm_http_retries_total",
+    "LLM API requests retried after a transient error, by reason",
+    ["reason"]
+)
+SPECULATIVE_LLM_CALLS = Counter(
+    "helper_bot_speculative_llm_calls_total",
+    "Speculative LLM calls by outcome: used, or wasted because the FAQ answered or its context differed",
+    ["outcome"]
+)
+SPECULATIVE_HEAD_START = Histogram(
+    "helper_bot_speculative_head_start_seconds",
+    "How long a used speculative LLM call had been running when the FAQ search finished",
+    buckets=_SEARCH_BUCKETS[5:] + (2.5, 5.0)
+)
+MISS_PREDICTIONS = Counter(
+    "helper_bot_faq_miss_predictions_total",
+    "FAQ miss predictions against the actual outcome",
+    ["predicted", "actual"]
+)
+COALESCED_REQUESTS = Counter(
+    "helper_bot_coalesced_requests_total",
+    "Chat requests answered by an identical in-flight request"
+)
+PROFILED_REQUESTS = Counter(
+    "helper_bot_profiled_requests_total",
+    "Requests captured by the on-demand profiler",
+    ["trigger"]
+)
+
+# Profile span prefix of each histogram timed with track_latency
+_SPAN_NAMES = {
+    REQUEST_LATENCY: "request",
+    FAQ_SEARCH_LATENCY: "faq_search",
+    LLM_LATENCY: "llm"
+}
+
+
+@contextmanager
+def track_latency(histogram: Histogram, **labels: str) -> Iterator[None]:
+    """Observe the wall-clock duration of a block, also as a span when the request is profiled"""
+    profile = current_profile()
+    start = time.perf_counter()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        duration = time.perf_counter() - start
+        histogram.labels(**labels).observe(duration)
+        if profile is not None:
+            # e.g. FAQ_SEARCH_LATENCY with phase="fuzzy" -> faq_search/fuzzy
+            name = _SPAN_NAMES.get(histogram, "latency")
+            profile.add_span("/".join([name, *labels.values()]), start, duration, ok)
+
+
+def confidence_band(confidence_score: Optional[float]) -> str:
+    """Bucket a response confidence the way HelperBot.get_response picks FAQ thresholds"""
+    if confidence_score is None:
+        return "none"
+    # FAQ confidence is score / 3, so 1.5 and 0.8 raw scores map to 0.5 and ~0.27
+    if confidence_score >= 0.5:
+        return "high"
+    if confidence_score >= 0.8 / 3:
+        return "medium"
+    return "low"
+
+
+def record_response(user_type: str, source: str, confidence_score: Optional[float]) -> None:
+    """Count a chat response by user type, source and confidence band"""
+    RESPONSES.labels(
+        user_type=user_type,
+        source=source,
+        confidence_band=confidence_band(confidence_score)
+    ).inc()
+
+
+def record_token_usage(prompt_tokens: int, completion_tokens: int) -> None:
+    """Count LLM prompt and completion tokens"""
+    if prompt_tokens:
+        LLM_TOKENS.labels(kind="prompt").inc(prompt_tokens)
+        LLM_CALL_TOKENS.labels(kind="prompt").observe(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(kind="completion").inc(completion_tokens)
+        LLM_CALL_TOKENS.labels(kind="completion").observe(completion_tokens)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Render metrics in Prometheus text format, aggregated across gunicorn workers when enabled"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
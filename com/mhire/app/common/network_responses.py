@@ -11,11 +11,13 @@ class NetworkResponse:
         message: str = "Success",
         data: Optional[Dict[str, Any]] = None,
         resource: str = "",
-        duration: float = 0.0
+        duration: float = 0.0,
+        headers: Optional[Dict[str, str]] = None
     ) -> JSONResponse:
         """Creates a standardized success response"""
         return JSONResponse(
             status_code=http_code,
+            headers=headers,
             content={
                 "success": True,
                 "message": message,
@@ -29,11 +31,13 @@ class NetworkResponse:
     def error_response(
         error: BaseError,
         resource: str = "",
-        duration: float = 0.0
+        duration: float = 0.0,
+        headers: Optional[Dict[str, str]] = None
     ) -> JSONResponse:
         """Creates a standardized error response"""
         return JSONResponse(
             status_code=error.http_status_code,
+            headers=headers,
             content={
                 "success": False,
                 "error": {
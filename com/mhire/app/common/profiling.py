@@ -0,0 +1,278 @@
+"""On-demand request profiling
+
+A profiled request records wall-clock spans for each pipeline stage and, optionally, a
+cProfile CPU profile, and is saved to a bounded on-disk ring buffer that the admin API
+serves. Requests are picked by an X-Profile-Token header matching ADMIN_API_TOKEN or by
+PROFILE_SAMPLE_RATE. With PROFILING_ENABLED unset the middleware is not installed, and
+instrumented stages only check a context variable that is never set.
+
+cProfile hooks the whole event loop thread, so a CPU profile also counts other requests
+interleaved with the profiled one; only one runs at a time per worker. It stops when the
+handler returns, while spans cover the streamed body until it is sent.
+"""
+import asyncio
+import cProfile
+import hmac
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, ContextManager, Dict, Iterator, List, Mapping, Optional
+
+from com.mhire.app.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = "X-Profile-Token"
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+# One CPU profile per worker at a time; a second profiled request gets spans only
+_cpu_profiler_lock = threading.Lock()
+
+_PROFILE_ID = re.compile(r"^[0-9A-Za-z-]{1,64}$")
+
+
+class RequestProfile:
+    """Stage spans and an optional CPU profile for one request"""
+
+    def __init__(self, method: str, path: str, trigger: str, request_id: str):
+        self.started_at = datetime.now(timezone.utc)
+        self.profile_id = f"{self.started_at:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.request_id = request_id
+        self.spans: List[Dict[str, Any]] = []
+        self.cpu_note: Optional[str] = None
+        self._start = time.perf_counter()
+        self._profiler: Optional[cProfile.Profile] = None
+        self._cpu_profile: Optional[cProfile.Profile] = None
+
+    def start_cpu_profile(self) -> None:
+        """Start cProfile on this thread unless another request holds it"""
+        if not _cpu_profiler_lock.acquire(blocking=False):
+            self.cpu_note = "CPU profile skipped: another request was being profiled"
+            return
+        # CPU time rather than wall time, so waiting on I/O does not show up as a hot spot
+        profiler = cProfile.Profile(time.process_time)
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Another tool, e.g. a debugger, owns the profiling hook
+            _cpu_profiler_lock.release()
+            self.cpu_note = f"CPU profile unavailable: {str(e)}"
+            return
+        self._profiler = profiler
+
+    def stop_cpu_profile(self) -> Optional[cProfile.Profile]:
+        """Stop the CPU profile if it runs, freeing it for other requests; returns the finished profile"""
+        profiler, self._profiler = self._profiler, None
+        if profiler is not None:
+            try:
+                profiler.disable()
+            finally:
+                _cpu_profiler_lock.release()
+            self._cpu_profile = profiler
+        return self._cpu_profile
+
+    def add_span(self, name: str, start: float, duration: float, ok: bool = True) -> None:
+        """Record a stage measured with time.perf_counter()"""
+        self.spans.append({
+            "name": name,
+            "start_ms": round((start - self._start) * 1000, 3),
+            "duration_ms": round(duration * 1000, 3),
+            "ok": ok
+        })
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.add_span(name, start, time.perf_counter() - start, ok)
+
+    def as_dict(self, status: int, profiler: Optional[cProfile.Profile], top_functions: int) -> Dict[str, Any]:
+        profile = {
+            "id": self.profile_id,
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "status": status,
+            "trigger": self.trigger,
+            "pid": os.getpid(),
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "spans": sorted(self.spans, key=lambda span: span["start_ms"]),
+            "cpu": _hot_spots(profiler, top_functions) if profiler is not None else None
+        }
+        if self.cpu_note:
+            profile["cpu_note"] = self.cpu_note
+        return profile
+
+
+def _hot_spots(profiler: cProfile.Profile, top_functions: int) -> Dict[str, Any]:
+    """Functions with the most own and cumulative CPU time"""
+    stats = pstats.Stats(profiler).stats
+
+    def describe(key, values) -> Dict[str, Any]:
+        filename, line, function = key
+        _, calls, own, cumulative, _ = values
+        return {
+            "function": function,
+            "location": f"{filename}:{line}",
+            "calls": calls,
+            "self_ms": round(own * 1000, 3),
+            "cumulative_ms": round(cumulative * 1000, 3)
+        }
+
+    items = list(stats.items())
+    return {
+        "scope": "CPU time on the event loop thread while the request ran",
+        "total_ms": round(sum(values[2] for values in stats.values()) * 1000, 3),
+        "by_self_time": [describe(*item) for item in sorted(items, key=lambda item: item[1][2], reverse=True)[:top_functions]],
+        "by_cumulative_time": [describe(*item) for item in sorted(items, key=lambda item: item[1][3], reverse=True)[:top_functions]]
+    }
+
+
+def current_profile() -> Optional[RequestProfile]:
+    """The profile of the request being handled, or None when it is not profiled"""
+    return _active_profile.get()
+
+
+def profile_span(name: str) -> ContextManager[None]:
+    """Time a block as a span of the current request profile, if any"""
+    profile = _active_profile.get()
+    return profile.span(name) if profile is not None else nullcontext()
+
+
+def profile_trigger(headers: Mapping[str, str], path: str) -> Optional[str]:
+    """Why this request should be profiled: 'header', 'sampled' or None"""
+    config = Config()
+    token = headers.get(PROFILE_HEADER.lower())
+    if token is not None:
+        if config.admin_api_token and hmac.compare_digest(token.encode("utf-8"), config.admin_api_token.encode("utf-8")):
+            return "header"
+        logger.warning("Ignoring %s header with an invalid token", PROFILE_HEADER)
+    if config.profile_sample_rate > 0 and path.startswith(config.profile_path_prefix):
+        if random.random() < config.profile_sample_rate:
+            return "sampled"
+    return None
+
+
+def start_profile(method: str, path: str, trigger: str, request_id: str) -> RequestProfile:
+    """Begin profiling the current request context"""
+    profile = RequestProfile(method, path, trigger, request_id)
+    if Config().profile_cpu:
+        profile.start_cpu_profile()
+    _active_profile.set(profile)
+    return profile
+
+
+class ProfileStore:
+    """Bounded on-disk ring buffer of request profiles, shared by the workers on a host
+
+    Each profile is a JSON summary plus, with a CPU profile, a .prof file readable by
+    pstats or snakeviz. The oldest profiles beyond the limit are removed on each save.
+    """
+
+    def __init__(self, directory: str, keep: int):
+        self.directory = directory
+        self.keep = max(keep, 1)
+
+    def _path(self, profile_id: str, suffix: str) -> Optional[str]:
+        if not _PROFILE_ID.match(profile_id):
+            return None
+        return os.path.join(self.directory, f"{profile_id}{suffix}")
+
+    def save(self, profile: Dict[str, Any], profiler: Optional[cProfile.Profile]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        if profiler is not None:
+            pstats_path = self._path(profile["id"], ".prof")
+            profiler.dump_stats(f"{pstats_path}.tmp")
+            os.replace(f"{pstats_path}.tmp", pstats_path)
+        # The JSON file is written last, so a listed profile always has its .prof file
+        json_path = self._path(profile["id"], ".json")
+        with open(f"{json_path}.tmp", "w") as profile_file:
+            json.dump(profile, profile_file)
+        os.replace(f"{json_path}.tmp", json_path)
+        self._prune()
+
+    def _profile_ids(self) -> List[str]:
+        """Stored profile ids, newest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        # Ids start with a UTC timestamp, so name order is age order
+        return sorted((name[:-5] for name in names if name.endswith(".json")), reverse=True)
+
+    def _prune(self) -> None:
+        for profile_id in self._profile_ids()[self.keep:]:
+            for suffix in (".json", ".prof"):
+                try:
+                    os.remove(self._path(profile_id, suffix))
+                except FileNotFoundError:
+                    # Another worker pruned it first
+                    pass
+
+    def list(self, limit: int) -> List[Dict[str, Any]]:
+        """Summaries of the newest profiles"""
+        summaries = []
+        for profile_id in self._profile_ids()[:limit]:
+            profile = self.load(profile_id)
+            if profile is None:
+                continue
+            summaries.append({
+                key: profile.get(key)
+                for key in ("id", "request_id", "method", "path", "status", "trigger", "started_at", "duration_ms")
+            })
+        return summaries
+
+    def load(self, profile_id: str) -> Optional[Dict[str, Any]]:
+        path = self._path(profile_id, ".json")
+        if path is None:
+            return None
+        try:
+            with open(path) as profile_file:
+                return json.load(profile_file)
+        except FileNotFoundError:
+            return None
+
+    def pstats_path(self, profile_id: str) -> Optional[str]:
+        """Path of the raw CPU profile, or None if there is none"""
+        path = self._path(profile_id, ".prof")
+        return path if path is not None and os.path.exists(path) else None
+
+
+def get_profile_store() -> ProfileStore:
+    config = Config()
+    return ProfileStore(config.profile_dir, config.profile_keep)
+
+
+async def finish_profile(profile: RequestProfile, status: int) -> None:
+    """Stop profiling the request and save its profile without blocking the event loop"""
+    profiler = profile.stop_cpu_profile()
+    _active_profile.set(None)
+    try:
+        record = profile.as_dict(status, profiler, Config().profile_top_functions)
+        await asyncio.to_thread(get_profile_store().save, record, profiler)
+        logger.info(
+            "Saved request profile %s for %s %s (%.1f ms)",
+            profile.profile_id, profile.method, profile.path, record["duration_ms"],
+            extra={"profile_id": profile.profile_id}
+        )
+    except Exception as e:
+        # Profiling must never fail the request
+        logger.error(f"Failed to save request profile: {str(e)}")
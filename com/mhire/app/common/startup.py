@@ -0,0 +1,43 @@
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Records how long each worker startup phase took"""
+
+    def __init__(self):
+        self.phases: List[Dict[str, Any]] = []
+        self.ready = False
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a startup phase, recording it even if it fails"""
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.record(name, time.perf_counter() - start, ok)
+
+    def record(self, name: str, duration: float, ok: bool = True) -> None:
+        """Add a phase measured elsewhere"""
+        self.phases.append({"phase": name, "duration_ms": round(duration * 1000, 2), "ok": ok})
+
+    def mark_ready(self) -> None:
+        """Mark the worker ready for traffic and log the report"""
+        self.ready = True
+        logger.info(f"Worker startup report: {self.as_dict()}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "ready": self.ready,
+            "phases": list(self.phases),
+            "total_ms": round(sum(phase["duration_ms"] for phase in self.phases), 2)
+        }
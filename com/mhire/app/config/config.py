@@ -21,11 +21,125 @@ class Config:
         self.mongodb_uri = os.getenv('MONGODB_URI')
         self.mongodb_db = os.getenv('MONGODB_DB')
         self.collection_faq = os.getenv('COLLECTION_FAQ')
+        self.collection_faq_questions = os.getenv('COLLECTION_FAQ_QUESTIONS')
         self.collection_nav = os.getenv('COLLECTION_NAV')
+        self.collection_precomputed_answers = os.getenv('COLLECTION_PRECOMPUTED_ANSWERS')
+        # Version stamps bumped by FAQ and precomputed-answer writers; every worker polls them and reloads
+        self.collection_data_versions = os.getenv('COLLECTION_DATA_VERSIONS', 'data_versions')
+        self.data_version_check_seconds = float(os.getenv('DATA_VERSION_CHECK_SECONDS', '5'))
+        
+        # MongoDB connection pool settings
+        self.mongodb_max_pool_size = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+        self.mongodb_min_pool_size = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+        self.mongodb_max_idle_time_ms = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '300000'))
+        self.mongodb_server_selection_timeout_ms = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+        self.mongodb_connect_timeout_ms = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '10000'))
+        self.mongodb_socket_timeout_ms = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '20000'))
+        
+        # FAQ search settings ('memory' index, shared 'snapshot' index or indexed 'database' queries)
+        self.faq_search_backend = os.getenv('FAQ_SEARCH_BACKEND', 'memory').lower()
+        self.fuzzy_offload_threshold = int(os.getenv('FUZZY_OFFLOAD_THRESHOLD', '2000'))
+        # Lifetime of the database backend's cached fuzzy fallback text, so other workers see FAQ syncs
+        self.fuzzy_cache_seconds = float(os.getenv('FUZZY_CACHE_SECONDS', '300'))
+        self.faq_snapshot_dir = os.getenv('FAQ_SNAPSHOT_DIR', 'data/faq_snapshot')
+        self.faq_snapshot_check_seconds = float(os.getenv('FAQ_SNAPSHOT_CHECK_SECONDS', '5'))
+        self.faq_snapshot_keep = int(os.getenv('FAQ_SNAPSHOT_KEEP', '3'))
+        # Freshness lifetime of the cacheable GET FAQ endpoints
+        self.faq_http_max_age = int(os.getenv('FAQ_HTTP_MAX_AGE', '60'))
+        # Shared secret for the admin API (X-Admin-Token header); admin endpoints are disabled when unset
+        self.admin_api_token = os.getenv('ADMIN_API_TOKEN')
+        self.faq_ingest_batch_size = int(os.getenv('FAQ_INGEST_BATCH_SIZE', '1000'))
+        
+        # Semantic FAQ retrieval settings ('lexical', 'semantic' or 'hybrid')
+        self.faq_search_mode = os.getenv('FAQ_SEARCH_MODE', 'lexical').lower()
+        self.embedding_provider = os.getenv('EMBEDDING_PROVIDER', 'openai').lower()
+        self.openai_embedding_model = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+        self.embedding_dimension = int(os.getenv('EMBEDDING_DIMENSION', '512'))
+        self.vector_index_dir = os.getenv('VECTOR_INDEX_DIR', 'data/vector_index')
+        self.semantic_high_similarity = float(os.getenv('SEMANTIC_HIGH_SIMILARITY', '0.80'))
+        self.semantic_medium_similarity = float(os.getenv('SEMANTIC_MEDIUM_SIMILARITY', '0.65'))
+        self.semantic_low_similarity = float(os.getenv('SEMANTIC_LOW_SIMILARITY', '0.55'))
+        
+        # Minimum token-sort similarity (0-100) for a paraphrase to reuse a precomputed answer
+        self.precomputed_answer_similarity = float(os.getenv('PRECOMPUTED_ANSWER_SIMILARITY', '90'))
+        
+        # LLM response cache settings ('local', 'redis' or 'none')
+        self.response_cache_backend = os.getenv('RESPONSE_CACHE_BACKEND', 'local').lower()
+        self.response_cache_ttl_seconds = float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '3600'))
+        self.response_cache_max_entries = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '1024'))
+        self.response_cache_max_bytes = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(8 * 1024 * 1024)))
+        self.redis_url = os.getenv('REDIS_URL')
+        
+        # Maximum concurrent LLM calls for a single batch request
+        self.batch_llm_concurrency = int(os.getenv('BATCH_LLM_CONCURRENCY', '4'))
+        
+        # Per-worker admission control: FAQ-stage and LLM-stage concurrency and queue bounds
+        self.chat_max_concurrency = int(os.getenv('CHAT_MAX_CONCURRENCY', '64'))
+        self.chat_max_queue = int(os.getenv('CHAT_MAX_QUEUE', '256'))
+        self.llm_max_concurrency = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))
+        self.llm_max_queue = int(os.getenv('LLM_MAX_QUEUE', '64'))
+        self.admission_retry_after_seconds = int(os.getenv('ADMISSION_RETRY_AFTER_SECONDS', '5'))
+        
+        # Per-request latency budget and LLM circuit breaker settings
+        self.request_budget_seconds = float(os.getenv('REQUEST_BUDGET_SECONDS', '20'))
+        self.llm_min_budget_seconds = float(os.getenv('LLM_MIN_BUDGET_SECONDS', '1.0'))
+        self.llm_slow_call_seconds = float(os.getenv('LLM_SLOW_CALL_SECONDS', '10'))
+        self.llm_breaker_failure_threshold = int(os.getenv('LLM_BREAKER_FAILURE_THRESHOLD', '5'))
+        self.llm_breaker_recovery_seconds = float(os.getenv('LLM_BREAKER_RECOVERY_SECONDS', '30'))
+        self.degraded_response_message = os.getenv(
+            'DEGRADED_RESPONSE_MESSAGE',
+            "Sorry, I can't answer that right now. Please try again shortly or contact FixConnect support."
+        )
+        
+        # Speculative LLM calls started alongside the FAQ search when a miss is predicted
+        self.speculative_llm = os.getenv('SPECULATIVE_LLM', 'false').lower() == 'true'
+        self.speculative_llm_threshold = float(os.getenv('SPECULATIVE_LLM_THRESHOLD', '0.7'))
+        
+        # Prompt token budget and per-request output token limits
+        self.llm_input_token_budget = int(os.getenv('LLM_INPUT_TOKEN_BUDGET', '1500'))
+        self.faq_answer_max_tokens = int(os.getenv('FAQ_ANSWER_MAX_TOKENS', '200'))
+        self.llm_min_output_tokens = int(os.getenv('LLM_MIN_OUTPUT_TOKENS', '96'))
+        self.llm_max_output_tokens = int(os.getenv('LLM_MAX_OUTPUT_TOKENS', '300'))
         
         # OpenAI settings
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.openai_model = os.getenv('OPENAI_API_MODEL')
+        # Alternative OpenAI-compatible endpoint, e.g. a local mock server
+        self.openai_base_url = os.getenv('OPENAI_BASE_URL') or None
+        
+        # Pooled HTTP client shared by all OpenAI calls in a worker
+        self.llm_http_max_connections = int(os.getenv('LLM_HTTP_MAX_CONNECTIONS', '32'))
+        self.llm_http_max_keepalive = int(os.getenv('LLM_HTTP_MAX_KEEPALIVE', '16'))
+        self.llm_http_keepalive_expiry = float(os.getenv('LLM_HTTP_KEEPALIVE_EXPIRY', '60'))
+        self.llm_http2 = os.getenv('LLM_HTTP2', 'false').lower() == 'true'
+        self.llm_http_connect_timeout = float(os.getenv('LLM_HTTP_CONNECT_TIMEOUT', '5'))
+        self.llm_http_read_timeout = float(os.getenv('LLM_HTTP_READ_TIMEOUT', '30'))
+        self.llm_http_pool_timeout = float(os.getenv('LLM_HTTP_POOL_TIMEOUT', '5'))
+        self.llm_http_max_retries = int(os.getenv('LLM_HTTP_MAX_RETRIES', '2'))
+        self.llm_http_retry_backoff_seconds = float(os.getenv('LLM_HTTP_RETRY_BACKOFF_SECONDS', '0.25'))
+        self.llm_http_retry_max_backoff_seconds = float(os.getenv('LLM_HTTP_RETRY_MAX_BACKOFF_SECONDS', '4'))
+        
+        # Startup settings
+        self.llm_lazy_load = os.getenv('LLM_LAZY_LOAD', 'true').lower() == 'true'
+        self.mongodb_warmup_connections = int(os.getenv('MONGODB_WARMUP_CONNECTIONS', '4'))
+        
+        # Logging settings
+        self.log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+        self.log_format = os.getenv('LOG_FORMAT', 'json').lower()
+        # Records below LOG_LEVEL and sampled-out records are buffered per request and written
+        # only if the request turns out slow; with the defaults that is the DEBUG detail
+        self.log_sample_rates = os.getenv('LOG_SAMPLE_RATES', 'DEBUG=0')
+        self.log_queue_size = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+        self.log_slow_request_ms = float(os.getenv('LOG_SLOW_REQUEST_MS', '2000'))
+        
+        # On-demand request profiling: X-Profile-Token header (the ADMIN_API_TOKEN) or a sampling rate
+        self.profiling_enabled = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+        self.profile_sample_rate = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))
+        self.profile_path_prefix = os.getenv('PROFILE_PATH_PREFIX', '/api/v1/chat')
+        self.profile_cpu = os.getenv('PROFILE_CPU', 'true').lower() == 'true'
+        self.profile_top_functions = int(os.getenv('PROFILE_TOP_FUNCTIONS', '25'))
+        self.profile_dir = os.getenv('PROFILE_DIR', 'data/profiles')
+        self.profile_keep = int(os.getenv('PROFILE_KEEP', '100'))
         
         # Application settings
         self.app_name = "FixConnect FAQ Database"
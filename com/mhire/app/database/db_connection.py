@@ -1,4 +1,6 @@
+import asyncio
 import logging
+from typing import Optional
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
 from com.mhire.app.config.config import Config
 
@@ -7,16 +9,22 @@ logger = logging.getLogger(__name__)
 class DBConnection:
     """Database connection manager"""
     
-    def __init__(self):
+    def __init__(self, client: Optional[AsyncIOMotorClient] = None):
         self.config = Config()
         self.client: AsyncIOMotorClient = None
         self.db: AsyncIOMotorDatabase = None
         
         try:
-            # Initialize MongoDB client
-            self.client = AsyncIOMotorClient(
+            # Initialize MongoDB client with a single pool shared by the whole worker,
+            # unless a client (e.g. a local stand-in) is supplied
+            self.client = client or AsyncIOMotorClient(
                 self.config.mongodb_uri,
-                serverSelectionTimeoutMS=5000  # 5 second timeout
+                maxPoolSize=self.config.mongodb_max_pool_size,
+                minPoolSize=self.config.mongodb_min_pool_size,
+                maxIdleTimeMS=self.config.mongodb_max_idle_time_ms,
+                serverSelectionTimeoutMS=self.config.mongodb_server_selection_timeout_ms,
+                connectTimeoutMS=self.config.mongodb_connect_timeout_ms,
+                socketTimeoutMS=self.config.mongodb_socket_timeout_ms
             )
             self.db = self.client[self.config.mongodb_db]
             logger.info("MongoDB client initialized successfully")
@@ -36,11 +44,22 @@ class DBConnection:
             logger.error(f"MongoDB ping failed: {str(e)}")
             raise
     
+    async def warm_up(self, connections: int) -> None:
+        """Open pooled connections ahead of traffic with concurrent pings"""
+        try:
+            await asyncio.gather(*(self.client.admin.command('ping') for _ in range(max(connections, 1))))
+            logger.info(f"MongoDB connection pool warmed with {max(connections, 1)} connections")
+            
+        except Exception as e:
+            logger.error(f"MongoDB warm-up failed: {str(e)}")
+            raise
+    
     def close(self) -> None:
         """Close the MongoDB connection"""
         try:
             if self.client:
                 self.client.close()
+                self.client = None
                 logger.info("MongoDB connection closed successfully")
                 
         except Exception as e:
@@ -1,134 +1,460 @@
+import asyncio
 import logging
-from typing import Optional, List, Dict, Any
-from motor.motor_asyncio import AsyncIOMotorCollection
-from pymongo import TEXT
-from fuzzywuzzy import fuzz
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
 
+from com.mhire.app.common.metrics import FAQ_SEARCH_LATENCY, track_latency
 from com.mhire.app.database.db_connection import DBConnection
+from com.mhire.app.services.helper_bot.embeddings import EmbeddingProvider, get_embedding_provider
+from com.mhire.app.services.helper_bot.faq_index import (
+    ANSWER_MATCH_SCORE,
+    EXACT_MATCH_SCORE,
+    LEXICAL_SCORE_CEILING,
+    PHRASE_MATCH_SCORE,
+    FAQIndex,
+    FuzzyCorpus,
+    index_from_documents,
+    normalize_text,
+    tokenize
+)
+from com.mhire.app.services.helper_bot.faq_snapshot import (
+    FAQSnapshot,
+    current_version,
+    open_current,
+    publish_lock,
+    publish_snapshot
+)
 from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.services.helper_bot.vector_index import VectorIndex, similarity_to_score
 
 logger = logging.getLogger(__name__)
 
+_QUESTION_PROJECTION = {
+    "_id": 0,
+    "question_text": 1,
+    "answer_text": 1,
+    "category_name": 1,
+    "user_type": 1
+}
+
+# Must match the text index weights created by faq_migration
+_QUESTION_TEXT_WEIGHT = 3
+
+# Datasets with a shared version stamp in the data versions collection
+FAQ_DATA = "faq"
+PRECOMPUTED_ANSWERS_DATA = "precomputed_answers"
+
+
+def _question_record(question: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert a flattened FAQ question document into the search result shape"""
+    return {
+        "question": question.get("question_text"),
+        "answer": question.get("answer_text"),
+        "category": question.get("category_name"),
+        "user_type": question.get("user_type")
+    }
+
+def document_updated_at(document: Dict[str, Any]) -> Optional[datetime]:
+    """When an FAQ document last changed: its updated_at or ingested_at, else its ObjectId's creation time"""
+    updated_at = document.get("updated_at") or document.get("ingested_at")
+    if updated_at is None and isinstance(document.get("_id"), ObjectId):
+        updated_at = document["_id"].generation_time
+    if isinstance(updated_at, datetime) and updated_at.tzinfo is None:
+        # Motor returns naive UTC datetimes unless the client is timezone-aware
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at if isinstance(updated_at, datetime) else None
+
+
+def _latest(timestamps: Iterable[Optional[datetime]]) -> Optional[datetime]:
+    return max((timestamp for timestamp in timestamps if timestamp is not None), default=None)
+
+
 class DBManager(DBConnection):
     """Database manager for FAQ operations"""
     
-    def __init__(self):
-        super().__init__()
+    def __init__(self, client: Optional[AsyncIOMotorClient] = None):
+        super().__init__(client)
+        # FAQ search index, built at startup and swapped on reload
+        self._faq_index: Optional[FAQIndex] = None
+        self._faq_index_lock = asyncio.Lock()
+        # Last time the shared snapshot's CURRENT pointer was checked for a new version
+        self._snapshot_checked_at = 0.0
+        # Database backend: lowercased question text per user type for the fuzzy fallback,
+        # with the time each was loaded
+        self._fuzzy_corpora: Dict[str, Tuple[float, FuzzyCorpus]] = {}
+        # Shared data version stamps, read at most every DATA_VERSION_CHECK_SECONDS
+        self._data_versions: Dict[str, Optional[str]] = {}
+        self._data_versions_checked_at = float("-inf")
+        # Memory backend: FAQ data version the index was built from, and a running background reload
+        self._faq_data_version: Optional[str] = None
+        self._faq_reload: Optional[asyncio.Task] = None
+        # Embedding index used by the semantic and hybrid search modes
+        self._vector_index: Optional[VectorIndex] = None
+        self._embedding_provider: Optional[EmbeddingProvider] = None
         try:
             self.faq_collection: AsyncIOMotorCollection = self.db[self.config.collection_faq]
+            # Flattened per-question collection maintained by faq_migration
+            self.faq_questions_collection: Optional[AsyncIOMotorCollection] = (
+                self.db[self.config.collection_faq_questions]
+                if self.config.collection_faq_questions else None
+            )
+            # Answers generated offline by answer_precompute for frequent LLM-fallback questions
+            self.precomputed_answers_collection: Optional[AsyncIOMotorCollection] = (
+                self.db[self.config.collection_precomputed_answers]
+                if self.config.collection_precomputed_answers else None
+            )
+            # Version stamps that tell every worker when FAQ data or precomputed answers changed
+            self.data_versions_collection: Optional[AsyncIOMotorCollection] = (
+                self.db[self.config.collection_data_versions]
+                if self.config.collection_data_versions else None
+            )
         except Exception as e:
             logger.error(f"Failed to initialize FAQ collection: {str(e)}")
             raise
     
-    async def search_faq(self, query: str, user_type: UserType) -> List[Dict[Any, Any]]:
-        """Search FAQ with improved matching using MongoDB aggregation pipeline"""
+    async def _build_faq_index(self) -> FAQIndex:
+        """Read all FAQ entries from MongoDB and build a search index
+
+        The index's built_at is when the data last changed, so every worker and restart
+        serves the same Last-Modified: the newest document timestamp or FAQ data version
+        bump, which also covers deletions.
+        """
+        version_updated_at = await self.data_version_updated_at(FAQ_DATA)
+        if self.faq_questions_collection is not None:
+            questions = await self.faq_questions_collection.find(
+                {}, {**_QUESTION_PROJECTION, "updated_at": 1}
+            ).to_list(length=None)
+            built_at = _latest([version_updated_at, *(document_updated_at(question) for question in questions)])
+            return FAQIndex.build((_question_record(question) for question in questions), built_at=built_at)
+        documents = await self.faq_collection.find(
+            {}, {"categories": 1, "ingested_at": 1, "updated_at": 1}
+        ).to_list(length=None)
+        built_at = _latest([version_updated_at, *(document_updated_at(document) for document in documents)])
+        return index_from_documents(documents, built_at=built_at)
+    
+    def _publish_faq_snapshot(self, index: FAQIndex) -> FAQSnapshot:
+        """Publish an index as the current shared snapshot and memory-map it"""
+        directory = self.config.faq_snapshot_dir
+        with publish_lock(directory):
+            version = publish_snapshot(index, directory, keep=self.config.faq_snapshot_keep)
+        return FAQSnapshot.open(directory, version)
+    
+    async def _activate_faq_index(self, index: FAQIndex) -> None:
+        """Make an index the one searches use"""
+        if self.config.faq_search_mode != "lexical":
+            await self._load_vector_index(index)
+        # Swap the reference so in-flight searches keep using the previous index
+        self._faq_index = index
+    
+    async def load_faq_index(self) -> FAQIndex:
+        """Load the FAQ search index, from the shared snapshot or by rebuilding it from MongoDB"""
         try:
-            # Define the aggregation pipeline
-            pipeline = [
-                # Unwind the nested arrays
-                {"$unwind": "$categories"},
-                {"$unwind": "$categories.questions"},
-                
-                # Match documents for the correct user type
-                {"$match": {"categories.questions.user_type": user_type.value}},
-                
-                # Add text search score with multiple matching strategies
-                {"$addFields": {
-                    "textScore": {
-                        "$cond": [
-                            # Exact match (case insensitive)
-                            {"$eq": [{"$toLower": "$categories.questions.question_text"}, {"$toLower": query}]},
-                            3.0,  # Highest score for exact matches
-                            {"$cond": [
-                                # Contains the entire query as a substring
-                                {"$regexMatch": {
-                                    "input": "$categories.questions.question_text",
-                                    "regex": query,
-                                    "options": "i"
-                                }},
-                                2.0,  # High score for containing the query
-                                # Contains keywords from the query
-                                {"$cond": [
-                                    {"$or": [
-                                        {"$regexMatch": {
-                                            "input": "$categories.questions.question_text",
-                                            "regex": query.split(" ")[0] if len(query.split(" ")) > 0 else query,
-                                            "options": "i"
-                                        }},
-                                        {"$regexMatch": {
-                                            "input": "$categories.questions.answer_text",
-                                            "regex": query,
-                                            "options": "i"
-                                        }}
-                                    ]},
-                                    1.0,  # Medium score for keyword matches
-                                    0.5    # Low score for everything else
-                                ]}
-                            ]}
-                        ]
-                    }
-                }},
+            index: Optional[FAQIndex] = None
+            data_version: Optional[str] = None
+            if self.config.faq_search_backend == "snapshot":
+                self._snapshot_checked_at = time.monotonic()
+                index = await asyncio.to_thread(open_current, self.config.faq_snapshot_dir)
+            else:
+                # Read before building, so a change made during the build triggers another reload
+                data_version = await self.data_version(FAQ_DATA, fresh=True)
+            if index is None:
+                index = await self._build_faq_index()
+                if self.config.faq_search_backend == "snapshot":
+                    # First worker to start publishes; the others find the same fingerprint and reuse it
+                    index = await asyncio.to_thread(self._publish_faq_snapshot, index)
+            await self._activate_faq_index(index)
+            self._faq_data_version = data_version
+            logger.info(f"FAQ index loaded with {len(index)} entries")
+            return index
+            
+        except Exception as e:
+            logger.error(f"Failed to load FAQ index: {str(e)}")
+            raise
+    
+    async def _load_vector_index(self, index: FAQIndex) -> None:
+        """Memory-map the persisted FAQ embeddings, embedding any changed questions"""
+        try:
+            if self._embedding_provider is None:
+                self._embedding_provider = get_embedding_provider(self.config)
+            self._vector_index = await VectorIndex.load_or_build(
+                index,
+                self._embedding_provider,
+                self.config.vector_index_dir
+            )
+            logger.info(f"FAQ vector index ready using {self._embedding_provider.name} embeddings")
+            
+        except Exception as e:
+            # Lexical search keeps working without the vector index
+            logger.error(f"Failed to load FAQ vector index: {str(e)}")
+    
+    async def _semantic_search(self, query: str, user_type: UserType) -> List[Dict[Any, Any]]:
+        """Find FAQ entries by embedding similarity, scored on the legacy bands"""
+        if self._vector_index is None:
+            return []
+        
+        query_vector = await self._embedding_provider.embed_query(query)
+        results = []
+        for hit in self._vector_index.search(query_vector, user_type, limit=3):
+            similarity = hit.pop("similarity")
+            score = similarity_to_score(
+                similarity,
+                high=self.config.semantic_high_similarity,
+                medium=self.config.semantic_medium_similarity,
+                low=self.config.semantic_low_similarity
+            )
+            if score > 0:
+                results.append({**hit, "score": score})
+        return results
+    
+    async def load_precomputed_answers(self) -> List[Dict[str, Any]]:
+        """Load the precomputed answer entries, or none if the collection is not configured"""
+        if self.precomputed_answers_collection is None:
+            return []
+        try:
+            return await self.precomputed_answers_collection.find(
+                {},
+                {"user_type": 1, "signatures": 1, "answer": 1, "representative": 1}
+            ).to_list(length=None)
+            
+        except Exception as e:
+            logger.error(f"Failed to load precomputed answers: {str(e)}")
+            raise
+    
+    async def reload_faq_index(self) -> FAQIndex:
+        """Rebuild the FAQ index on demand, e.g. after FAQ content changes
+        
+        With the snapshot backend this publishes a new version that the other workers pick up.
+        """
+        self.invalidate_fuzzy_cache()
+        async with self._faq_index_lock:
+            if self.config.faq_search_backend != "snapshot":
+                return await self.load_faq_index()
+            try:
+                index = await asyncio.to_thread(self._publish_faq_snapshot, await self._build_faq_index())
+                await self._activate_faq_index(index)
+                logger.info(f"FAQ snapshot {index.version} loaded with {len(index)} entries")
+                return index
                 
-                # Sort by score
-                {"$sort": {"textScore": -1}},
+            except Exception as e:
+                logger.error(f"Failed to publish FAQ snapshot: {str(e)}")
+                raise
+    
+    async def refresh_faq_search(self) -> Optional[FAQIndex]:
+        """Bring this worker's search structures up to date after a bulk FAQ load
+
+        The database backend searches MongoDB directly and only needs its index if one
+        was loaded; embeddings of unchanged questions are reused from the vector cache.
+        Other workers follow through the FAQ data version or the published snapshot.
+        """
+        if self.config.faq_search_backend == "database" and self._faq_index is None:
+            self.invalidate_fuzzy_cache()
+            return None
+        return await self.reload_faq_index()
+
+    async def bump_data_version(self, name: str) -> None:
+        """Record that a dataset changed, so every worker reloads it"""
+        if self.data_versions_collection is None:
+            return
+        try:
+            await self.data_versions_collection.replace_one(
+                {"_id": name},
+                {"_id": name, "version": uuid.uuid4().hex, "updated_at": datetime.now(timezone.utc)},
+                upsert=True
+            )
+            
+        except Exception as e:
+            logger.error(f"Failed to update the {name} data version: {str(e)}")
+            raise
+
+    async def data_version(self, name: str, fresh: bool = False) -> Optional[str]:
+        """Current version stamp of a dataset, or None if it was never bumped
+
+        Stamps are read from MongoDB at most every DATA_VERSION_CHECK_SECONDS unless fresh is set.
+        """
+        if self.data_versions_collection is None:
+            return None
+        now = time.monotonic()
+        if fresh or now - self._data_versions_checked_at >= self.config.data_version_check_seconds:
+            self._data_versions_checked_at = now
+            try:
+                documents = await self.data_versions_collection.find({}, {"version": 1}).to_list(length=None)
+                self._data_versions = {document["_id"]: document.get("version") for document in documents}
                 
-                # Limit results
-                {"$limit": 3},
+            except Exception as e:
+                # Keep the last known stamps; the next check retries
+                logger.error(f"Failed to read data versions: {str(e)}")
+        return self._data_versions.get(name)
+
+    async def data_version_updated_at(self, name: str) -> Optional[datetime]:
+        """When a dataset's version was last bumped, or None if it never was"""
+        if self.data_versions_collection is None:
+            return None
+        try:
+            document = await self.data_versions_collection.find_one({"_id": name}, {"updated_at": 1})
+            
+        except Exception as e:
+            logger.error(f"Failed to read the {name} data version: {str(e)}")
+            raise
+        return document_updated_at({"updated_at": document.get("updated_at")}) if document else None
+
+    async def _refresh_faq_memory(self) -> None:
+        """Rebuild the in-memory index in the background when another process changed the FAQ data"""
+        if self._faq_reload is not None and not self._faq_reload.done():
+            return
+        version = await self.data_version(FAQ_DATA)
+        if version is None or version == self._faq_data_version:
+            return
+        logger.info(f"FAQ data version changed to {version}, rebuilding the FAQ index")
+        self._faq_reload = asyncio.create_task(self._reload_faq_in_background())
+
+    async def _reload_faq_in_background(self) -> None:
+        try:
+            await self.reload_faq_index()
+        except Exception:
+            # Already logged; keep serving the current index and retry after the next check interval
+            await asyncio.sleep(self.config.data_version_check_seconds)
+
+    def invalidate_fuzzy_cache(self) -> None:
+        """Drop the database backend's fuzzy fallback text after the question collection changes"""
+        self._fuzzy_corpora.clear()
+
+    async def _fuzzy_corpus(self, user_type: UserType) -> FuzzyCorpus:
+        """Fuzzy fallback text of one user type, loaded from the question collection on first use"""
+        cached = self._fuzzy_corpora.get(user_type.value)
+        if cached is not None and time.monotonic() - cached[0] < self.config.fuzzy_cache_seconds:
+            return cached[1]
+        loaded_at = time.monotonic()
+        questions = await self.faq_questions_collection.find(
+            {"user_type": user_type.value}, _QUESTION_PROJECTION
+        ).to_list(length=None)
+        corpus = FuzzyCorpus([_question_record(question) for question in questions])
+        self._fuzzy_corpora[user_type.value] = (loaded_at, corpus)
+        return corpus
+
+    async def _refresh_faq_snapshot(self) -> None:
+        """Switch to a newer published snapshot version, checked at most every few seconds"""
+        now = time.monotonic()
+        if now - self._snapshot_checked_at < self.config.faq_snapshot_check_seconds:
+            return
+        self._snapshot_checked_at = now
+        try:
+            version = current_version(self.config.faq_snapshot_dir)
+            if version is None or version == getattr(self._faq_index, "version", None):
+                return
+            async with self._faq_index_lock:
+                if version == getattr(self._faq_index, "version", None):
+                    return
+                index = await asyncio.to_thread(FAQSnapshot.open, self.config.faq_snapshot_dir, version)
+                await self._activate_faq_index(index)
+                logger.info(f"Switched to FAQ snapshot {version} with {len(index)} entries")
                 
-                # Project the needed fields
-                {"$project": {
-                    "question": "$categories.questions.question_text",
-                    "answer": "$categories.questions.answer_text",
-                    "category": "$categories.category_name",
-                    "user_type": "$categories.questions.user_type",
-                    "score": "$textScore"
-                }}
-            ]
+        except Exception as e:
+            # Keep serving the mapped version; the next check retries
+            logger.error(f"Failed to switch FAQ snapshot: {str(e)}")
+    
+    async def get_faq_index(self) -> FAQIndex:
+        """Return the FAQ index, loading it on first use"""
+        if self._faq_index is None:
+            async with self._faq_index_lock:
+                if self._faq_index is None:
+                    await self.load_faq_index()
+        elif self.config.faq_search_backend == "snapshot":
+            await self._refresh_faq_snapshot()
+        elif self.config.faq_search_backend == "memory":
+            await self._refresh_faq_memory()
+        return self._faq_index
+    
+    def term_coverage(self, query: str, user_type: UserType) -> Optional[float]:
+        """Share of the query's terms known to the loaded FAQ index, or None without one"""
+        if self.config.faq_search_backend == "database" or self._faq_index is None:
+            return None
+        return self._faq_index.term_coverage(query, user_type)
+    
+    async def _search_faq_indexed(self, query: str, user_type: UserType) -> List[Dict[Any, Any]]:
+        """Search the flattened question collection through its user_type and text indexes"""
+        collection = self.faq_questions_collection
+        norm_query = normalize_text(query)
+        
+        # Exact question match through the (user_type, question_normalized) index
+        exact = await collection.find_one(
+            {"user_type": user_type.value, "question_normalized": norm_query},
+            _QUESTION_PROJECTION
+        )
+        if exact:
+            return [{**_question_record(exact), "score": EXACT_MATCH_SCORE}]
+        
+        if not norm_query:
+            return []
+        
+        # Text search; the user_type prefix of the text index restricts it to one partition.
+        # The normalized query carries no quotes or dashes, so it cannot form phrase or negation terms.
+        cursor = collection.find(
+            {"user_type": user_type.value, "$text": {"$search": norm_query}},
+            {**_QUESTION_PROJECTION, "question_normalized": 1, "textScore": {"$meta": "textScore"}}
+        ).sort([("textScore", {"$meta": "textScore"})]).limit(3)
+        
+        term_count = max(len(tokenize(query)), 1)
+        results = []
+        for question in await cursor.to_list(length=3):
+            if f" {norm_query} " in f" {question.get('question_normalized', '')} ":
+                score = PHRASE_MATCH_SCORE
+            else:
+                # Approximate term coverage of the question on the lexical scale
+                coverage = question.get("textScore", 0) / (_QUESTION_TEXT_WEIGHT * term_count)
+                score = min(coverage, 1.0) * LEXICAL_SCORE_CEILING
+                if f" {norm_query} " in f" {normalize_text(question.get('answer_text', ''))} ":
+                    score = max(score, ANSWER_MATCH_SCORE)
+            results.append({**_question_record(question), "score": score})
+        
+        results.sort(key=lambda x: x["score"], reverse=True)
+        if results:
+            return results
+        
+        # Fuzzy fallback over this user type's questions only
+        corpus = await self._fuzzy_corpus(user_type)
+        if len(corpus) >= self.config.fuzzy_offload_threshold:
+            return await asyncio.to_thread(corpus.search, query, 3)
+        return corpus.search(query, limit=3)
+    
+    async def search_faq(self, query: str, user_type: UserType) -> List[Dict[Any, Any]]:
+        """Search FAQ using the in-memory BM25 and embedding indexes with a fuzzy fallback"""
+        try:
+            if self.config.faq_search_backend == "database" and self.faq_questions_collection is not None:
+                with track_latency(FAQ_SEARCH_LATENCY, phase="database"):
+                    return await self._search_faq_indexed(query, user_type)
+            
+            index = await self.get_faq_index()
+            mode = self.config.faq_search_mode
+            results = []
+            if mode != "semantic":
+                with track_latency(FAQ_SEARCH_LATENCY, phase="lexical"):
+                    results = index.search(query, user_type, limit=3)
             
-            # Execute aggregation pipeline
-            results = await self.faq_collection.aggregate(pipeline).to_list(length=3)
+            # Embedding similarity catches paraphrases that lexical matching scores low
+            if mode != "lexical" and (not results or results[0]["score"] < 1.5):
+                with track_latency(FAQ_SEARCH_LATENCY, phase="semantic"):
+                    semantic_results = await self._semantic_search(query, user_type)
+                merged = {faq["question"]: faq for faq in results}
+                for faq in semantic_results:
+                    if faq["question"] not in merged or faq["score"] > merged[faq["question"]]["score"]:
+                        merged[faq["question"]] = faq
+                results = sorted(merged.values(), key=lambda x: x["score"], reverse=True)[:3]
             
-            # If no results from text search, try semantic search
+            # If no results from text search, fall back to fuzzy similarity
             if not results:
-                # Get all FAQs for user type
-                all_faqs = await self.faq_collection.aggregate([
-                    {"$unwind": "$categories"},
-                    {"$unwind": "$categories.questions"},
-                    {"$match": {"categories.questions.user_type": user_type.value}},
-                    {"$project": {
-                        "question": "$categories.questions.question_text",
-                        "answer": "$categories.questions.answer_text",
-                        "category": "$categories.category_name",
-                        "user_type": "$categories.questions.user_type"
-                    }}
-                ]).to_list(length=None)
-                
-                # Calculate semantic similarity
-                scored_results = []
-                for faq in all_faqs:
-                    # Calculate similarity scores
-                    question_score = fuzz.ratio(query.lower(), faq["question"].lower())
-                    keyword_score = fuzz.partial_ratio(query.lower(), faq["question"].lower())
-                    answer_score = fuzz.partial_ratio(query.lower(), faq["answer"].lower())
-                    
-                    # Weighted scoring
-                    total_score = (
-                        question_score * 0.6 +  # Higher weight for exact question matches
-                        keyword_score * 0.3 +   # Medium weight for partial question matches
-                        answer_score * 0.1      # Lower weight for answer content matches
-                    ) / 100
-                    
-                    if total_score > 0.5:  # Threshold for semantic matches
-                        scored_results.append({
-                            **faq,
-                            "score": total_score
-                        })
-                
-                # Sort by score and take top results
-                results = sorted(scored_results, key=lambda x: x["score"], reverse=True)[:3]
+                with track_latency(FAQ_SEARCH_LATENCY, phase="fuzzy"):
+                    if index.size(user_type) >= self.config.fuzzy_offload_threshold:
+                        # Large corpora are scored on a worker thread to keep the event loop free
+                        results = await asyncio.to_thread(index.fuzzy_search, query, user_type, 3)
+                    else:
+                        results = index.fuzzy_search(query, user_type, limit=3)
             
             return results
             
         except Exception as e:
             logger.error(f"FAQ search failed: {str(e)}")
-            raise
\ No newline at end of file
+            raise
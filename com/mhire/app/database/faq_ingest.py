@@ -0,0 +1,512 @@
+"""Bulk FAQ ingestion from JSON or NDJSON
+
+Records are parsed incrementally from a byte stream, validated one by one, and
+upserted with unordered bulk writes in batches. Each question becomes its own FAQ
+document in the nested ``categories[].questions[]`` shape, keyed by user type,
+category and question, so reloading a file updates entries in place. In replace
+mode, FAQ documents not present in the file are removed afterwards.
+
+Legacy FAQ documents holding several questions are only migrated on request
+(``--migrate-legacy`` or ``migrate_legacy=true``), after the upload has been read in
+full: their questions are split into per-question documents under the same keys, so
+later loads replace them rather than adding duplicates. Questions the upload already
+wrote keep the uploaded answer, and entries that fail validation stay in the legacy
+document.
+
+Accepted records are flat entries (question, answer, category, user_type, or the
+nested field names) or whole nested FAQ documents, which are flattened.
+
+    python -m com.mhire.app.database.faq_ingest faqs.ndjson --batch-size 1000
+"""
+import argparse
+import asyncio
+import codecs
+import json
+import logging
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError as SchemaValidationError
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from com.mhire.app.common.exceptions import ValidationError
+from com.mhire.app.database.db_manager import FAQ_DATA, DBManager
+from com.mhire.app.database.faq_migration import ensure_faq_question_indexes, question_document
+from com.mhire.app.services.helper_bot.faq_index import flatten_faq_document
+from com.mhire.app.services.helper_bot.helper_bot_schema import FAQRecord
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "ndjson")
+_CHUNK_SIZE = 64 * 1024
+_WHITESPACE = " \t\r\n"
+# ingest_version of per-question documents split out of legacy multi-question documents
+_LEGACY_VERSION = "legacy-migration"
+# Largest single record accepted; a longer undecodable run means the input is malformed
+_MAX_RECORD_CHARS = 8 * 1024 * 1024
+
+
+async def _decoded(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a UTF-8 byte stream without splitting multi-byte characters"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def _ndjson_values(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, Any]]:
+    """One JSON value per line; a malformed line is reported and skipped"""
+    buffer = ""
+    line_number = 0
+    async for text in _decoded(chunks):
+        buffer += text
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield f"line {line_number}", _parse(line)
+        if len(buffer) > _MAX_RECORD_CHARS:
+            raise ValidationError(f"Line {line_number + 1} is longer than {_MAX_RECORD_CHARS} characters")
+    if buffer.strip():
+        yield f"line {line_number + 1}", _parse(buffer)
+
+
+def _parse(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError as e:
+        return e
+
+
+async def _json_values(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, Any]]:
+    """Items of a top-level JSON array, decoded as they arrive, or a single top-level value
+
+    A syntax error ends the stream, since there is no reliable place to resume.
+    """
+    decoder = json.JSONDecoder()
+    stream = _decoded(chunks)
+    buffer = ""
+    position = 0
+    in_array: Optional[bool] = None
+    after_item = False
+    item_number = 0
+    done = False
+    exhausted = False
+
+    while True:
+        # Skip whitespace and the array punctuation between items
+        while position < len(buffer):
+            char = buffer[position]
+            if char in _WHITESPACE:
+                position += 1
+            elif done:
+                raise ValidationError("Unexpected data after the top-level JSON value")
+            elif in_array is None:
+                in_array = char == "["
+                position += in_array
+            elif in_array and after_item:
+                if char not in ",]":
+                    raise ValidationError(f"Expected ',' or ']' after item {item_number}")
+                after_item = False
+                done = char == "]"
+                position += 1
+            elif in_array and char == "]" and item_number == 0:
+                done = True
+                position += 1
+            else:
+                break
+
+        if not done and position < len(buffer):
+            try:
+                value, end = decoder.raw_decode(buffer, position)
+            except ValueError as e:
+                error, end = e, None
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end == len(buffer) and not exhausted and isinstance(value, (int, float)):
+                    error, end = None, None
+            if end is not None:
+                item_number += 1
+                position = end
+                after_item = in_array
+                done = not in_array
+                yield f"item {item_number}", value
+                continue
+            if exhausted:
+                raise ValidationError(f"Malformed JSON after item {item_number}: {str(error)}")
+            if len(buffer) - position > _MAX_RECORD_CHARS:
+                raise ValidationError(f"Item {item_number + 1} is malformed or longer than {_MAX_RECORD_CHARS} characters")
+
+        if exhausted:
+            break
+        try:
+            text = await stream.__anext__()
+        except StopAsyncIteration:
+            exhausted = True
+            continue
+        buffer = buffer[position:] + text
+        position = 0
+
+    if in_array and not done:
+        raise ValidationError(f"Unterminated JSON array after item {item_number}")
+
+
+def iter_json_values(chunks: AsyncIterator[bytes], data_format: str) -> AsyncIterator[Tuple[str, Any]]:
+    """Yield (location, value) pairs from a JSON or NDJSON byte stream"""
+    if data_format not in FORMATS:
+        raise ValidationError(f"Unsupported FAQ data format '{data_format}', expected one of {', '.join(FORMATS)}")
+    return _json_values(chunks) if data_format == "json" else _ndjson_values(chunks)
+
+
+def validate_value(location: str, value: Any) -> Tuple[List[FAQRecord], List[Dict[str, str]]]:
+    """Validate a parsed value: a flat FAQ entry or a nested FAQ document"""
+    if isinstance(value, Exception):
+        return [], [{"record": location, "error": f"Malformed JSON: {str(value)}"}]
+    if not isinstance(value, dict):
+        return [], [{"record": location, "error": "Expected a JSON object"}]
+
+    if "categories" in value:
+        candidates = [
+            (f"{location} question {number}", raw)
+            for number, raw in enumerate(flatten_faq_document(value), start=1)
+        ]
+        if not candidates:
+            return [], [{"record": location, "error": "FAQ document has no categories[].questions[]"}]
+    else:
+        candidates = [(location, value)]
+
+    records: List[FAQRecord] = []
+    errors: List[Dict[str, str]] = []
+    for record_location, raw in candidates:
+        try:
+            records.append(FAQRecord.model_validate(raw))
+        except SchemaValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'record'}: {error['msg']}"
+                for error in e.errors()
+            )
+            errors.append({"record": record_location, "error": message})
+    return records, errors
+
+
+def faq_document(record: FAQRecord, ingest_version: str, ingested_at: datetime) -> Dict[str, Any]:
+    """Nested single-question FAQ document, keyed like the flattened question collection"""
+    question = question_document(record.model_dump(mode="json"), source_id=None, sync_version=ingest_version)
+    return {
+        "_id": question["_id"],
+        "categories": [{
+            "category_name": record.category,
+            "questions": [{
+                "question_text": record.question,
+                "answer_text": record.answer,
+                "user_type": record.user_type.value
+            }]
+        }],
+        "ingest_version": ingest_version,
+        "ingested_at": ingested_at
+    }
+
+
+async def migrate_legacy_documents(db_manager: DBManager, ingested_at: datetime, batch_size: int) -> Dict[str, int]:
+    """Split multi-question FAQ documents not written by ingestion into per-question documents
+
+    A per-question document that already exists, e.g. from the upload just ingested,
+    is left as it is. Split documents are written before the legacy ones are trimmed,
+    so an interrupted migration leaves duplicates with identical answers and the next
+    run completes it.
+    """
+    stats = {"documents": 0, "questions": 0, "kept_existing": 0, "kept_invalid": 0}
+    collection = db_manager.faq_collection
+    split: List[Dict[str, Any]] = []
+    trimmed: List[ReplaceOne] = []
+    emptied: List[Any] = []
+
+    async def flush() -> None:
+        if split:
+            existing = {
+                document["_id"]
+                for document in await collection.find(
+                    {"_id": {"$in": [migrated["_id"] for migrated in split]}}, {"_id": 1}
+                ).to_list(length=None)
+            }
+            stats["kept_existing"] += len(existing)
+            writes = [
+                ReplaceOne({"_id": migrated["_id"]}, migrated, upsert=True)
+                for migrated in split if migrated["_id"] not in existing
+            ]
+            if writes:
+                await collection.bulk_write(writes, ordered=False)
+            split.clear()
+        if trimmed:
+            await collection.bulk_write(trimmed, ordered=False)
+            trimmed.clear()
+        if emptied:
+            await collection.delete_many({"_id": {"$in": list(emptied)}})
+            emptied.clear()
+
+    async for document in collection.find({"ingest_version": {"$exists": False}}):
+        stats["documents"] += 1
+        invalid: Dict[str, List[Dict[str, Any]]] = {}
+        for category in document.get("categories") or []:
+            for question in category.get("questions") or []:
+                records, errors = validate_value("legacy", {**question, "category_name": category.get("category_name")})
+                if errors:
+                    invalid.setdefault(category.get("category_name"), []).append(question)
+                    continue
+                split.append(faq_document(records[0], _LEGACY_VERSION, ingested_at))
+                stats["questions"] += 1
+
+        if invalid:
+            stats["kept_invalid"] += sum(len(questions) for questions in invalid.values())
+            remainder = {
+                **document,
+                "categories": [
+                    {"category_name": name, "questions": questions} for name, questions in invalid.items()
+                ]
+            }
+            trimmed.append(ReplaceOne({"_id": document["_id"]}, remainder))
+        else:
+            emptied.append(document["_id"])
+        if len(split) >= batch_size:
+            await flush()
+    await flush()
+
+    if stats["documents"]:
+        logger.info(
+            "Migrated %d legacy FAQ documents into %d per-question documents "
+            "(%d already present, %d invalid entries kept)",
+            stats["documents"], stats["questions"], stats["kept_existing"], stats["kept_invalid"]
+        )
+    return stats
+
+
+async def ingest_faq_stream(
+    db_manager: DBManager,
+    chunks: AsyncIterator[bytes],
+    data_format: str = "ndjson",
+    batch_size: Optional[int] = None,
+    replace: bool = False,
+    max_errors: int = 100,
+    migrate_legacy: bool = False
+) -> Dict[str, Any]:
+    """Validate and upsert FAQ records from a byte stream and report the outcome
+
+    Replace mode deletes FAQ entries missing from the stream, but only if the whole
+    stream was read; an aborted load leaves earlier entries in place. With
+    migrate_legacy, legacy multi-question documents are split once the whole stream
+    was read (see migrate_legacy_documents); replace mode removes them instead.
+    """
+    start = time.perf_counter()
+    batch_size = max(batch_size or db_manager.config.faq_ingest_batch_size, 1)
+    ingest_version = uuid.uuid4().hex
+    ingested_at = datetime.now(timezone.utc)
+    questions_collection = db_manager.faq_questions_collection
+    if questions_collection is not None:
+        await ensure_faq_question_indexes(questions_collection)
+
+    stats: Dict[str, Any] = {
+        "format": data_format,
+        "batch_size": batch_size,
+        "mode": "replace" if replace else "upsert",
+        "bytes": 0,
+        "records": 0,
+        "valid": 0,
+        "invalid": 0,
+        "batches": 0,
+        "upserted": 0,
+        "modified": 0,
+        "deleted": 0,
+        "completed": False,
+        "aborted": None,
+        "errors": [],
+        "legacy_migration": None
+    }
+
+    def report_errors(errors: List[Dict[str, str]]) -> None:
+        stats["invalid"] += len(errors)
+        room = max_errors - len(stats["errors"])
+        if room > 0:
+            stats["errors"].extend(errors[:room])
+
+    batch: List[Tuple[str, FAQRecord]] = []
+
+    async def flush() -> None:
+        if not batch:
+            return
+        documents = [faq_document(record, ingest_version, ingested_at) for _, record in batch]
+        writes = [db_manager.faq_collection.bulk_write(
+            [ReplaceOne({"_id": document["_id"]}, document, upsert=True) for document in documents],
+            ordered=False
+        )]
+        if questions_collection is not None:
+            writes.append(questions_collection.bulk_write(
+                [
+                    ReplaceOne({"_id": document["_id"]}, question_document(
+                        record.model_dump(mode="json"),
+                        source_id=document["_id"],
+                        sync_version=ingest_version,
+                        updated_at=ingested_at
+                    ), upsert=True)
+                    for document, (_, record) in zip(documents, batch)
+                ],
+                ordered=False
+            ))
+        results = await asyncio.gather(*writes, return_exceptions=True)
+
+        faq_result = results[0]
+        if isinstance(faq_result, BulkWriteError):
+            # Unordered writes apply everything else; report the records that failed
+            details = faq_result.details
+            failed = details.get("writeErrors", [])
+            report_errors([
+                {"record": batch[error["index"]][0], "error": error.get("errmsg", "Write failed")}
+                for error in failed
+            ])
+            stats["valid"] -= len(failed)
+            stats["upserted"] += details.get("nUpserted", 0)
+            stats["modified"] += details.get("nModified", 0)
+        elif isinstance(faq_result, Exception):
+            raise faq_result
+        else:
+            stats["upserted"] += faq_result.upserted_count
+            stats["modified"] += faq_result.modified_count
+        for result in results[1:]:
+            if isinstance(result, Exception):
+                # The question collection is derived data; faq_migration can rebuild it
+                logger.error(f"FAQ question collection write failed: {str(result)}")
+
+        stats["batches"] += 1
+        batch.clear()
+
+    async def counted() -> AsyncIterator[bytes]:
+        async for chunk in chunks:
+            stats["bytes"] += len(chunk)
+            yield chunk
+
+    try:
+        async for location, value in iter_json_values(counted(), data_format):
+            stats["records"] += 1
+            records, errors = validate_value(location, value)
+            report_errors(errors)
+            for record in records:
+                stats["valid"] += 1
+                batch.append((location, record))
+                if len(batch) >= batch_size:
+                    await flush()
+        await flush()
+        stats["completed"] = True
+    except ValidationError as e:
+        await flush()
+        stats["aborted"] = e.message
+        logger.error(f"FAQ ingestion aborted: {e.message}")
+
+    if migrate_legacy and not replace and stats["completed"]:
+        stats["legacy_migration"] = await migrate_legacy_documents(db_manager, ingested_at, batch_size)
+
+    if replace and stats["completed"]:
+        result = await db_manager.faq_collection.delete_many({"ingest_version": {"$ne": ingest_version}})
+        stats["deleted"] = result.deleted_count
+        if questions_collection is not None:
+            await questions_collection.delete_many({"sync_version": {"$ne": ingest_version}})
+
+    if _changed(stats):
+        # Every worker rebuilds its in-memory index when it sees the new version
+        await db_manager.bump_data_version(FAQ_DATA)
+
+    seconds = time.perf_counter() - start
+    stats["seconds"] = round(seconds, 3)
+    stats["records_per_second"] = round(stats["valid"] / seconds, 1) if seconds > 0 else None
+    stats["megabytes_per_second"] = round(stats["bytes"] / seconds / 1e6, 3) if seconds > 0 else None
+    logger.info(
+        "FAQ ingestion finished: %d valid, %d invalid, %d upserted, %d modified, %d deleted in %.2fs",
+        stats["valid"], stats["invalid"], stats["upserted"], stats["modified"], stats["deleted"], seconds
+    )
+    return stats
+
+
+def _changed(stats: Dict[str, Any]) -> bool:
+    """Whether a load wrote, removed or migrated any FAQ document"""
+    migrated = (stats.get("legacy_migration") or {}).get("documents")
+    return bool(stats["upserted"] or stats["modified"] or stats["deleted"] or migrated)
+
+
+async def refresh_after_ingest(db_manager: DBManager, stats: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Rebuild this worker's search structures if the load changed anything"""
+    if not _changed(stats):
+        return None
+    start = time.perf_counter()
+    index = await db_manager.refresh_faq_search()
+    return {
+        "backend": db_manager.config.faq_search_backend,
+        "entries": len(index) if index is not None else None,
+        "version": getattr(index, "version", None) or (index.fingerprint[:32] if index is not None else None),
+        "seconds": round(time.perf_counter() - start, 3)
+    }
+
+
+async def _file_chunks(path: str) -> AsyncIterator[bytes]:
+    with open(path, "rb") as source:
+        while True:
+            chunk = await asyncio.to_thread(source.read, _CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def _main(args: argparse.Namespace) -> Dict[str, Any]:
+    data_format = args.format or ("json" if args.path.endswith(".json") else "ndjson")
+    db_manager = DBManager()
+    try:
+        stats = await ingest_faq_stream(
+            db_manager,
+            _file_chunks(args.path),
+            data_format=data_format,
+            batch_size=args.batch_size,
+            replace=args.replace,
+            max_errors=args.max_errors,
+            migrate_legacy=args.migrate_legacy
+        )
+        # Workers with an in-memory index follow the FAQ data version; a snapshot has to be published from here
+        if db_manager.config.faq_search_backend == "snapshot" and not args.no_reindex:
+            stats["reindex"] = await refresh_after_ingest(db_manager, stats)
+        return stats
+    finally:
+        db_manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Bulk load FAQ entries from a JSON or NDJSON file",
+        epilog="Legacy FAQ documents holding several questions are left untouched unless --migrate-legacy "
+               "is given; they should be migrated once so later loads replace their answers instead of "
+               "duplicating them."
+    )
+    parser.add_argument("path", help="JSON array/object or NDJSON file")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to json for .json files, else ndjson")
+    parser.add_argument("--batch-size", type=int, help="Records per unordered bulk write (FAQ_INGEST_BATCH_SIZE)")
+    parser.add_argument("--replace", action="store_true", help="Remove FAQ entries that are not in the file")
+    parser.add_argument("--max-errors", type=int, default=100, help="Per-record errors to list in the report")
+    parser.add_argument(
+        "--migrate-legacy",
+        action="store_true",
+        help="After a complete load, split legacy multi-question documents into per-question documents"
+    )
+    parser.add_argument("--no-reindex", action="store_true", help="Do not publish a new FAQ snapshot afterwards")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+    )
+    print(json.dumps(asyncio.run(_main(args)), indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import hashlib
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING, ReplaceOne, TEXT
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from com.mhire.app.common.exceptions import ConfigurationError
+from com.mhire.app.database.db_manager import FAQ_DATA, DBManager, document_updated_at
+from com.mhire.app.services.helper_bot.faq_index import flatten_faq_document, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Question text outweighs answer text in MongoDB text scoring
+QUESTION_TEXT_WEIGHT = 3
+ANSWER_TEXT_WEIGHT = 1
+
+
+def question_document(
+    record: Dict[str, Any],
+    source_id: Any,
+    sync_version: str,
+    updated_at: Optional[datetime] = None
+) -> Dict[str, Any]:
+    """Build a flattened per-question document from an FAQ index record"""
+    key = f"{record['user_type']}\0{record.get('category') or ''}\0{record['question']}"
+    return {
+        "_id": hashlib.sha1(key.encode("utf-8")).hexdigest(),
+        "question_text": record["question"],
+        "answer_text": record.get("answer") or "",
+        "category_name": record.get("category"),
+        "user_type": record["user_type"],
+        "question_normalized": normalize_text(record["question"]),
+        "source_id": source_id,
+        "sync_version": sync_version,
+        # When the source FAQ entry last changed, for HTTP Last-Modified
+        "updated_at": updated_at
+    }
+
+
+async def ensure_faq_question_indexes(collection: AsyncIOMotorCollection) -> None:
+    """Create the user_type lookup index and the user_type-prefixed text index"""
+    await collection.create_index(
+        [("user_type", ASCENDING), ("question_normalized", ASCENDING)],
+        name="user_type_question"
+    )
+    await collection.create_index(
+        [("user_type", ASCENDING), ("question_text", TEXT), ("answer_text", TEXT)],
+        name="user_type_text",
+        weights={"question_text": QUESTION_TEXT_WEIGHT, "answer_text": ANSWER_TEXT_WEIGHT},
+        default_language="english"
+    )
+
+
+async def sync_faq_questions(db_manager: DBManager, batch_size: int = 1000) -> Dict[str, int]:
+    """Rebuild the flattened FAQ question collection from the nested FAQ documents"""
+    collection = db_manager.faq_questions_collection
+    if collection is None:
+        raise ConfigurationError("COLLECTION_FAQ_QUESTIONS is not configured")
+
+    await ensure_faq_question_indexes(collection)
+
+    # Every document written in this run is tagged so stale questions can be removed afterwards
+    sync_version = uuid.uuid4().hex
+    stats = {"documents": 0, "questions": 0, "upserted": 0, "modified": 0, "deleted": 0}
+    batch: List[ReplaceOne] = []
+
+    async def flush() -> None:
+        if not batch:
+            return
+        result = await collection.bulk_write(batch, ordered=False)
+        stats["upserted"] += result.upserted_count
+        stats["modified"] += result.modified_count
+        batch.clear()
+
+    async for document in db_manager.faq_collection.find({}, {"categories": 1, "ingested_at": 1, "updated_at": 1}):
+        stats["documents"] += 1
+        updated_at = document_updated_at(document)
+        for record in flatten_faq_document(document):
+            if not record.get("question") or not record.get("user_type"):
+                continue
+            question = question_document(record, document.get("_id"), sync_version, updated_at)
+            batch.append(ReplaceOne({"_id": question["_id"]}, question, upsert=True))
+            stats["questions"] += 1
+            if len(batch) >= batch_size:
+                await flush()
+    await flush()
+
+    result = await collection.delete_many({"sync_version": {"$ne": sync_version}})
+    stats["deleted"] = result.deleted_count
+    db_manager.invalidate_fuzzy_cache()
+    await db_manager.bump_data_version(FAQ_DATA)
+
+    logger.info(f"FAQ question sync finished: {stats}")
+    return stats
+
+
+async def _main(batch_size: int) -> None:
+    db_manager = DBManager()
+    try:
+        await sync_faq_questions(db_manager, batch_size=batch_size)
+    finally:
+        db_manager.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the flattened, indexed FAQ question collection")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Documents per bulk write")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+    )
+    asyncio.run(_main(args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
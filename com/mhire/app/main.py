@@ -1,24 +1,75 @@
+import time
+
+# Measured first so the startup report includes module import time
+_IMPORT_STARTED = time.perf_counter()
+
 import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
+from com.mhire.app.services.helper_bot.helper_bot import HelperBot
 from com.mhire.app.services.helper_bot.helper_bot_router import router as chat_router
+from com.mhire.app.services.helper_bot.faq_router import router as faq_router
+from com.mhire.app.services.helper_bot.admin_router import router as admin_router
+from com.mhire.app.common.exceptions import ExternalServiceError
+from com.mhire.app.common.logging_config import (
+    configure_logging,
+    flush_sampled_records,
+    new_request_id,
+    request_id_var,
+    start_request_context
+)
+from com.mhire.app.common.metrics import PROFILED_REQUESTS, REQUEST_LATENCY, render_metrics
+from com.mhire.app.common.profiling import finish_profile, profile_trigger, start_profile
+from com.mhire.app.common.network_responses import NetworkResponse
+from com.mhire.app.common.startup import StartupReport
 from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.services.helper_bot.llm_http import close_llm_http_client, llm_http_stats
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(name)s - %(message)s',
-    handlers=[logging.StreamHandler()]
-)
+# Configure logging: structured records written by a background thread
+configure_logging()
 
 logger = logging.getLogger(__name__)
 
+# With gunicorn preload_app this is the master's import time, shared by all workers
+_IMPORT_SECONDS = time.perf_counter() - _IMPORT_STARTED
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create one pooled Mongo client and one helper bot per worker and close them on shutdown"""
+    report = StartupReport()
+    report.record("imports", _IMPORT_SECONDS)
+    app.state.startup_report = report
+    
+    with report.phase("mongo_client"):
+        db_manager = DBManager()
+    try:
+        bot = HelperBot(db_manager=db_manager)
+        # Readiness gate: the worker accepts traffic only after the pool and FAQ data are warm
+        await bot.startup(report)
+    except Exception:
+        db_manager.close()
+        raise
+    
+    app.state.db_manager = db_manager
+    app.state.helper_bot = bot
+    report.mark_ready()
+    try:
+        yield
+    finally:
+        await bot.close()
+        db_manager.close()
+        await close_llm_http_client()
+        logger.info("Application resources released")
+
 app = FastAPI(
     title="FixConnect",
     description="A helper bot API for guiding users through the system",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -30,8 +81,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# On-demand profiling; registered innermost so the request ID is set, and only when enabled
+async def profile_requests(request: Request, call_next):
+    trigger = profile_trigger(request.headers, request.url.path)
+    if trigger is None:
+        return await call_next(request)
+    PROFILED_REQUESTS.labels(trigger=trigger).inc()
+    profile = start_profile(request.method, request.url.path, trigger, request_id_var.get())
+    try:
+        try:
+            response = await call_next(request)
+        finally:
+            # cProfile hooks the whole worker thread, and a body that is never sent, e.g. after a
+            # client disconnect, would leave it running; the CPU profile covers the handler only
+            profile.stop_cpu_profile()
+    except BaseException:
+        await finish_profile(profile, 500)
+        raise
+    response.headers["X-Profile-ID"] = profile.profile_id
+    body = response.body_iterator
+
+    async def profiled_body():
+        # Save once the body is sent, so the spans of streamed answers are covered end to end
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            await finish_profile(profile, response.status_code)
+
+    response.body_iterator = profiled_body()
+    return response
+
+if Config().profiling_enabled:
+    app.middleware("http")(profile_requests)
+
+# Request latency histogram, labelled by route template to keep cardinality bounded
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        route = request.scope.get("route")
+        if route is not None and request.url.path != "/metrics":
+            REQUEST_LATENCY.labels(
+                method=request.method,
+                endpoint=route.path
+            ).observe(time.perf_counter() - start)
+
+# Request ID propagation and access log; slow requests also emit the DEBUG records held back
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    start_request_context(request_id)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        duration_ms = (time.perf_counter() - start) * 1000
+        fields = {
+            "method": request.method,
+            "path": request.url.path,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 3)
+        }
+        if duration_ms >= Config().log_slow_request_ms:
+            flush_sampled_records()
+            logger.warning(
+                "Slow request %s %s took %.1f ms", request.method, request.url.path, duration_ms,
+                extra={**fields, "slow_request": True}
+            )
+        else:
+            logger.info("%s %s %s", request.method, request.url.path, status_code, extra=fields)
+
 # Register routers
 app.include_router(chat_router)
+app.include_router(faq_router)
+app.include_router(admin_router)
 
 # Health check endpoint
 @app.get("/health", response_class=JSONResponse)
@@ -41,15 +171,41 @@ async def health_check(request: Request):
         # Initialize config to check configuration
         config = Config()
         
+        # The app stays up with the LLM circuit open, answering from the FAQ only
+        bot = getattr(request.app.state, "helper_bot", None)
+        llm_circuit = bot.llm_breaker.stats() if bot is not None else None
+        admission = bot.admission_stats() if bot is not None else None
+        degraded = llm_circuit is not None and llm_circuit["state"] != "closed"
+        
         return {
-            "status": "healthy",
-            "message": "App is up and running",
+            "status": "degraded" if degraded else "healthy",
+            "message": "App is up; LLM answers are unavailable" if degraded else "App is up and running",
+            "llm_circuit": llm_circuit,
+            "admission": admission,
+            "llm_http": llm_http_stats(),
+            "speculation": bot.speculation_stats() if bot is not None else None,
             "path": request.url.path
         }
     except Exception as e:
         logger.error(f"Health check failed: {str(e)}")
         raise
 
+# Readiness endpoint for load balancers and container health checks
+@app.get("/ready", response_class=JSONResponse)
+async def readiness(request: Request):
+    """Readiness check reporting how long each startup phase took"""
+    report = getattr(request.app.state, "startup_report", None)
+    if report is None or not report.ready:
+        return NetworkResponse.error_response(
+            ExternalServiceError("Service is starting"),
+            resource=request.url.path
+        )
+    return NetworkResponse.success_response(
+        message="Ready",
+        data=report.as_dict(),
+        resource=request.url.path
+    )
+
 # Root endpoint
 @app.get("/", response_class=JSONResponse)
 async def root(request: Request):
@@ -60,3 +216,10 @@ async def root(request: Request):
         "description": "AI-powered Helper-bot",
         "path": request.url.path
     }
+
+# Prometheus metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus metrics, aggregated across workers in multi-process mode"""
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
@@ -0,0 +1,144 @@
+import asyncio
+import hmac
+import logging
+import time
+from typing import Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Request
+from fastapi.responses import FileResponse, JSONResponse
+
+from com.mhire.app.common.exceptions import BaseError, ConfigurationError, ForbiddenError, NotFoundError
+from com.mhire.app.common.network_responses import NetworkResponse
+from com.mhire.app.common.profiling import get_profile_store
+from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.database.faq_ingest import ingest_faq_stream, refresh_after_ingest
+from com.mhire.app.services.helper_bot.helper_bot_dependencies import get_db_manager
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/admin",
+    tags=["admin"]
+)
+
+
+def _require_admin(x_admin_token: Optional[str]) -> None:
+    """Check the X-Admin-Token header against ADMIN_API_TOKEN"""
+    token = Config().admin_api_token
+    if not token:
+        raise ConfigurationError("Admin API is disabled; set ADMIN_API_TOKEN to enable it")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode("utf-8"), token.encode("utf-8")):
+        raise ForbiddenError("Invalid or missing admin token")
+
+
+def _request_format(http_request: Request, data_format: Optional[str]) -> str:
+    """Explicit format, else JSON for application/json bodies and NDJSON otherwise"""
+    if data_format:
+        return data_format
+    content_type = http_request.headers.get("content-type", "")
+    return "json" if content_type.split(";")[0].strip() == "application/json" else "ndjson"
+
+
+@router.post("/faq/ingest", response_class=JSONResponse)
+async def ingest_faq(
+    http_request: Request,
+    data_format: Optional[Literal["json", "ndjson"]] = Query(None, alias="format", description="Defaults from the Content-Type"),
+    batch_size: Optional[int] = Query(None, ge=1, le=10000, description="Records per unordered bulk write"),
+    mode: Literal["upsert", "replace"] = Query("upsert", description="'replace' removes FAQ entries missing from the body"),
+    max_errors: int = Query(100, ge=0, le=10000, description="Per-record errors to list in the report"),
+    migrate_legacy: bool = Query(
+        False,
+        description="After a complete load, split legacy multi-question FAQ documents into per-question documents"
+    ),
+    x_admin_token: Optional[str] = Header(None),
+    db_manager: DBManager = Depends(get_db_manager)
+):
+    """Bulk load FAQ entries from a streamed JSON or NDJSON body, then rebuild the search index"""
+    start = time.perf_counter()
+    try:
+        _require_admin(x_admin_token)
+        report = await ingest_faq_stream(
+            db_manager,
+            http_request.stream(),
+            data_format=_request_format(http_request, data_format),
+            batch_size=batch_size,
+            replace=mode == "replace",
+            max_errors=max_errors,
+            migrate_legacy=migrate_legacy
+        )
+        # This worker reloads now; the others follow the FAQ data version or the published snapshot
+        report["reindex"] = await refresh_after_ingest(db_manager, report)
+        return NetworkResponse.success_response(
+            data=report,
+            resource=http_request.url.path,
+            duration=time.perf_counter() - start
+        )
+
+    except BaseError as e:
+        logger.warning("FAQ ingestion rejected - %s", e.message, extra={"path": http_request.url.path})
+        return NetworkResponse.error_response(e, resource=http_request.url.path, duration=time.perf_counter() - start)
+    except Exception as e:
+        logger.error(f"FAQ ingestion failed: {str(e)}")
+        raise
+
+
+@router.get("/profiles", response_class=JSONResponse)
+async def list_profiles(
+    http_request: Request,
+    limit: int = Query(50, ge=1, le=1000),
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Newest request profiles in the ring buffer"""
+    try:
+        _require_admin(x_admin_token)
+        profiles = await asyncio.to_thread(get_profile_store().list, limit)
+        return NetworkResponse.success_response(data={"profiles": profiles}, resource=http_request.url.path)
+
+    except BaseError as e:
+        return NetworkResponse.error_response(e, resource=http_request.url.path)
+    except Exception as e:
+        logger.error(f"Listing request profiles failed: {str(e)}")
+        raise
+
+
+@router.get("/profiles/{profile_id}", response_class=JSONResponse)
+async def get_profile(
+    profile_id: str,
+    http_request: Request,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Stage spans and CPU hot spots of one request profile"""
+    try:
+        _require_admin(x_admin_token)
+        profile = await asyncio.to_thread(get_profile_store().load, profile_id)
+        if profile is None:
+            raise NotFoundError(f"Profile '{profile_id}' not found")
+        return NetworkResponse.success_response(data=profile, resource=http_request.url.path)
+
+    except BaseError as e:
+        return NetworkResponse.error_response(e, resource=http_request.url.path)
+    except Exception as e:
+        logger.error(f"Loading request profile failed: {str(e)}")
+        raise
+
+
+@router.get("/profiles/{profile_id}/pstats")
+async def download_profile_pstats(
+    profile_id: str,
+    http_request: Request,
+    x_admin_token: Optional[str] = Header(None)
+):
+    """Raw cProfile output of one request profile, for pstats or snakeviz"""
+    try:
+        _require_admin(x_admin_token)
+        path = get_profile_store().pstats_path(profile_id)
+        if path is None:
+            raise NotFoundError(f"CPU profile '{profile_id}' not found")
+        return FileResponse(path, media_type="application/octet-stream", filename=f"{profile_id}.prof")
+
+    except BaseError as e:
+        return NetworkResponse.error_response(e, resource=http_request.url.path)
+    except Exception as e:
+        logger.error(f"Loading request CPU profile failed: {str(e)}")
+        raise
@@ -0,0 +1,101 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+from com.mhire.app.common.exceptions import ServiceOverloadedError
+from com.mhire.app.common.metrics import ADMISSION_ACTIVE, ADMISSION_QUEUE_DEPTH, ADMISSION_REJECTIONS
+
+
+class ConcurrencyLimiter:
+    """Bounds concurrent work for one stage with a bounded wait queue
+
+    A caller that finds every slot taken and the queue full is rejected with
+    ServiceOverloadedError instead of waiting.
+    """
+
+    def __init__(self, stage: str, max_concurrency: int, max_queue: int, retry_after: int):
+        self.stage = stage
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue = max(max_queue, 0)
+        self.retry_after = retry_after
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+
+    def check(self) -> None:
+        """Reject now if a new caller could neither run nor queue"""
+        if self.active + self.waiting >= self.max_concurrency + self.max_queue:
+            self.rejected += 1
+            ADMISSION_REJECTIONS.labels(stage=self.stage).inc()
+            raise ServiceOverloadedError(
+                f"Service is busy ({self.stage} queue full), please retry",
+                retry_after=self.retry_after
+            )
+
+    async def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take a slot, waiting up to timeout seconds; False if the wait timed out"""
+        self.check()
+        self.waiting += 1
+        ADMISSION_QUEUE_DEPTH.labels(stage=self.stage).inc()
+        try:
+            if timeout is None:
+                await self._semaphore.acquire()
+            elif not await self._acquire_within(max(timeout, 0.0)):
+                return False
+        finally:
+            self.waiting -= 1
+            ADMISSION_QUEUE_DEPTH.labels(stage=self.stage).dec()
+        self.active += 1
+        ADMISSION_ACTIVE.labels(stage=self.stage).inc()
+        return True
+
+    async def _acquire_within(self, timeout: float) -> bool:
+        """Acquire the semaphore within timeout seconds without ever losing a permit
+
+        asyncio.wait_for can drop an acquire that completes as it times out or is
+        cancelled (bpo-42130), so the acquire runs as its own task and is released
+        if it succeeds after being given up on.
+        """
+        acquiring = asyncio.ensure_future(self._semaphore.acquire())
+        try:
+            done, _ = await asyncio.wait({acquiring}, timeout=timeout)
+        except asyncio.CancelledError:
+            self._abandon(acquiring)
+            raise
+        if not done:
+            self._abandon(acquiring)
+            return False
+        return acquiring.result()
+
+    def _abandon(self, acquiring: "asyncio.Future[bool]") -> None:
+        def release_if_acquired(task: "asyncio.Future[bool]") -> None:
+            if not task.cancelled() and task.exception() is None:
+                self._semaphore.release()
+
+        acquiring.cancel()
+        acquiring.add_done_callback(release_if_acquired)
+
+    def release(self) -> None:
+        self.active -= 1
+        ADMISSION_ACTIVE.labels(stage=self.stage).dec()
+        self._semaphore.release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for the duration of a block"""
+        await self.acquire()
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        """Current load and rejection count for this worker"""
+        return {
+            "active": self.active,
+            "queued": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected
+        }
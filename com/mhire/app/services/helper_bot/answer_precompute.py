@@ -0,0 +1,303 @@
+"""Offline precomputation of answers for frequent LLM-fallback questions
+
+Reads fallback queries from the JSON application logs (records with
+``"event": "llm_fallback"``), clusters paraphrases per user type, generates
+answers for the most frequent clusters with the request-time prompt and chain,
+and writes them to the precomputed-answers collection. The report says how
+many LLM calls the store would have avoided on a query log.
+
+    python -m com.mhire.app.services.helper_bot.answer_precompute --query-log app.log --top 200
+
+With ``--stand-ins`` it runs against an in-process Mongo seeded with synthetic
+FAQ data and a fake chat model, and generates a synthetic query log when none
+is given.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, ReplaceOne
+
+from com.mhire.app.common.exceptions import ConfigurationError
+from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import PRECOMPUTED_ANSWERS_DATA, DBManager
+from com.mhire.app.services.helper_bot.helper_bot import HelperBot
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.services.helper_bot.llm_http import close_llm_http_client
+from com.mhire.app.services.helper_bot.precomputed_answers import PrecomputedAnswers, closest_signature, query_signature
+
+logger = logging.getLogger(__name__)
+
+# Collection used with --stand-ins when COLLECTION_PRECOMPUTED_ANSWERS is not set
+_STAND_IN_COLLECTION = "precomputed_answers"
+
+
+@dataclass
+class QueryCluster:
+    """Paraphrases of one question asked by one user type"""
+    user_type: UserType
+    leader: str
+    count: int = 0
+    signatures: Counter = field(default_factory=Counter)
+    queries: Counter = field(default_factory=Counter)
+
+    @property
+    def representative(self) -> str:
+        """The most frequently logged wording"""
+        return self.queries.most_common(1)[0][0]
+
+
+def read_fallback_queries(lines: Iterable[str]) -> List[Tuple[str, UserType]]:
+    """Extract (query, user type) pairs from JSON log lines or a plain JSON-lines query log"""
+    queries = []
+    for line in lines:
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        # Application logs carry other records too; a bare query log has no event field
+        if record.get("event", "llm_fallback") != "llm_fallback" or not record.get("query"):
+            continue
+        try:
+            queries.append((record["query"], UserType(record.get("user_type"))))
+        except ValueError:
+            continue
+    return queries
+
+
+def cluster_queries(queries: Iterable[Tuple[str, UserType]], similarity: float) -> List[QueryCluster]:
+    """Group paraphrases per user type, most frequent cluster first
+
+    Queries with the same signature always share a cluster; distinct signatures
+    join the most similar cluster leader above the similarity threshold whose terms
+    all match, so negated variants get a cluster of their own.
+    """
+    signature_counts: Dict[UserType, Counter] = {user_type: Counter() for user_type in UserType}
+    wordings: Dict[Tuple[UserType, str], Counter] = {}
+    for query, user_type in queries:
+        signature = query_signature(query)
+        if not signature:
+            continue
+        signature_counts[user_type][signature] += 1
+        wordings.setdefault((user_type, signature), Counter())[query.strip()] += 1
+
+    clusters: List[QueryCluster] = []
+    for user_type, counts in signature_counts.items():
+        leaders: List[str] = []
+        by_leader: List[QueryCluster] = []
+        # Frequent signatures become leaders first so rare variants attach to them
+        for signature, count in counts.most_common():
+            match = closest_signature(signature, leaders, similarity) if leaders else None
+            if match is None:
+                cluster = QueryCluster(user_type=user_type, leader=signature)
+                leaders.append(signature)
+                by_leader.append(cluster)
+            else:
+                cluster = by_leader[match]
+            cluster.count += count
+            cluster.signatures[signature] += count
+            cluster.queries.update(wordings[(user_type, signature)])
+        clusters.extend(by_leader)
+
+    clusters.sort(key=lambda cluster: cluster.count, reverse=True)
+    return clusters
+
+
+def _entry_id(cluster: QueryCluster) -> str:
+    return hashlib.sha1(f"{cluster.user_type.value}\0{cluster.leader}".encode("utf-8")).hexdigest()
+
+
+async def precompute_answers(
+    bot: HelperBot,
+    clusters: List[QueryCluster],
+    top: int,
+    min_cluster_size: int,
+    concurrency: int = 4
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """Generate answers for the most frequent clusters
+
+    Returns the store entries and counts of LLM calls made and clusters the FAQ now answers.
+    """
+    selected = [cluster for cluster in clusters if cluster.count >= min_cluster_size][:top]
+    semaphore = asyncio.Semaphore(max(concurrency, 1))
+    generated_at = datetime.now(timezone.utc)
+    stats = {"clusters_selected": len(selected), "llm_calls": 0, "answered_by_faq": 0, "failed": 0}
+
+    async def generate(cluster: QueryCluster) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                answer = await bot.precompute_answer(cluster.representative, cluster.user_type)
+            except Exception as e:
+                stats["failed"] += 1
+                logger.error(f"Precomputing '{cluster.representative}' failed: {str(e)}")
+                return None
+        if answer is None:
+            stats["answered_by_faq"] += 1
+            return None
+        stats["llm_calls"] += 1
+        return {
+            "_id": _entry_id(cluster),
+            "user_type": cluster.user_type.value,
+            "representative": cluster.representative,
+            "signatures": [signature for signature, _ in cluster.signatures.most_common()],
+            "answer": answer,
+            "cluster_size": cluster.count,
+            "generated_at": generated_at
+        }
+
+    results = await asyncio.gather(*(generate(cluster) for cluster in selected))
+    return [entry for entry in results if entry is not None], stats
+
+
+async def write_precomputed_answers(db_manager: DBManager, entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    """Replace the precomputed-answers collection contents with the new entries"""
+    collection = db_manager.precomputed_answers_collection
+    if collection is None:
+        raise ConfigurationError("COLLECTION_PRECOMPUTED_ANSWERS is not configured")
+
+    await collection.create_index([("user_type", ASCENDING)], name="user_type")
+    # Entries from earlier runs that were not regenerated are removed afterwards
+    sync_version = uuid.uuid4().hex
+    requests = [
+        ReplaceOne({"_id": entry["_id"]}, {**entry, "sync_version": sync_version}, upsert=True)
+        for entry in entries
+    ]
+    stats = {"upserted": 0, "modified": 0, "deleted": 0}
+    if requests:
+        result = await collection.bulk_write(requests, ordered=False)
+        stats["upserted"] = result.upserted_count
+        stats["modified"] = result.modified_count
+    result = await collection.delete_many({"sync_version": {"$ne": sync_version}})
+    stats["deleted"] = result.deleted_count
+    # Serving workers reload the store when they see the new version
+    await db_manager.bump_data_version(PRECOMPUTED_ANSWERS_DATA)
+    return stats
+
+
+def estimate_avoided_calls(store: PrecomputedAnswers, queries: List[Tuple[str, UserType]]) -> Dict[str, Any]:
+    """Count logged fallback queries the store would have answered without the LLM"""
+    avoided = sum(1 for query, user_type in queries if store.lookup(query, user_type) is not None)
+    return {
+        "fallback_queries": len(queries),
+        "llm_calls_avoided": avoided,
+        "avoided_ratio": round(avoided / len(queries), 4) if queries else 0.0
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Cluster the query log, precompute answers, store them and report the savings"""
+    config = Config()
+    bot_kwargs: Dict[str, Any] = {}
+    if args.stand_ins:
+        from com.mhire.app.services.helper_bot.response_cache import NullResponseCache
+        from com.mhire.app.testing.stand_ins import (
+            FakeChatModel,
+            InMemoryMongoClient,
+            synthetic_faq_documents,
+            synthetic_fallback_queries
+        )
+        config.mongodb_db = config.mongodb_db or "stand_in"
+        config.collection_faq = config.collection_faq or "faq"
+        config.collection_precomputed_answers = config.collection_precomputed_answers or _STAND_IN_COLLECTION
+        mongo = InMemoryMongoClient()
+        if args.faq_size:
+            await mongo[config.mongodb_db][config.collection_faq].insert_many(
+                synthetic_faq_documents(args.faq_size, seed=args.seed)
+            )
+        bot_kwargs = {"response_cache": NullResponseCache(), "llm": FakeChatModel(latency=0.0, tokens_per_second=1e6)}
+        db_manager = DBManager(client=mongo)
+    else:
+        db_manager = DBManager()
+
+    if args.query_log:
+        with open(args.query_log, encoding="utf-8") as log_file:
+            queries = read_fallback_queries(log_file)
+    elif args.stand_ins:
+        queries = [
+            (record["query"], UserType(record["user_type"]))
+            for record in synthetic_fallback_queries(args.synthetic_queries, seed=args.seed)
+        ]
+    else:
+        raise ConfigurationError("--query-log is required unless --stand-ins is used")
+
+    eval_queries = queries
+    if args.eval_log:
+        with open(args.eval_log, encoding="utf-8") as log_file:
+            eval_queries = read_fallback_queries(log_file)
+
+    bot = HelperBot(db_manager=db_manager, **bot_kwargs)
+    try:
+        await bot.startup()
+        clusters = cluster_queries(queries, args.similarity)
+        entries, stats = await precompute_answers(
+            bot, clusters, top=args.top, min_cluster_size=args.min_cluster_size, concurrency=args.concurrency
+        )
+        if not args.dry_run:
+            stats.update(await write_precomputed_answers(db_manager, entries))
+            store = await bot.reload_precomputed_answers()
+        else:
+            store = PrecomputedAnswers(args.similarity).build(entries)
+
+        estimate = estimate_avoided_calls(store, eval_queries)
+        return {
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "stand_ins": args.stand_ins,
+            "dry_run": args.dry_run,
+            "logged_queries": len(queries),
+            "clusters": len(clusters),
+            "largest_clusters": [
+                {"user_type": cluster.user_type.value, "representative": cluster.representative, "count": cluster.count}
+                for cluster in clusters[:10]
+            ],
+            "entries": len(entries),
+            **stats,
+            **estimate,
+            "net_llm_calls_saved": estimate["llm_calls_avoided"] - stats["llm_calls"]
+        }
+    finally:
+        await bot.close()
+        db_manager.close()
+        await close_llm_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Precompute answers for frequent LLM-fallback questions")
+    parser.add_argument("--query-log", help="JSON log file (LOG_FORMAT=json) or JSON-lines query log")
+    parser.add_argument("--eval-log", help="Query log to estimate avoided LLM calls on (defaults to --query-log)")
+    parser.add_argument("--top", type=int, default=200, help="Number of most frequent clusters to answer")
+    parser.add_argument("--min-cluster-size", type=int, default=3, help="Skip clusters asked fewer times")
+    parser.add_argument("--similarity", type=float, default=Config().precomputed_answer_similarity,
+                        help="Minimum similarity (0-100) for paraphrases to share a cluster")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent LLM calls")
+    parser.add_argument("--dry-run", action="store_true", help="Report without writing the store")
+    parser.add_argument("--stand-ins", action="store_true", help="Use in-process Mongo and a fake LLM")
+    parser.add_argument("--faq-size", type=int, default=0,
+                        help="Synthetic FAQ questions with --stand-ins; with none, every logged query stays an FAQ miss")
+    parser.add_argument("--synthetic-queries", type=int, default=5000, help="Synthetic log size with --stand-ins")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+    )
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2, default=str))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
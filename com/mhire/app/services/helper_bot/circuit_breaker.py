@@ -0,0 +1,91 @@
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stops calling a dependency after repeated slow or failed calls
+
+    Consecutive failures (errors, timeouts and calls slower than ``slow_call_seconds``)
+    open the circuit for ``recovery_seconds``. After that a single probe call is let
+    through; its outcome closes the circuit again or re-opens it. State is per worker.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_seconds: float, slow_call_seconds: float):
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.recovery_seconds = recovery_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go ahead; counts the call as rejected otherwise"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self, duration: float) -> None:
+        """Record a completed call; a slow success still counts as a failure"""
+        if duration >= self.slow_call_seconds:
+            self.record_failure(f"slow call ({duration:.1f}s)")
+            return
+        if self._state != CLOSED:
+            logger.info("Circuit %s closed", self.name)
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, reason: str) -> None:
+        """Record a failed call and open the circuit once the threshold is reached"""
+        self._consecutive_failures += 1
+        self._probe_in_flight = False
+        if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self._state != OPEN:
+                self.times_opened += 1
+                logger.warning(
+                    "Circuit %s opened after %d consecutive failures, last: %s",
+                    self.name, self._consecutive_failures, reason
+                )
+            self._state = OPEN
+            self._opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before it finished, e.g. by a client disconnect"""
+        self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        """Current state and counters for this worker"""
+        state = self.state
+        retry_in = None
+        if state == OPEN:
+            retry_in = round(max(self.recovery_seconds - (time.monotonic() - self._opened_at), 0.0), 3)
+        return {
+            "state": state,
+            "consecutive_failures": self._consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+            "retry_in_seconds": retry_in
+        }
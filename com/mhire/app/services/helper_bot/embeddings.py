@@ -0,0 +1,120 @@
+import hashlib
+import logging
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+
+from com.mhire.app.common.exceptions import ConfigurationError
+from com.mhire.app.config.config import Config
+from com.mhire.app.services.helper_bot.faq_index import normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so dot products are cosine similarities"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+class EmbeddingProvider(ABC):
+    """Turns text into fixed-size float32 vectors"""
+
+    name: str = "base"
+    dimension: int = 0
+
+    @abstractmethod
+    async def embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed a batch of texts into an (n, dimension) unit-normalized matrix"""
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        """Embed a single query into a unit-normalized vector"""
+        return (await self.embed_documents([text]))[0]
+
+
+class HashingEmbeddingProvider(EmbeddingProvider):
+    """Deterministic local embeddings from hashed word and character trigram features"""
+
+    name = "hashing"
+
+    def __init__(self, dimension: int = 512):
+        self.dimension = dimension
+
+    def _features(self, text: str) -> List[str]:
+        normalized = normalize_text(text)
+        words = normalized.split()
+        padded = f" {normalized} "
+        trigrams = [padded[i:i + 3] for i in range(len(padded) - 2)]
+        return [f"w:{word}" for word in words] + [f"c:{gram}" for gram in trigrams]
+
+    def _embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for feature in self._features(text):
+            # blake2b is stable across processes, unlike the built-in hash()
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            sign = 1.0 if value & 1 else -1.0
+            vector[(value >> 1) % self.dimension] += sign
+        return vector
+
+    async def embed_documents(self, texts: List[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return _l2_normalize(np.stack([self._embed(text) for text in texts]))
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Embeddings from the OpenAI embeddings API"""
+
+    name = "openai"
+
+    # Output sizes of the OpenAI embedding models
+    _DIMENSIONS = {
+        "text-embedding-3-small": 1536,
+        "text-embedding-3-large": 3072,
+        "text-embedding-ada-002": 1536,
+    }
+
+    def __init__(self, config: Config, batch_size: int = 256):
+        from langchain_openai import OpenAIEmbeddings
+        from com.mhire.app.services.helper_bot.llm_http import get_llm_http_client, llm_http_timeout
+
+        self.model = config.openai_embedding_model
+        self.name = f"openai-{self.model}"
+        self.dimension = self._DIMENSIONS.get(self.model, 0)
+        self.batch_size = batch_size
+        # Shares the worker's pooled client with the chat model
+        self._client = OpenAIEmbeddings(
+            model=self.model,
+            api_key=config.openai_api_key,
+            base_url=config.openai_base_url,
+            http_async_client=get_llm_http_client(),
+            timeout=llm_http_timeout(config),
+            max_retries=0
+        )
+
+    async def embed_documents(self, texts: List[str]) -> np.ndarray:
+        vectors: List[List[float]] = []
+        for start in range(0, len(texts), self.batch_size):
+            vectors.extend(await self._client.aembed_documents(texts[start:start + self.batch_size]))
+        if not vectors:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+        return _l2_normalize(np.asarray(vectors, dtype=np.float32))
+
+    async def embed_query(self, text: str) -> np.ndarray:
+        vector = np.asarray([await self._client.aembed_query(text)], dtype=np.float32)
+        return _l2_normalize(vector)[0]
+
+
+def get_embedding_provider(config: Config) -> EmbeddingProvider:
+    """Create the embedding provider selected by EMBEDDING_PROVIDER"""
+    provider = config.embedding_provider
+    if provider == "hashing":
+        return HashingEmbeddingProvider(dimension=config.embedding_dimension)
+    if provider == "openai":
+        if not config.openai_api_key:
+            raise ConfigurationError("OpenAI API key is required for the openai embedding provider")
+        return OpenAIEmbeddingProvider(config)
+    raise ConfigurationError(f"Unknown embedding provider: {provider}")
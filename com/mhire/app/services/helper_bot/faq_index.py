@@ -0,0 +1,322 @@
+import hashlib
+import math
+import re
+import unicodedata
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from rapidfuzz import fuzz, process
+
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+
+# Score bands shared with HelperBot.get_response thresholds (1.5 / 0.8 / 0.5)
+EXACT_MATCH_SCORE = 3.0
+PHRASE_MATCH_SCORE = 2.0
+ANSWER_MATCH_SCORE = 1.0
+LEXICAL_SCORE_CEILING = 1.9
+
+# Fuzzy fallback weights and acceptance threshold
+FUZZY_QUESTION_WEIGHT = 0.6
+FUZZY_KEYWORD_WEIGHT = 0.3
+FUZZY_ANSWER_WEIGHT = 0.1
+FUZZY_THRESHOLD = 0.5
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset({
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for",
+    "from", "how", "i", "if", "in", "is", "it", "me", "my", "of", "on", "or",
+    "so", "the", "this", "to", "was", "what", "when", "where", "which", "who",
+    "why", "will", "with", "you", "your",
+})
+
+
+def normalize_text(text: str) -> str:
+    """Lowercase, strip accents and punctuation, and collapse whitespace"""
+    text = unicodedata.normalize("NFKD", text or "")
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    return " ".join(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into normalized search terms, dropping stopwords"""
+    terms = normalize_text(text).split()
+    filtered = [term for term in terms if term not in _STOPWORDS]
+    # Queries made only of stopwords still need something to match on
+    return filtered or terms
+
+
+def _contains_phrase(haystack: str, needle: str) -> bool:
+    """Check whether a normalized phrase appears on token boundaries"""
+    return bool(needle) and f" {needle} " in f" {haystack} "
+
+
+def _fuzzy_scores(query: str, lower_questions: List[str], lower_answers: List[str]) -> np.ndarray:
+    """Weighted edit-distance similarity of the query against every document, in [0, 1]"""
+    query = [query.lower()]
+    question_scores = process.cdist(query, lower_questions, scorer=fuzz.ratio, dtype=np.float32)[0]
+    keyword_scores = process.cdist(query, lower_questions, scorer=fuzz.partial_ratio, dtype=np.float32)[0]
+    answer_scores = process.cdist(query, lower_answers, scorer=fuzz.partial_ratio, dtype=np.float32)[0]
+    return (
+        question_scores * FUZZY_QUESTION_WEIGHT +  # Higher weight for exact question matches
+        keyword_scores * FUZZY_KEYWORD_WEIGHT +    # Medium weight for partial question matches
+        answer_scores * FUZZY_ANSWER_WEIGHT        # Lower weight for answer content matches
+    ) / 100
+
+
+def _fuzzy_top(docs: List[Dict[str, Any]], scores: np.ndarray, limit: int) -> List[Dict[str, Any]]:
+    """Best documents above the fuzzy threshold"""
+    candidates = np.flatnonzero(scores > FUZZY_THRESHOLD)
+    if candidates.size == 0:
+        return []
+    # Stable descending order keeps the original document order for ties
+    top = candidates[np.argsort(-scores[candidates], kind="stable")[:limit]]
+    return [{**docs[doc_id], "score": float(scores[doc_id])} for doc_id in top]
+
+
+class FuzzyCorpus:
+    """Lowercased FAQ text of one user type for fuzzy scoring, without the BM25 structures"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self.lower_questions: List[str] = [doc.get("question", "").lower() for doc in docs]
+        self.lower_answers: List[str] = [(doc.get("answer") or "").lower() for doc in docs]
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def search(self, query: str, limit: int = 3) -> List[Dict[str, Any]]:
+        if not self.docs or not query:
+            return []
+        return _fuzzy_top(self.docs, _fuzzy_scores(query, self.lower_questions, self.lower_answers), limit)
+
+
+class _Partition:
+    """BM25 inverted index over the FAQ questions of a single user type"""
+
+    def __init__(self, docs: List[Dict[str, Any]]):
+        self.docs = docs
+        self.norm_questions: List[str] = []
+        self.norm_answers: List[str] = []
+        self.doc_lengths: List[int] = []
+        # Lowercased text kept side by side for the batched fuzzy scorer
+        self.lower_questions: List[str] = [doc.get("question", "").lower() for doc in docs]
+        self.lower_answers: List[str] = [(doc.get("answer") or "").lower() for doc in docs]
+        self.exact: Dict[str, int] = {}
+        self.postings: Dict[str, List[Tuple[int, int]]] = {}
+
+        for doc_id, doc in enumerate(docs):
+            norm_question = normalize_text(doc.get("question", ""))
+            self.norm_questions.append(norm_question)
+            self.norm_answers.append(normalize_text(doc.get("answer", "")))
+            # First occurrence wins for duplicated questions
+            self.exact.setdefault(norm_question, doc_id)
+
+            terms = tokenize(doc.get("question", ""))
+            self.doc_lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self.postings.setdefault(term, []).append((doc_id, tf))
+
+        total = len(docs)
+        self.avg_doc_length = (sum(self.doc_lengths) / total) if total else 0.0
+        self.idf: Dict[str, float] = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+        # Query terms unknown to the corpus are charged at the rarest known term's weight
+        self.max_idf = max(self.idf.values(), default=0.0)
+
+    def bm25(self, terms: List[str]) -> Dict[int, float]:
+        """Accumulate BM25 scores for every document sharing a term with the query"""
+        scores: Dict[int, float] = {}
+        avgdl = self.avg_doc_length or 1.0
+        for term in terms:
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf[term]
+            for doc_id, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def max_bm25(self, terms: List[str]) -> float:
+        """Score of an average-length document containing every query term once
+
+        Unknown terms count at the highest IDF, so a query sharing one word with a
+        question cannot reach the top of the scale.
+        """
+        return sum(self.idf.get(term, self.max_idf) for term in terms)
+
+    def has_term(self, term: str) -> bool:
+        return term in self.idf
+
+    def fuzzy_scores(self, query: str) -> np.ndarray:
+        """Weighted edit-distance similarity of the query against every document, in [0, 1]"""
+        return _fuzzy_scores(query, self.lower_questions, self.lower_answers)
+
+
+class FAQIndex:
+    """Immutable in-memory FAQ search index partitioned by user type"""
+
+    def __init__(self, partitions: Dict[str, _Partition], built_at: Optional[datetime] = None):
+        self._partitions = partitions
+        # Data version for HTTP validators: content hash and when the content last changed,
+        # taken from the data where the caller knows it, otherwise the build time
+        self.built_at = built_at or datetime.now(timezone.utc)
+        self._fingerprint: Optional[str] = None
+        self._catalogues: Dict[str, Dict[str, List[int]]] = {}
+
+    @classmethod
+    def build(cls, faqs: Iterable[Dict[str, Any]], built_at: Optional[datetime] = None) -> "FAQIndex":
+        """Build an index from flat FAQ records (question, answer, category, user_type)"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for faq in faqs:
+            if not faq.get("question") or not faq.get("user_type"):
+                continue
+            grouped.setdefault(faq["user_type"], []).append({
+                "question": faq["question"],
+                "answer": faq.get("answer", ""),
+                "category": faq.get("category"),
+                "user_type": faq["user_type"],
+            })
+        return cls({user_type: _Partition(docs) for user_type, docs in grouped.items()}, built_at=built_at)
+
+    def __len__(self) -> int:
+        return sum(len(partition.docs) for partition in self._partitions.values())
+
+    @property
+    def fingerprint(self) -> str:
+        """Content hash of the indexed FAQ entries, identical across workers for the same data"""
+        if self._fingerprint is None:
+            digest = hashlib.sha256()
+            for user_type in sorted(self._partitions):
+                for doc in self._partitions[user_type].docs:
+                    for value in (user_type, doc["question"], doc.get("answer") or "", doc.get("category") or ""):
+                        digest.update(value.encode("utf-8"))
+                        digest.update(b"\0")
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+
+    def size(self, user_type: UserType) -> int:
+        """Number of FAQ entries indexed for a user type"""
+        partition = self._partitions.get(user_type.value)
+        return len(partition.docs) if partition else 0
+
+    def documents(self, user_type: UserType) -> List[Dict[str, Any]]:
+        """All indexed FAQ entries for a user type"""
+        partition = self._partitions.get(user_type.value)
+        return list(partition.docs) if partition else []
+
+    def _catalogue(self, user_type: UserType) -> Dict[str, List[int]]:
+        """Document ids per category, in corpus order, built once per index"""
+        catalogue = self._catalogues.get(user_type.value)
+        if catalogue is None:
+            catalogue = {}
+            partition = self._partitions.get(user_type.value)
+            for doc_id, doc in enumerate(partition.docs if partition else []):
+                if doc.get("category"):
+                    catalogue.setdefault(doc["category"], []).append(doc_id)
+            self._catalogues[user_type.value] = catalogue
+        return catalogue
+
+    def categories(self, user_type: UserType) -> List[Dict[str, Any]]:
+        """Category names and question counts for a user type"""
+        return [
+            {"name": name, "question_count": len(doc_ids)}
+            for name, doc_ids in sorted(self._catalogue(user_type).items())
+        ]
+
+    def category_questions(self, user_type: UserType, category: str) -> Optional[List[Dict[str, Any]]]:
+        """FAQ entries in a category, or None if the user type has no such category"""
+        doc_ids = self._catalogue(user_type).get(category)
+        if doc_ids is None:
+            return None
+        partition = self._partitions[user_type.value]
+        return [partition.docs[doc_id] for doc_id in doc_ids]
+
+    def lookup(self, question: str, user_type: UserType) -> Optional[Dict[str, Any]]:
+        """The FAQ entry whose question matches exactly after normalization"""
+        partition = self._partitions.get(user_type.value)
+        norm_question = normalize_text(question)
+        if partition is None or not norm_question:
+            return None
+        doc_id = partition.exact.get(norm_question)
+        return partition.docs[doc_id] if doc_id is not None else None
+
+    def term_coverage(self, query: str, user_type: UserType) -> float:
+        """Fraction of the query's search terms that occur in any FAQ question of the user type"""
+        partition = self._partitions.get(user_type.value)
+        terms = set(tokenize(query))
+        if partition is None or not terms:
+            return 0.0
+        return sum(1 for term in terms if partition.has_term(term)) / len(terms)
+
+    def search(self, query: str, user_type: UserType, limit: int = 3) -> List[Dict[str, Any]]:
+        """Return the best matching FAQ entries with scores on the legacy 0.5-3.0 scale"""
+        partition = self._partitions.get(user_type.value)
+        norm_query = normalize_text(query)
+        if partition is None or not norm_query:
+            return []
+
+        scores: Dict[int, float] = {}
+
+        # Exact question match
+        exact_id = partition.exact.get(norm_query)
+        if exact_id is not None:
+            scores[exact_id] = EXACT_MATCH_SCORE
+
+        # Relevance-ranked term matches, scaled against the query's best achievable score
+        terms = tokenize(query)
+        ceiling = partition.max_bm25(terms)
+        if ceiling > 0:
+            for doc_id, raw in partition.bm25(terms).items():
+                if doc_id in scores:
+                    continue
+                if _contains_phrase(partition.norm_questions[doc_id], norm_query):
+                    scores[doc_id] = PHRASE_MATCH_SCORE
+                    continue
+                lexical = min(raw / ceiling, 1.0) * LEXICAL_SCORE_CEILING
+                if _contains_phrase(partition.norm_answers[doc_id], norm_query):
+                    lexical = max(lexical, ANSWER_MATCH_SCORE)
+                scores[doc_id] = lexical
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [{**partition.docs[doc_id], "score": score} for doc_id, score in ranked]
+
+    def fuzzy_search(self, query: str, user_type: UserType, limit: int = 3) -> List[Dict[str, Any]]:
+        """Score every FAQ entry by weighted fuzzy similarity in one batched call"""
+        partition = self._partitions.get(user_type.value)
+        if partition is None or not partition.docs or not query:
+            return []
+
+        return _fuzzy_top(partition.docs, partition.fuzzy_scores(query), limit)
+
+
+def flatten_faq_document(document: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten a nested categories[].questions[] FAQ document into index records"""
+    records: List[Dict[str, Any]] = []
+    for category in document.get("categories") or []:
+        for question in category.get("questions") or []:
+            records.append({
+                "question": question.get("question_text"),
+                "answer": question.get("answer_text"),
+                "category": category.get("category_name"),
+                "user_type": question.get("user_type"),
+            })
+    return records
+
+
+def index_from_documents(documents: Iterable[Dict[str, Any]], built_at: Optional[datetime] = None) -> FAQIndex:
+    """Build an index from nested FAQ documents as stored in Mongo"""
+    records: List[Dict[str, Any]] = []
+    for document in documents:
+        records.extend(flatten_faq_document(document))
+    return FAQIndex.build(records, built_at=built_at)
+
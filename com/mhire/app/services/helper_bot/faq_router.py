@@ -0,0 +1,132 @@
+import logging
+from datetime import timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Callable, Dict
+
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+from com.mhire.app.common.exceptions import NotFoundError
+from com.mhire.app.common.network_responses import NetworkResponse
+from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.services.helper_bot.faq_index import FAQIndex
+from com.mhire.app.services.helper_bot.helper_bot_dependencies import get_db_manager
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+
+logger = logging.getLogger(__name__)
+
+# Read-only FAQ lookups served from the in-memory index. Responses carry validators derived
+# from the FAQ data version so nginx and browsers can cache and revalidate them.
+router = APIRouter(
+    prefix="/api/v1/faq",
+    tags=["faq"]
+)
+
+
+def _validators(index: FAQIndex) -> Dict[str, str]:
+    """Caching headers for the index's data version"""
+    return {
+        "ETag": f'"{index.fingerprint[:32]}"',
+        "Last-Modified": format_datetime(index.built_at.astimezone(timezone.utc).replace(microsecond=0), usegmt=True),
+        "Cache-Control": f"public, max-age={Config().faq_http_max_age}"
+    }
+
+
+def _not_modified(http_request: Request, index: FAQIndex, headers: Dict[str, str]) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no entity tag was sent"""
+    if_none_match = http_request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        # Weak comparison: a proxy may have weakened the tag, e.g. after compressing
+        tags |= {tag[2:] for tag in tags if tag.startswith("W/")}
+        return "*" in tags or headers["ETag"] in tags
+
+    if_modified_since = http_request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return index.built_at.replace(microsecond=0) <= since
+    return False
+
+
+async def _respond(
+    http_request: Request,
+    db_manager: DBManager,
+    build: Callable[[FAQIndex], Dict[str, Any]]
+) -> Response:
+    """Answer 304 when the client's copy is current, otherwise the body built from the index"""
+    try:
+        index = await db_manager.get_faq_index()
+        headers = _validators(index)
+        if _not_modified(http_request, index, headers):
+            return Response(status_code=304, headers=headers)
+        try:
+            data = build(index)
+        except NotFoundError as e:
+            return NetworkResponse.error_response(e, resource=http_request.url.path, headers=headers)
+        return NetworkResponse.success_response(data=data, resource=http_request.url.path, headers=headers)
+
+    except Exception as e:
+        logger.error(f"FAQ lookup failed: {str(e)}")
+        raise
+
+
+@router.get("/{user_type}/categories", response_class=JSONResponse)
+async def list_categories(
+    user_type: UserType,
+    http_request: Request,
+    db_manager: DBManager = Depends(get_db_manager)
+):
+    """FAQ categories for a user type with their question counts"""
+    def build(index: FAQIndex) -> Dict[str, Any]:
+        return {"user_type": user_type.value, "categories": index.categories(user_type)}
+
+    return await _respond(http_request, db_manager, build)
+
+
+@router.get("/{user_type}/categories/{category}/questions", response_class=JSONResponse)
+async def list_category_questions(
+    user_type: UserType,
+    category: str,
+    http_request: Request,
+    db_manager: DBManager = Depends(get_db_manager)
+):
+    """Questions and answers in one FAQ category"""
+    def build(index: FAQIndex) -> Dict[str, Any]:
+        entries = index.category_questions(user_type, category)
+        if entries is None:
+            raise NotFoundError(f"FAQ category '{category}' not found")
+        return {
+            "user_type": user_type.value,
+            "category": category,
+            "questions": [{"question": entry["question"], "answer": entry["answer"]} for entry in entries]
+        }
+
+    return await _respond(http_request, db_manager, build)
+
+
+@router.get("/{user_type}/lookup", response_class=JSONResponse)
+async def lookup_question(
+    user_type: UserType,
+    http_request: Request,
+    question: str = Query(..., min_length=1, max_length=500, description="FAQ question, matched exactly after normalization"),
+    db_manager: DBManager = Depends(get_db_manager)
+):
+    """Exact FAQ lookup by question text"""
+    def build(index: FAQIndex) -> Dict[str, Any]:
+        entry = index.lookup(question, user_type)
+        if entry is None:
+            raise NotFoundError("FAQ question not found")
+        return {
+            "user_type": user_type.value,
+            "question": entry["question"],
+            "answer": entry["answer"],
+            "category": entry.get("category")
+        }
+
+    return await _respond(http_request, db_manager, build)
@@ -0,0 +1,392 @@
+"""Versioned, read-only FAQ snapshot shared by all workers through memory-mapped files
+
+A snapshot is a directory of .npy arrays holding every partition's FAQ text and its
+precomputed BM25 structures (vocabulary, postings in CSR layout, IDF, document
+lengths and the exact-question lookup). One process builds and publishes it; every
+worker memory-maps the same files, so the data lives once in the page cache instead
+of once per worker.
+
+Publishing writes the version directory under a temporary name, renames it into
+place and then atomically replaces the CURRENT pointer file. Workers poll CURRENT
+and switch to a new version without restarting.
+
+    python -m com.mhire.app.services.helper_bot.faq_snapshot --dir data/faq_snapshot
+"""
+import argparse
+import asyncio
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from com.mhire.app.services.helper_bot.faq_index import (
+    BM25_B,
+    BM25_K1,
+    FAQIndex,
+    _Partition,
+    _fuzzy_scores
+)
+
+logger = logging.getLogger(__name__)
+
+# Format 2 names partition files by _partition_file instead of the raw user type
+SNAPSHOT_FORMAT = 2
+CURRENT_FILE = "CURRENT"
+_LOCK_FILE = ".publish.lock"
+_STRING_COLUMNS = ("question", "answer", "category", "norm_question", "norm_answer", "term")
+_UNSAFE_FILE_CHARS = re.compile(r"[^0-9A-Za-z_-]")
+
+
+def _hash(text: str) -> int:
+    """Stable 64-bit key for exact and term lookups"""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _partition_file(user_type: str, name: str) -> str:
+    """File name of a partition array; user types come from FAQ data, so they never form a path"""
+    readable = _UNSAFE_FILE_CHARS.sub("_", user_type)[:32]
+    digest = hashlib.blake2b(user_type.encode("utf-8"), digest_size=8).hexdigest()
+    return f"{readable}-{digest}.{name}.npy"
+
+
+class _StringColumn:
+    """Read-only sequence of strings decoded on access from a memory-mapped UTF-8 blob"""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, position: int) -> str:
+        start, end = self._offsets[position], self._offsets[position + 1]
+        return self._blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[position] for position in range(len(self)))
+
+
+class _DocumentColumn:
+    """Read-only sequence of FAQ records assembled from string columns on access"""
+
+    def __init__(self, user_type: str, columns: Dict[str, _StringColumn]):
+        self._user_type = user_type
+        self._columns = columns
+
+    def __len__(self) -> int:
+        return len(self._columns["question"])
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        return {
+            "question": self._columns["question"][position],
+            "answer": self._columns["answer"][position],
+            "category": self._columns["category"][position] or None,
+            "user_type": self._user_type,
+        }
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return (self[position] for position in range(len(self)))
+
+
+class _HashLookup:
+    """Exact string lookup through a sorted array of 64-bit hashes"""
+
+    def __init__(self, hashes: np.ndarray, values: np.ndarray, keys: Sequence[str]):
+        self._hashes = hashes
+        self._values = values
+        self._keys = keys
+
+    def get(self, key: str, default: Optional[int] = None) -> Optional[int]:
+        key_hash = np.uint64(_hash(key))
+        position = int(np.searchsorted(self._hashes, key_hash))
+        # Walk the (almost always single) entries sharing the hash and confirm the text
+        while position < len(self._hashes) and self._hashes[position] == key_hash:
+            value = int(self._values[position])
+            if self._keys[value] == key:
+                return value
+            position += 1
+        return default
+
+
+class _SnapshotPartition:
+    """Memory-mapped counterpart of faq_index._Partition for one user type"""
+
+    def __init__(self, user_type: str, arrays: Dict[str, np.ndarray], avg_doc_length: float):
+        blob = arrays["blob"]
+        columns = {name: _StringColumn(blob, arrays[f"{name}_offsets"]) for name in _STRING_COLUMNS}
+        self.docs = _DocumentColumn(user_type, columns)
+        self.norm_questions = columns["norm_question"]
+        self.norm_answers = columns["norm_answer"]
+        self.doc_lengths = arrays["doc_lengths"]
+        self.avg_doc_length = avg_doc_length
+        self.exact = _HashLookup(arrays["exact_hashes"], arrays["exact_docs"], self.norm_questions)
+        # Terms are stored in hash order, so a term's lookup position is its term id
+        self._terms = _HashLookup(arrays["term_hashes"], np.arange(len(arrays["term_hashes"])), columns["term"])
+        self._posting_offsets = arrays["posting_offsets"]
+        self._posting_docs = arrays["posting_docs"]
+        self._posting_tfs = arrays["posting_tfs"]
+        self._idf = arrays["idf"]
+        self._max_idf = float(self._idf.max()) if len(self._idf) else 0.0
+        self._columns = columns
+        self._lower_questions: Optional[List[str]] = None
+        self._lower_answers: Optional[List[str]] = None
+
+    def bm25(self, terms: List[str]) -> Dict[int, float]:
+        """Accumulate BM25 scores for every document sharing a term with the query"""
+        scores: Dict[int, float] = {}
+        avgdl = self.avg_doc_length or 1.0
+        for term in terms:
+            term_id = self._terms.get(term)
+            if term_id is None:
+                continue
+            start, end = self._posting_offsets[term_id], self._posting_offsets[term_id + 1]
+            doc_ids = self._posting_docs[start:end]
+            tfs = self._posting_tfs[start:end].astype(np.float64)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * self.doc_lengths[doc_ids] / avgdl)
+            contributions = self._idf[term_id] * tfs * (BM25_K1 + 1) / (tfs + norm)
+            for doc_id, contribution in zip(doc_ids.tolist(), contributions.tolist()):
+                scores[doc_id] = scores.get(doc_id, 0.0) + contribution
+        return scores
+
+    def max_bm25(self, terms: List[str]) -> float:
+        """Score of an average-length document containing every query term once, unknown terms at the highest IDF"""
+        total = 0.0
+        for term in terms:
+            term_id = self._terms.get(term)
+            total += float(self._idf[term_id]) if term_id is not None else self._max_idf
+        return total
+
+    def has_term(self, term: str) -> bool:
+        return self._terms.get(term) is not None
+
+    def fuzzy_scores(self, query: str) -> np.ndarray:
+        """Weighted edit-distance similarity of the query against every document, in [0, 1]"""
+        # The fuzzy scorer needs Python strings; decode them once per worker on first use
+        if self._lower_questions is None:
+            self._lower_questions = [text.lower() for text in self._columns["question"]]
+            self._lower_answers = [text.lower() for text in self._columns["answer"]]
+        return _fuzzy_scores(query, self._lower_questions, self._lower_answers)
+
+
+class FAQSnapshot(FAQIndex):
+    """FAQIndex served from a memory-mapped snapshot version"""
+
+    def __init__(
+        self,
+        partitions: Dict[str, _SnapshotPartition],
+        version: str,
+        fingerprint: str,
+        built_at: Optional[datetime] = None
+    ):
+        super().__init__(partitions, built_at=built_at)
+        self.version = version
+        self._fingerprint = fingerprint
+
+    @classmethod
+    def open(cls, directory: str, version: str) -> "FAQSnapshot":
+        """Memory-map a published snapshot version"""
+        path = os.path.join(directory, version)
+        with open(os.path.join(path, "manifest.json"), "r", encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Unsupported FAQ snapshot format: {manifest.get('format')}")
+
+        partitions = {}
+        for user_type, meta in manifest["partitions"].items():
+            arrays = {
+                name: np.load(os.path.join(path, _partition_file(user_type, name)), mmap_mode="r")
+                for name in meta["arrays"]
+            }
+            partitions[user_type] = _SnapshotPartition(user_type, arrays, meta["avg_doc_length"])
+        return cls(
+            partitions,
+            version=manifest["version"],
+            fingerprint=manifest["fingerprint"],
+            built_at=datetime.fromisoformat(manifest["created_at"])
+        )
+
+
+def current_version(directory: str) -> Optional[str]:
+    """Version named by the CURRENT pointer, or None before the first publish"""
+    try:
+        with open(os.path.join(directory, CURRENT_FILE), "r", encoding="utf-8") as current_file:
+            return current_file.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_current(directory: str) -> Optional[FAQSnapshot]:
+    """Memory-map the current snapshot, or None if nothing has been published in this format"""
+    version = current_version(directory)
+    if not version:
+        return None
+    try:
+        return FAQSnapshot.open(directory, version)
+    except ValueError as e:
+        # Written by an older release; the caller rebuilds and publishes a new version
+        logger.warning(f"Ignoring FAQ snapshot {version}: {str(e)}")
+        return None
+
+
+def _partition_arrays(partition: _Partition) -> Dict[str, np.ndarray]:
+    """Serialize a built partition into flat arrays"""
+    vocabulary = sorted(partition.postings, key=_hash)
+    columns = {
+        "question": [doc["question"] for doc in partition.docs],
+        "answer": [doc.get("answer") or "" for doc in partition.docs],
+        "category": [doc.get("category") or "" for doc in partition.docs],
+        "norm_question": partition.norm_questions,
+        "norm_answer": partition.norm_answers,
+        "term": vocabulary,
+    }
+
+    arrays: Dict[str, np.ndarray] = {}
+    chunks: List[bytes] = []
+    position = 0
+    for name in _STRING_COLUMNS:
+        offsets = [position]
+        for text in columns[name]:
+            encoded = text.encode("utf-8")
+            chunks.append(encoded)
+            position += len(encoded)
+            offsets.append(position)
+        arrays[f"{name}_offsets"] = np.asarray(offsets, dtype=np.int64)
+    arrays["blob"] = np.frombuffer(b"".join(chunks), dtype=np.uint8)
+
+    exact = sorted((_hash(text), doc_id) for text, doc_id in partition.exact.items())
+    arrays["exact_hashes"] = np.asarray([key for key, _ in exact], dtype=np.uint64)
+    arrays["exact_docs"] = np.asarray([doc_id for _, doc_id in exact], dtype=np.int32)
+
+    posting_offsets = [0]
+    posting_docs: List[int] = []
+    posting_tfs: List[int] = []
+    for term in vocabulary:
+        for doc_id, tf in partition.postings[term]:
+            posting_docs.append(doc_id)
+            posting_tfs.append(tf)
+        posting_offsets.append(len(posting_docs))
+    arrays["term_hashes"] = np.asarray([_hash(term) for term in vocabulary], dtype=np.uint64)
+    arrays["posting_offsets"] = np.asarray(posting_offsets, dtype=np.int64)
+    arrays["posting_docs"] = np.asarray(posting_docs, dtype=np.int32)
+    arrays["posting_tfs"] = np.asarray(posting_tfs, dtype=np.int32)
+    arrays["idf"] = np.asarray([partition.idf[term] for term in vocabulary], dtype=np.float64)
+    arrays["doc_lengths"] = np.asarray(partition.doc_lengths, dtype=np.int32)
+    return arrays
+
+
+@contextmanager
+def publish_lock(directory: str) -> Iterator[None]:
+    """Serialize snapshot builds across worker processes"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, _LOCK_FILE), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def publish_snapshot(index: FAQIndex, directory: str, keep: int = 3) -> str:
+    """Write an index as a new snapshot version and atomically make it current
+
+    Returns the current version; publishing identical content is a no-op.
+    Call under publish_lock when several processes may publish.
+    """
+    fingerprint = index.fingerprint
+    current = current_version(directory)
+    if current is not None:
+        try:
+            if FAQSnapshot.open(directory, current).fingerprint == fingerprint:
+                return current
+        except (OSError, ValueError) as e:
+            logger.error(f"Current FAQ snapshot {current} is unreadable: {str(e)}")
+
+    version = f"{int(time.time() * 1000)}-{fingerprint[:12]}"
+    staging = os.path.join(directory, f".{version}.{os.getpid()}.tmp")
+    os.makedirs(staging)
+    manifest: Dict[str, Any] = {
+        "format": SNAPSHOT_FORMAT,
+        "version": version,
+        "fingerprint": fingerprint,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "partitions": {}
+    }
+    for user_type, partition in index._partitions.items():
+        arrays = _partition_arrays(partition)
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, _partition_file(user_type, name)), array)
+        manifest["partitions"][user_type] = {
+            "documents": len(partition.docs),
+            "avg_doc_length": partition.avg_doc_length,
+            "arrays": sorted(arrays)
+        }
+    with open(os.path.join(staging, "manifest.json"), "w", encoding="utf-8") as manifest_file:
+        json.dump(manifest, manifest_file)
+    os.rename(staging, os.path.join(directory, version))
+
+    # Readers see either the old or the new pointer, never a partial write
+    pointer = os.path.join(directory, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(pointer, "w", encoding="utf-8") as pointer_file:
+        pointer_file.write(version)
+        pointer_file.flush()
+        os.fsync(pointer_file.fileno())
+    os.replace(pointer, os.path.join(directory, CURRENT_FILE))
+    logger.info(f"Published FAQ snapshot {version} with {len(index)} entries")
+
+    _remove_old_versions(directory, keep=max(keep, 1), current=version)
+    return version
+
+
+def _remove_old_versions(directory: str, keep: int, current: str) -> None:
+    """Delete all but the newest versions; workers still mapping them keep their open files"""
+    versions = sorted(
+        name for name in os.listdir(directory)
+        if not name.startswith(".") and os.path.isdir(os.path.join(directory, name))
+    )
+    for name in versions[:-keep]:
+        if name != current:
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+async def _publish_from_database(directory: str, keep: int) -> Dict[str, Any]:
+    """Build the index from MongoDB and publish it as a snapshot"""
+    from com.mhire.app.database.db_manager import DBManager
+
+    db_manager = DBManager()
+    try:
+        index = await db_manager._build_faq_index()
+    finally:
+        db_manager.close()
+    with publish_lock(directory):
+        version = publish_snapshot(index, directory, keep=keep)
+    return {"version": version, "entries": len(index), "directory": directory}
+
+
+def main() -> None:
+    from com.mhire.app.config.config import Config
+
+    config = Config()
+    parser = argparse.ArgumentParser(description="Publish the FAQ collection as a shared snapshot")
+    parser.add_argument("--dir", default=config.faq_snapshot_dir, help="Snapshot directory (FAQ_SNAPSHOT_DIR)")
+    parser.add_argument("--keep", type=int, default=config.faq_snapshot_keep, help="Versions to keep on disk")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s'
+    )
+    print(json.dumps(asyncio.run(_publish_from_database(args.dir, args.keep)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
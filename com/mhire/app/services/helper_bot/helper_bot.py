@@ -1,152 +1,835 @@
+import asyncio
 import logging
-from typing import Optional, Dict, Any
-import openai
-from langchain_core.prompts import PromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-from langchain_openai import ChatOpenAI
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
+from com.mhire.app.common.exceptions import ServiceOverloadedError
+from com.mhire.app.common.metrics import (
+    COALESCED_REQUESTS,
+    FAQ_SEARCH_LATENCY,
+    LLM_FAILURES,
+    LLM_LATENCY,
+    LLM_PROMPT_TOKENS,
+    RESPONSE_CACHE_REQUESTS,
+    track_latency
+)
+from com.mhire.app.common.profiling import profile_span
+from com.mhire.app.common.startup import StartupReport
 from com.mhire.app.config.config import Config
-from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.database.db_manager import PRECOMPUTED_ANSWERS_DATA, DBManager
+from com.mhire.app.services.helper_bot.admission import ConcurrencyLimiter
+from com.mhire.app.services.helper_bot.circuit_breaker import CircuitBreaker
+from com.mhire.app.services.helper_bot.faq_index import normalize_text
 from com.mhire.app.services.helper_bot.helper_bot_schema import ChatResponse, UserType
+from com.mhire.app.services.helper_bot.precomputed_answers import PrecomputedAnswers
+from com.mhire.app.services.helper_bot.prompt_builder import BuiltPrompt, PromptBuilder, TokenCounter
+from com.mhire.app.services.helper_bot.response_cache import (
+    ResponseCache,
+    get_response_cache,
+    make_cache_key
+)
+from com.mhire.app.services.helper_bot.singleflight import SingleFlight
+from com.mhire.app.services.helper_bot.speculation import MissPrediction, MissPredictor, SpeculativeCall
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.runnables import Runnable
 
 logger = logging.getLogger(__name__)
 
+PROMPT_TEMPLATE = """You are a helpful support agent for FixConnect app.
+Context: {context}
+User Query: {query}
+FAQ Results: {faq_results}
+
+Instructions:
+1. If FAQ matches are provided above, check each one carefully to find the most relevant answer.
+2. If you find a matching FAQ answer, use it EXACTLY as written - do not modify it.
+3. Only generate a new answer if none of the FAQ answers are relevant to the query.
+4. Your response should be clear and concise (1-2 sentences).
+5. Do not include any formatting or prefixes (like "Answer:", "Response:", etc.).
+6. Focus on answering the exact question asked.
+
+Return your response now:"""
+
+
+def import_llm_modules() -> None:
+    """Import the OpenAI and LangChain stack, e.g. in the gunicorn master before forking"""
+    import openai  # noqa: F401
+    import httpx  # noqa: F401
+    import langchain_core.output_parsers  # noqa: F401
+    import langchain_core.prompts  # noqa: F401
+    import langchain_openai  # noqa: F401
+    import com.mhire.app.services.helper_bot.llm_callbacks  # noqa: F401
+
 class HelperBot:
     """Helper bot service for handling user queries with FAQ and LLM support"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        db_manager: Optional[DBManager] = None,
+        response_cache: Optional[ResponseCache] = None,
+        llm: Optional["BaseChatModel"] = None
+    ):
         try:
             # Initialize config singleton
             self.config = Config()
-            if not self.config.openai_api_key or not self.config.openai_model:
+            if llm is None and (not self.config.openai_api_key or not self.config.openai_model):
                 logger.error("OpenAI configuration missing")
                 raise ValueError("OpenAI configuration missing")
             
-            # Initialize database manager
-            self.db_manager = DBManager()
+            # Use the application's shared database manager when one is provided
+            self._owns_db_manager = db_manager is None
+            self.db_manager = db_manager or DBManager()
             
-            # Configure OpenAI
-            openai.api_key = self.config.openai_api_key
+            # Cache of generated answers for repeated FAQ misses
+            self.response_cache = response_cache or get_response_cache(self.config)
             
-            # Initialize LangChain components
-            self.llm = ChatOpenAI(
-                model_name=self.config.openai_model,
-                temperature=0.7,
-                max_tokens=300
+            # Offline-generated answers for frequent LLM-fallback questions, loaded at startup
+            self.precomputed_answers = PrecomputedAnswers(self.config.precomputed_answer_similarity)
+            # Data version the store was loaded from, and a running background reload
+            self._precomputed_version: Optional[str] = None
+            self._precomputed_reload: Optional[asyncio.Task] = None
+            
+            # Identical concurrent questions share one FAQ search and LLM call
+            self.inflight = SingleFlight(on_coalesced=COALESCED_REQUESTS.inc)
+            
+            # Admission control: FAQ lookups and LLM calls have separate slots and queues,
+            # so requests the FAQ answers never wait behind LLM-bound ones
+            self.request_limiter = ConcurrencyLimiter(
+                "faq",
+                max_concurrency=self.config.chat_max_concurrency,
+                max_queue=self.config.chat_max_queue,
+                retry_after=self.config.admission_retry_after_seconds
+            )
+            self.llm_limiter = ConcurrencyLimiter(
+                "llm",
+                max_concurrency=self.config.llm_max_concurrency,
+                max_queue=self.config.llm_max_queue,
+                retry_after=self.config.admission_retry_after_seconds
             )
             
-            # Define prompt template
-            self.prompt = PromptTemplate(
-                input_variables=["context", "query", "faq_results"],
-                template="""You are a helpful support agent for FixConnect app.
-                Context: {context}
-                User Query: {query}
-                FAQ Results: {faq_results}
-
-Instructions:
-1. If FAQ matches are provided above, check each one carefully to find the most relevant answer.
-2. If you find a matching FAQ answer, use it EXACTLY as written - do not modify it.
-3. Only generate a new answer if none of the FAQ answers are relevant to the query.
-4. Your response should be clear and concise (1-2 sentences).
-5. Do not include any formatting or prefixes (like "Answer:", "Response:", etc.).
-6. Focus on answering the exact question asked.
-
-Return your response now:"""
+            # Repeated slow or failed LLM calls switch the bot to FAQ-only answers for a while
+            self.llm_breaker = CircuitBreaker(
+                "llm",
+                failure_threshold=self.config.llm_breaker_failure_threshold,
+                recovery_seconds=self.config.llm_breaker_recovery_seconds,
+                slow_call_seconds=self.config.llm_slow_call_seconds
             )
             
-            # Create response chain
-            self.chain = (
-                self.prompt
-                | self.llm
-                | StrOutputParser()
+            # Opt-in speculative LLM calls for queries the FAQ is predicted to miss
+            self.miss_predictor = MissPredictor(self.config.speculative_llm_threshold)
+            self.speculation_counts: Dict[str, int] = {"started": 0, "used": 0, "skipped_busy": 0}
+            
+            # FAQ candidates are packed into the prompt within an input-token budget
+            self.prompt_builder = PromptBuilder(
+                TokenCounter(self.config.openai_model),
+                render_prompt=lambda query, faq_context: PROMPT_TEMPLATE.format(**self._llm_inputs(query, faq_context)),
+                input_token_budget=self.config.llm_input_token_budget,
+                answer_max_tokens=self.config.faq_answer_max_tokens,
+                min_output_tokens=self.config.llm_min_output_tokens,
+                max_output_tokens=self.config.llm_max_output_tokens
             )
             
+            # LangChain components are built on the first LLM call unless eager loading is configured
+            self._llm = llm
+            self._chain: Optional["Runnable"] = None
+            self._llm_callbacks: List[Any] = []
+            self.llm_load_seconds: Optional[float] = None
+            self.startup_report: Optional[StartupReport] = None
+            if not self.config.llm_lazy_load:
+                self._build_llm_stack()
+            
         except Exception as e:
             logger.error(f"HelperBot initialization failed: {str(e)}")
             raise
 
+    def _build_llm_stack(self) -> None:
+        """Import the LLM modules and create the model, prompt and response chain"""
+        start = time.perf_counter()
+        from langchain_core.output_parsers import StrOutputParser
+        from langchain_core.prompts import PromptTemplate
+        from com.mhire.app.services.helper_bot.llm_callbacks import TokenUsageCallback
+        
+        # Initialize LangChain components; a supplied chat model replaces OpenAI
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            from com.mhire.app.services.helper_bot.llm_http import get_llm_http_client, llm_http_timeout
+            
+            # Configure OpenAI; all calls share the worker's pooled keep-alive client
+            self._llm = ChatOpenAI(
+                model_name=self.config.openai_model,
+                api_key=self.config.openai_api_key,
+                base_url=self.config.openai_base_url,
+                temperature=0.7,
+                max_tokens=self.config.llm_max_output_tokens,
+                stream_usage=True,  # Report token usage for streamed responses too
+                http_async_client=get_llm_http_client(),
+                timeout=llm_http_timeout(self.config),
+                max_retries=0  # The shared transport retries with jittered backoff
+            )
+        
+        # Token usage is counted from the model's own usage reports
+        self._llm_callbacks = [TokenUsageCallback()]
+        
+        # Define prompt template
+        self.prompt = PromptTemplate(
+            input_variables=["context", "query", "faq_results"],
+            template=PROMPT_TEMPLATE
+        )
+        
+        # Create response chain
+        self._output_parser = StrOutputParser()
+        self._chain = (
+            self.prompt
+            | self._llm
+            | self._output_parser
+        )
+        self.llm_load_seconds = time.perf_counter() - start
+        if self.startup_report is not None:
+            self.startup_report.record("llm_stack", self.llm_load_seconds)
+        logger.info(f"LLM stack loaded in {self.llm_load_seconds * 1000:.1f} ms")
+
+    @property
+    def llm(self) -> "BaseChatModel":
+        if self._chain is None:
+            self._build_llm_stack()
+        return self._llm
+
+    @property
+    def chain(self) -> "Runnable":
+        if self._chain is None:
+            self._build_llm_stack()
+        return self._chain
+
+    @property
+    def llm_callbacks(self) -> List[Any]:
+        if self._chain is None:
+            self._build_llm_stack()
+        return self._llm_callbacks
+
+    def response_chain(self, max_tokens: int) -> "Runnable":
+        """Response chain with a per-request output token limit"""
+        if self._chain is None:
+            self._build_llm_stack()
+        return self.prompt | self._llm.bind(max_tokens=max_tokens) | self._output_parser
+
+    async def startup(self, report: Optional[StartupReport] = None) -> None:
+        """Warm the Mongo pool and FAQ data before the bot starts serving requests"""
+        report = report or StartupReport()
+        self.startup_report = report
+        if self.llm_load_seconds is not None:
+            report.record("llm_stack", self.llm_load_seconds)
+        
+        try:
+            with report.phase("mongo_warmup"):
+                await self.db_manager.warm_up(self.config.mongodb_warmup_connections)
+        except Exception as e:
+            # Connections are opened on demand if the warm-up fails
+            logger.error(f"MongoDB warm-up failed: {str(e)}")
+        
+        # Loading the tokenizer may read or download encoding files; keep that off the request path
+        with report.phase("tokenizer"):
+            await asyncio.to_thread(lambda: self.prompt_builder.counter.exact)
+        
+        try:
+            # The database search backend queries Mongo directly and needs no in-memory index
+            if self.config.faq_search_backend in ("memory", "snapshot"):
+                with report.phase("faq_index"):
+                    await self.db_manager.load_faq_index()
+        except Exception as e:
+            # The index is loaded lazily on the first search if startup loading fails
+            logger.error(f"FAQ index preload failed: {str(e)}")
+        
+        try:
+            if self.db_manager.precomputed_answers_collection is not None:
+                with report.phase("precomputed_answers"):
+                    await self.reload_precomputed_answers()
+        except Exception as e:
+            # Without precomputed answers every FAQ miss goes to the LLM
+            logger.error(f"Precomputed answers preload failed: {str(e)}")
+
+    async def reload_precomputed_answers(self) -> PrecomputedAnswers:
+        """Reload the precomputed answers, e.g. after the offline job has run"""
+        # Read before loading, so answers written during the load trigger another reload
+        version = await self.db_manager.data_version(PRECOMPUTED_ANSWERS_DATA, fresh=True)
+        entries = await self.db_manager.load_precomputed_answers()
+        # Swap the reference so in-flight lookups keep using the previous store
+        self.precomputed_answers = PrecomputedAnswers(self.config.precomputed_answer_similarity).build(entries)
+        self._precomputed_version = version
+        logger.info(f"Loaded {len(self.precomputed_answers)} precomputed answers")
+        return self.precomputed_answers
+
+    async def _refresh_precomputed_answers(self) -> None:
+        """Reload the precomputed answers in the background once answer_precompute has written new ones"""
+        if self.db_manager.precomputed_answers_collection is None:
+            return
+        if self._precomputed_reload is not None and not self._precomputed_reload.done():
+            return
+        version = await self.db_manager.data_version(PRECOMPUTED_ANSWERS_DATA)
+        if version is None or version == self._precomputed_version:
+            return
+        self._precomputed_reload = asyncio.create_task(self._reload_precomputed_in_background())
+
+    async def _reload_precomputed_in_background(self) -> None:
+        try:
+            await self.reload_precomputed_answers()
+        except Exception as e:
+            # Keep serving the current store and retry after the next check interval
+            logger.error(f"Failed to reload precomputed answers: {str(e)}")
+            await asyncio.sleep(self.config.data_version_check_seconds)
+
+    async def close(self) -> None:
+        """Release resources owned by the bot"""
+        await self.response_cache.close()
+        if self._owns_db_manager:
+            self.db_manager.close()
+
+    def check_admission(self) -> None:
+        """Raise ServiceOverloadedError if a new request would be rejected, e.g. before a stream starts"""
+        self.request_limiter.check()
+
+    def admission_stats(self) -> Dict[str, Any]:
+        """Per-stage load and rejection counts for this worker"""
+        return {
+            "faq": self.request_limiter.stats(),
+            "llm": self.llm_limiter.stats()
+        }
+
     async def get_response(self, query: str, user_type: UserType) -> ChatResponse:
+        """Get response from FAQ or LLM, coalescing identical in-flight requests"""
+        key = (normalize_text(query) or query.strip(), user_type)
+        return await self.inflight.do(key, lambda: self._answer(query, user_type))
+
+    async def _answer(self, query: str, user_type: UserType) -> ChatResponse:
         """Get response from FAQ or LLM with improved FAQ prioritization"""
+        deadline = time.monotonic() + self.config.request_budget_seconds
+        prediction, speculation = self._start_speculation(query, user_type, deadline)
+        faq_results: Optional[List[Dict[str, Any]]] = None
+        faq_response: Optional[ChatResponse] = None
         try:
-            # Search FAQ first
-            faq_results = await self.db_manager.search_faq(query, user_type)
-            
-            # Log all FAQ results for debugging
-            logger.info(f"Query: '{query}' | User type: {user_type.value} | Found {len(faq_results) if faq_results else 0} FAQ results")
-            if faq_results:
-                for i, faq in enumerate(faq_results):
-                    logger.info(f"FAQ #{i+1}: Q: '{faq.get('question', '')}' | Score: {faq.get('textScore', 0) or faq.get('score', 0):.2f}")
+            # Search FAQ first; the FAQ slot is released before any LLM wait
+            with profile_span("faq_stage"):
+                async with self.request_limiter.slot():
+                    faq_results = await self._search_faq(query, user_type)
             
             # If we have any FAQ matches, prioritize them based on confidence
-            if faq_results and len(faq_results) > 0:
-                best_match = faq_results[0]
-                best_score = best_match.get("textScore", 0) or best_match.get("score", 0)
-                
-                # High confidence match (exact or near-exact)
-                if best_score >= 1.5:
-                    logger.info(f"Using high confidence FAQ match: {best_score:.2f}")
-                    return ChatResponse(
-                        message=best_match["answer"],
-                        source="faq",
-                        confidence_score=min(best_score / 3, 1.0)  # Normalize score
-                    )
-                
-                # Medium confidence match
-                if best_score >= 0.8:
-                    logger.info(f"Using medium confidence FAQ match: {best_score:.2f}")
-                    return ChatResponse(
-                        message=best_match["answer"],
-                        source="faq",
-                        confidence_score=min(best_score / 3, 0.9)  # Normalize score
-                    )
+            faq_response = self._faq_response(faq_results)
+            if prediction is not None:
+                # Only an empty result can use the speculative answer, so that is what counts as a miss
+                self.miss_predictor.record(query, user_type, prediction, missed=not faq_results)
+            if faq_response is not None:
+                return faq_response
+            
+            # The speculative prompt carried no FAQ candidates, so it only stands in for an empty result
+            if speculation is not None and not faq_results:
+                self._log_llm_fallback(query, user_type)
+                return await speculation.result()
+            
+            return await self._generate_response(query, user_type, faq_results, deadline)
                 
-                # Lower confidence but still usable match
-                if best_score >= 0.5:
-                    logger.info(f"Using lower confidence FAQ match: {best_score:.2f}")
-                    return ChatResponse(
-                        message=best_match["answer"],
-                        source="faq",
-                        confidence_score=min(best_score / 3, 0.7)  # Normalize score
-                    )
+        except Exception as e:
+            logger.error(f"Error getting response: {str(e)}")
+            raise
+        finally:
+            if speculation is not None:
+                if faq_response is not None:
+                    speculation.discard("faq_hit")
+                else:
+                    speculation.discard("faq_context" if faq_results else "error")
+    
+    def _start_speculation(
+        self,
+        query: str,
+        user_type: UserType,
+        deadline: float
+    ) -> Tuple[Optional[MissPrediction], Optional[SpeculativeCall]]:
+        """Start the LLM call alongside the FAQ search when a miss is predicted and capacity is spare"""
+        if not self.config.speculative_llm:
+            return None, None
+        prediction = self.miss_predictor.predict(query, user_type, self.db_manager.term_coverage(query, user_type))
+        if not self.miss_predictor.should_speculate(prediction):
+            return prediction, None
+        
+        # Speculation only uses idle LLM slots and never probes a recovering circuit
+        limiter = self.llm_limiter
+        if limiter.active + limiter.waiting >= limiter.max_concurrency or self.llm_breaker.state != "closed":
+            self.speculation_counts["skipped_busy"] += 1
+            return prediction, None
+        
+        self.speculation_counts["started"] += 1
+        logger.debug("Speculative LLM call for '%s' (miss probability %.2f)", query, prediction.probability)
+        deferred_metrics: List[Callable[[], None]] = []
+        task = asyncio.create_task(
+            self._generate_response(query, user_type, [], deadline, deferred_metrics=deferred_metrics)
+        )
+        return prediction, SpeculativeCall(task, self.speculation_counts, deferred_metrics)
+    
+    def speculation_stats(self) -> Optional[Dict[str, Any]]:
+        """Speculative call outcomes and miss-predictor accuracy, or None when speculation is off"""
+        if not self.config.speculative_llm:
+            return None
+        return {**self.speculation_counts, "predictor": self.miss_predictor.stats()}
+
+    async def get_batch_responses(
+        self,
+        requests: List[Tuple[str, UserType]]
+    ) -> List[Union[ChatResponse, Exception]]:
+        """Answer many queries, deduplicating them and bounding concurrent LLM calls
+
+        Results are returned in input order; a failed item holds its exception.
+        """
+        deadline = time.monotonic() + self.config.request_budget_seconds
+        
+        # Identical (message, user type) pairs are answered once
+        unique = list(dict.fromkeys((query.strip(), user_type) for query, user_type in requests))
+        results: Dict[Tuple[str, UserType], Union[ChatResponse, Exception]] = {}
+        
+        # Resolve every FAQ lookup first, under one FAQ slot; these never wait on the LLM
+        misses: List[Tuple[Tuple[str, UserType], List[Dict[str, Any]]]] = []
+        async with self.request_limiter.slot():
+            for key in unique:
+                query, user_type = key
+                try:
+                    faq_results = await self._search_faq(query, user_type)
+                    faq_response = self._faq_response(faq_results)
+                    if faq_response is not None:
+                        results[key] = faq_response
+                    else:
+                        misses.append((key, faq_results))
+                except Exception as e:
+                    logger.error(f"Batch FAQ search failed: {str(e)}")
+                    results[key] = e
+        
+        # Generate the remaining answers concurrently under the configured limit
+        semaphore = asyncio.Semaphore(max(self.config.batch_llm_concurrency, 1))
+        
+        async def generate(key: Tuple[str, UserType], faq_results: List[Dict[str, Any]]) -> ChatResponse:
+            async with semaphore:
+                return await self._generate_response(key[0], key[1], faq_results, deadline)
+        
+        generated = await asyncio.gather(
+            *(generate(key, faq_results) for key, faq_results in misses),
+            return_exceptions=True
+        )
+        for (key, _), result in zip(misses, generated):
+            results[key] = result
+        
+        logger.info(
+            "Batch of %d requests: %d unique, %d sent to LLM",
+            len(requests), len(unique), len(misses)
+        )
+        return [results[(query.strip(), user_type)] for query, user_type in requests]
+
+    async def stream_response(self, query: str, user_type: UserType) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (event, data) pairs: FAQ and cached answers as one token event, LLM answers token by token, then a done event"""
+        deadline = time.monotonic() + self.config.request_budget_seconds
+        try:
+            with profile_span("faq_stage"):
+                async with self.request_limiter.slot():
+                    faq_results = await self._search_faq(query, user_type)
+            
+            faq_response = self._faq_response(faq_results)
+            if faq_response is not None:
+                yield "token", {"text": faq_response.message}
+                yield "done", self._done_event(faq_response)
+                return
             
-            # Format FAQ results for LLM context
-            faq_context = "Available FAQ matches:\n" if faq_results else "No FAQ matches found."
-            if faq_results:
-                for faq in faq_results:
-                    faq_context += f"Question: {faq['question']}\nAnswer: {faq['answer']}\nScore: {faq.get('textScore', 0) or faq.get('score', 0):.2f}\n\n"
+            built_prompt, llm_confidence = self._llm_context(query, user_type, faq_results)
+            await self._refresh_precomputed_answers()
+            precomputed = self._precomputed_response(query, user_type, llm_confidence)
+            if precomputed is not None:
+                yield "token", {"text": precomputed.message}
+                yield "done", self._done_event(precomputed)
+                return
             
-            # Log that we're falling back to LLM
-            logger.info(f"No suitable FAQ match found for '{query}', falling back to LLM")
+            cache_key = make_cache_key(query, user_type, built_prompt.faq_context)
+            cached_response = await self._cached_response(cache_key)
+            if cached_response is not None:
+                logger.info("Serving LLM response from cache")
+                yield "token", {"text": cached_response}
+                yield "done", self._done_event(ChatResponse(
+                    message=cached_response,
+                    source="gpt",
+                    confidence_score=llm_confidence,
+                    cached=True
+                ))
+                return
             
-            # Generate LLM response
             try:
-                # Calculate a dynamic confidence score for LLM responses
-                # If we have low-scoring FAQ matches, the LLM confidence should be lower
-                llm_confidence = 0.4  # Base confidence for LLM
-                if faq_results and len(faq_results) > 0:
-                    best_score = faq_results[0].get("textScore", 0) or faq_results[0].get("score", 0)
-                    # If we have FAQ results with scores close to our threshold, reduce LLM confidence
-                    if best_score >= 0.3:
-                        llm_confidence = 0.3
-                
-                llm_response = await self.chain.ainvoke({
-                    "context": "No suitable FAQ match found, generating a response.",
-                    "query": query,
-                    "faq_results": faq_context
-                })
-                
-                logger.info(f"Generated LLM response with confidence: {llm_confidence:.2f}")
-                
+                acquired = await self._acquire_llm_slot(deadline)
+            except ServiceOverloadedError:
+                # Headers are already sent, so answer without the LLM rather than fail
+                acquired = False
+            remaining = self._llm_budget(deadline) if acquired else None
+            if remaining is None:
+                if acquired:
+                    self.llm_limiter.release()
+                degraded = self._degraded_response(faq_results)
+                yield "token", {"text": degraded.message}
+                yield "done", self._done_event(degraded)
+                return
+            
+            # Stream tokens as the model produces them, each within the remaining budget
+            chunks = []
+            start = time.perf_counter()
+            stream = None
+            try:
+                with track_latency(LLM_LATENCY, mode="stream"):
+                    stream = self.response_chain(built_prompt.max_output_tokens).astream(
+                        self._llm_inputs(query, built_prompt.faq_context),
+                        config={"callbacks": self.llm_callbacks}
+                    )
+                    while True:
+                        try:
+                            chunk = await asyncio.wait_for(
+                                stream.__anext__(),
+                                timeout=max(deadline - time.monotonic(), 0.0)
+                            )
+                        except StopAsyncIteration:
+                            break
+                        if chunk:
+                            chunks.append(chunk)
+                            yield "token", {"text": chunk}
+            except asyncio.CancelledError:
+                self.llm_breaker.abandon()
+                raise
+            except Exception as e:
+                self._record_llm_failure(e, remaining)
+                if chunks:
+                    # Tokens were already sent; the router reports the failure in-band
+                    raise
+                degraded = self._degraded_response(faq_results)
+                yield "token", {"text": degraded.message}
+                yield "done", self._done_event(degraded)
+                return
+            finally:
+                if stream is not None:
+                    await stream.aclose()
+                self.llm_limiter.release()
+            self.llm_breaker.record_success(time.perf_counter() - start)
+            llm_response = "".join(chunks)
+            await self.response_cache.set(cache_key, llm_response)
+            
+            logger.info("Streamed LLM response with confidence: %.2f", llm_confidence)
+            yield "done", self._done_event(ChatResponse(
+                message=llm_response,
+                source="gpt",
+                confidence_score=llm_confidence
+            ))
+            
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            raise
+
+    async def _search_faq(self, query: str, user_type: UserType) -> List[Dict[str, Any]]:
+        """Search the FAQ and log the candidates"""
+        with track_latency(FAQ_SEARCH_LATENCY, phase="total"):
+            faq_results = await self.db_manager.search_faq(query, user_type)
+        
+        result_count = len(faq_results) if faq_results else 0
+        logger.info(
+            "Query: '%s' | User type: %s | Found %d FAQ results",
+            query, user_type.value, result_count,
+            extra={"user_type": user_type.value, "faq_results": result_count}
+        )
+        # Per-candidate details are DEBUG so production can sample them
+        if faq_results and logger.isEnabledFor(logging.DEBUG):
+            for i, faq in enumerate(faq_results):
+                logger.debug(
+                    "FAQ #%d: Q: '%s' | Score: %.2f",
+                    i + 1, faq.get("question", ""), faq.get("textScore", 0) or faq.get("score", 0)
+                )
+        return faq_results
+
+    def _faq_response(self, faq_results: List[Dict[str, Any]]) -> Optional[ChatResponse]:
+        """Return the best FAQ answer if it clears a confidence threshold"""
+        if not faq_results:
+            return None
+        
+        best_match = faq_results[0]
+        best_score = best_match.get("textScore", 0) or best_match.get("score", 0)
+        
+        # High confidence match (exact or near-exact)
+        if best_score >= 1.5:
+            logger.info("Using high confidence FAQ match: %.2f", best_score)
+            return ChatResponse(
+                message=best_match["answer"],
+                source="faq",
+                confidence_score=min(best_score / 3, 1.0)  # Normalize score
+            )
+        
+        # Medium confidence match
+        if best_score >= 0.8:
+            logger.info("Using medium confidence FAQ match: %.2f", best_score)
+            return ChatResponse(
+                message=best_match["answer"],
+                source="faq",
+                confidence_score=min(best_score / 3, 0.9)  # Normalize score
+            )
+        
+        # Lower confidence but still usable match
+        if best_score >= 0.5:
+            logger.info("Using lower confidence FAQ match: %.2f", best_score)
+            return ChatResponse(
+                message=best_match["answer"],
+                source="faq",
+                confidence_score=min(best_score / 3, 0.7)  # Normalize score
+            )
+        
+        return None
+
+    def _llm_context(
+        self,
+        query: str,
+        user_type: UserType,
+        faq_results: List[Dict[str, Any]],
+        deferred_metrics: Optional[List[Callable[[], None]]] = None
+    ) -> Tuple[BuiltPrompt, float]:
+        """Build the token-budgeted FAQ context for the prompt and pick the LLM confidence score
+
+        A speculative call, which passes deferred_metrics, logs its fallback and counts its
+        prompt only once its answer is used.
+        """
+        with profile_span("prompt_build"):
+            built_prompt = self.prompt_builder.build(query, faq_results or [])
+        self._record_metric(deferred_metrics, lambda: LLM_PROMPT_TOKENS.observe(built_prompt.prompt_tokens))
+        logger.info(
+            "Prompt built - ~%d tokens, %d of %d FAQ candidates (%d truncated), max_tokens %d",
+            built_prompt.prompt_tokens, built_prompt.candidates_included, len(faq_results or []),
+            built_prompt.candidates_truncated, built_prompt.max_output_tokens,
+            extra={
+                "prompt_tokens_estimated": built_prompt.prompt_tokens,
+                "max_output_tokens": built_prompt.max_output_tokens
+            }
+        )
+        
+        if deferred_metrics is None:
+            self._log_llm_fallback(query, user_type)
+        
+        # Calculate a dynamic confidence score for LLM responses
+        # If we have low-scoring FAQ matches, the LLM confidence should be lower
+        llm_confidence = 0.4  # Base confidence for LLM
+        if faq_results:
+            best_score = faq_results[0].get("textScore", 0) or faq_results[0].get("score", 0)
+            # If we have FAQ results with scores close to our threshold, reduce LLM confidence
+            if best_score >= 0.3:
+                llm_confidence = 0.3
+        
+        return built_prompt, llm_confidence
+
+    @staticmethod
+    def _log_llm_fallback(query: str, user_type: UserType) -> None:
+        """Log that we're falling back to LLM; answer_precompute mines these records"""
+        logger.info(
+            "No suitable FAQ match found for '%s', falling back to LLM", query,
+            extra={"event": "llm_fallback", "query": query, "user_type": user_type.value}
+        )
+
+    def _precomputed_response(self, query: str, user_type: UserType, confidence: float) -> Optional[ChatResponse]:
+        """Answer from the offline-generated store, checked before the cache and the LLM"""
+        with profile_span("precomputed_lookup"):
+            entry = self.precomputed_answers.lookup(query, user_type)
+        if entry is None:
+            return None
+        logger.info("Serving precomputed answer for '%s'", entry.get("representative", ""))
+        return ChatResponse(
+            message=entry["answer"],
+            source="precomputed",
+            confidence_score=confidence
+        )
+
+    async def precompute_answer(self, query: str, user_type: UserType) -> Optional[str]:
+        """Generate an answer offline with the request-time prompt and chain
+
+        Returns None when the FAQ now answers the query on its own.
+        """
+        faq_results = await self._search_faq(query, user_type)
+        if self._faq_response(faq_results) is not None:
+            return None
+        built_prompt, _ = self._llm_context(query, user_type, faq_results)
+        return await self.response_chain(built_prompt.max_output_tokens).ainvoke(
+            self._llm_inputs(query, built_prompt.faq_context),
+            config={"callbacks": self.llm_callbacks}
+        )
+
+    @staticmethod
+    def _record_metric(deferred_metrics: Optional[List[Callable[[], None]]], update: Callable[[], None]) -> None:
+        """Apply a metric update now, or hold it until a speculative answer is used"""
+        if deferred_metrics is None:
+            update()
+        else:
+            deferred_metrics.append(update)
+
+    async def _cached_response(
+        self,
+        cache_key: str,
+        deferred_metrics: Optional[List[Callable[[], None]]] = None
+    ) -> Optional[str]:
+        """Look up a cached LLM answer and count the hit or miss"""
+        with profile_span("response_cache"):
+            cached_response = await self.response_cache.get(cache_key)
+        result = "miss" if cached_response is None else "hit"
+        self._record_metric(deferred_metrics, lambda: RESPONSE_CACHE_REQUESTS.labels(result=result).inc())
+        return cached_response
+
+    @staticmethod
+    def _llm_inputs(query: str, faq_context: str) -> Dict[str, str]:
+        """Prompt variables for the response chain"""
+        return {
+            "context": "No suitable FAQ match found, generating a response.",
+            "query": query,
+            "faq_results": faq_context
+        }
+
+    @staticmethod
+    def _done_event(response: ChatResponse) -> Dict[str, Any]:
+        """Final stream event carrying the response metadata"""
+        return {
+            "source": response.source,
+            "confidence_score": response.confidence_score,
+            "cached": response.cached
+        }
+
+    async def _generate_response(
+        self,
+        query: str,
+        user_type: UserType,
+        faq_results: List[Dict[str, Any]],
+        deadline: float,
+        deferred_metrics: Optional[List[Callable[[], None]]] = None
+    ) -> ChatResponse:
+        """Generate an answer with the LLM, using the FAQ candidates as context
+
+        Falls back to a degraded answer when the LLM misses the deadline, fails, or its circuit is open.
+        """
+        built_prompt, llm_confidence = self._llm_context(query, user_type, faq_results, deferred_metrics)
+        await self._refresh_precomputed_answers()
+        precomputed = self._precomputed_response(query, user_type, llm_confidence)
+        if precomputed is not None:
+            return precomputed
+        
+        # Generate LLM response
+        try:
+            # Serve repeated questions from the cache instead of calling the LLM again
+            cache_key = make_cache_key(query, user_type, built_prompt.faq_context)
+            cached_response = await self._cached_response(cache_key, deferred_metrics)
+            if cached_response is not None:
+                logger.info("Serving LLM response from cache")
                 return ChatResponse(
-                    message=llm_response,
+                    message=cached_response,
                     source="gpt",
-                    confidence_score=llm_confidence
+                    confidence_score=llm_confidence,
+                    cached=True
                 )
-                
-            except Exception as e:
-                logger.error(f"LLM response generation failed: {str(e)}")
-                raise
-                
+            
+            llm_response = await self._invoke_llm(
+                self._llm_inputs(query, built_prompt.faq_context),
+                built_prompt.max_output_tokens,
+                deadline
+            )
+            if llm_response is None:
+                return self._degraded_response(faq_results)
+            await self.response_cache.set(cache_key, llm_response)
+            
+            logger.info("Generated LLM response with confidence: %.2f", llm_confidence)
+            
+            return ChatResponse(
+                message=llm_response,
+                source="gpt",
+                confidence_score=llm_confidence
+            )
+            
         except Exception as e:
-            logger.error(f"Error getting response: {str(e)}")
-            raise
\ No newline at end of file
+            logger.error(f"LLM response generation failed: {str(e)}")
+            raise
+
+    async def _acquire_llm_slot(self, deadline: float) -> bool:
+        """Wait for an LLM slot while enough of the request budget is left
+
+        Raises ServiceOverloadedError when the LLM queue is full.
+        """
+        wait = deadline - time.monotonic() - self.config.llm_min_budget_seconds
+        if wait <= 0:
+            LLM_FAILURES.labels(reason="budget_exhausted").inc()
+            logger.warning("Skipping LLM call: request budget spent before queueing")
+            return False
+        with profile_span("llm_slot_wait"):
+            acquired = await self.llm_limiter.acquire(timeout=wait)
+        if not acquired:
+            LLM_FAILURES.labels(reason="queue_timeout").inc()
+            logger.warning("Skipping LLM call: no LLM slot freed up within the request budget")
+            return False
+        return True
+
+    def _llm_budget(self, deadline: float) -> Optional[float]:
+        """Seconds left for an LLM call, or None if the budget is spent or the circuit is open"""
+        remaining = deadline - time.monotonic()
+        if remaining < self.config.llm_min_budget_seconds:
+            LLM_FAILURES.labels(reason="budget_exhausted").inc()
+            logger.warning("Skipping LLM call: %.2fs of the request budget left", remaining)
+            return None
+        if not self.llm_breaker.allow_request():
+            LLM_FAILURES.labels(reason="circuit_open").inc()
+            logger.warning("Skipping LLM call: circuit is open")
+            return None
+        return remaining
+
+    def _record_llm_failure(self, error: Exception, timeout: float) -> None:
+        """Count a failed or timed-out LLM call against the circuit breaker"""
+        if isinstance(error, asyncio.TimeoutError):
+            LLM_FAILURES.labels(reason="timeout").inc()
+            logger.warning("LLM call cancelled after the remaining budget of %.2fs", timeout)
+            self.llm_breaker.record_failure("timeout")
+        else:
+            LLM_FAILURES.labels(reason="error").inc()
+            logger.error(f"LLM call failed: {str(error)}")
+            self.llm_breaker.record_failure(type(error).__name__)
+
+    async def _invoke_llm(self, inputs: Dict[str, str], max_tokens: int, deadline: float) -> Optional[str]:
+        """Run the response chain within the request deadline; None if the LLM is unavailable"""
+        if not await self._acquire_llm_slot(deadline):
+            return None
+        try:
+            remaining = self._llm_budget(deadline)
+            if remaining is None:
+                return None
+            
+            start = time.perf_counter()
+            try:
+                with track_latency(LLM_LATENCY, mode="invoke"):
+                    llm_response = await asyncio.wait_for(
+                        self.response_chain(max_tokens).ainvoke(inputs, config={"callbacks": self.llm_callbacks}),
+                        timeout=remaining
+                    )
+            except asyncio.CancelledError:
+                self.llm_breaker.abandon()
+                raise
+            except Exception as e:
+                self._record_llm_failure(e, remaining)
+                return None
+            
+            self.llm_breaker.record_success(time.perf_counter() - start)
+            return llm_response
+        finally:
+            self.llm_limiter.release()
+
+    def _degraded_response(self, faq_results: List[Dict[str, Any]]) -> ChatResponse:
+        """Best answer available without the LLM: the top FAQ candidate, else a canned message"""
+        if faq_results:
+            best_match = faq_results[0]
+            best_score = best_match.get("textScore", 0) or best_match.get("score", 0)
+            if best_score > 0:
+                logger.info("Serving degraded FAQ match: %.2f", best_score)
+                return ChatResponse(
+                    message=best_match["answer"],
+                    source="faq_degraded",
+                    confidence_score=min(best_score / 3, 0.3)
+                )
+        
+        logger.info("Serving fallback message while the LLM is unavailable")
+        return ChatResponse(
+            message=self.config.degraded_response_message,
+            source="fallback",
+            confidence_score=0.0
+        )
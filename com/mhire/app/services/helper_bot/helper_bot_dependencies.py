@@ -0,0 +1,14 @@
+from fastapi import Request
+
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.services.helper_bot.helper_bot import HelperBot
+
+
+def get_helper_bot(request: Request) -> HelperBot:
+    """Return the worker's shared HelperBot created during application startup"""
+    return request.app.state.helper_bot
+
+
+def get_db_manager(request: Request) -> DBManager:
+    """Return the worker's shared DBManager created during application startup"""
+    return request.app.state.db_manager
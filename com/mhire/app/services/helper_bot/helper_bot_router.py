@@ -1,46 +1,176 @@
+import json
 import logging
+from typing import Any, AsyncIterator, Dict
 
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from com.mhire.app.services.helper_bot.helper_bot import HelperBot
-from com.mhire.app.services.helper_bot.helper_bot_schema import ChatRequest, ChatResponse
+from com.mhire.app.services.helper_bot.helper_bot_dependencies import get_helper_bot
+from com.mhire.app.common.exceptions import BaseError, ServiceOverloadedError
+from com.mhire.app.common.metrics import record_response
+from com.mhire.app.common.network_responses import NetworkResponse
+from com.mhire.app.services.helper_bot.helper_bot_schema import (
+    ChatBatchItem,
+    ChatBatchRequest,
+    ChatBatchResponse,
+    ChatRequest,
+    ChatResponse
+)
 
 logger = logging.getLogger(__name__)
 
+def _overloaded_response(error: ServiceOverloadedError, http_request: Request) -> JSONResponse:
+    """503 telling the client when to retry"""
+    logger.warning(
+        "Request rejected - %s", error.message,
+        extra={"path": http_request.url.path, "retry_after": error.retry_after}
+    )
+    return NetworkResponse.error_response(
+        error,
+        resource=http_request.url.path,
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+
 router = APIRouter(
     prefix="/api/v1",
     tags=["chat"]
 )
 
 @router.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest, http_request: Request):
+async def chat(
+    request: ChatRequest,
+    http_request: Request,
+    bot: HelperBot = Depends(get_helper_bot)
+):
     """Chat endpoint for interacting with the helper bot"""
     try:
         # Log incoming request
         logger.info(
-            f"Chat request - User Type: {request.user_type}, "
-            f"Message Length: {len(request.message)}, "
-            f"Client IP: {http_request.client.host}"
+            "Chat request - User Type: %s, Message Length: %d, Client IP: %s",
+            request.user_type.value, len(request.message), http_request.client.host,
+            extra={"user_type": request.user_type.value, "message_length": len(request.message)}
         )
         
-        # Initialize helper bot
-        bot = HelperBot()
-        
         # Process chat request
         response = await bot.get_response(
             query=request.message,
             user_type=request.user_type
         )
         
+        record_response(request.user_type.value, response.source, response.confidence_score)
+        
         # Log successful response
         logger.info(
-            f"Chat response - Source: {response.source}, "
-            f"Confidence: {response.confidence_score}"
+            "Chat response - Source: %s, Confidence: %s",
+            response.source, response.confidence_score,
+            extra={"source": response.source, "confidence": response.confidence_score, "cached": response.cached}
         )
         
         return response
         
+    except ServiceOverloadedError as e:
+        return _overloaded_response(e, http_request)
     except Exception as e:
         logger.error(f"Error in chat request: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+
+@router.post("/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch(
+    request: ChatBatchRequest,
+    http_request: Request,
+    bot: HelperBot = Depends(get_helper_bot)
+):
+    """Batch chat endpoint answering several queries in one call"""
+    try:
+        logger.info(
+            "Chat batch request - Items: %d, Client IP: %s",
+            len(request.items), http_request.client.host,
+            extra={"items": len(request.items)}
+        )
+        
+        results = await bot.get_batch_responses(
+            [(item.message, item.user_type) for item in request.items]
+        )
+        
+        # Report failures per item instead of failing the whole batch
+        items = []
+        for item, result in zip(request.items, results):
+            if isinstance(result, ChatResponse):
+                record_response(item.user_type.value, result.source, result.confidence_score)
+                items.append(ChatBatchItem(response=result))
+            elif isinstance(result, BaseError):
+                items.append(ChatBatchItem(error=result.message))
+            else:
+                items.append(ChatBatchItem(error="Failed to generate response"))
+        
+        failed = sum(1 for item in items if item.error)
+        logger.info(
+            "Chat batch response - Items: %d, Failed: %d",
+            len(items), failed,
+            extra={"items": len(items), "failed": failed}
+        )
+        
+        return ChatBatchResponse(results=items)
+        
+    except ServiceOverloadedError as e:
+        return _overloaded_response(e, http_request)
+    except Exception as e:
+        logger.error(f"Error in chat batch request: {str(e)}")
+        raise
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one server-sent event"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    http_request: Request,
+    bot: HelperBot = Depends(get_helper_bot)
+):
+    """Chat endpoint that streams the answer as server-sent events"""
+    logger.info(
+        "Chat stream request - User Type: %s, Message Length: %d, Client IP: %s",
+        request.user_type.value, len(request.message), http_request.client.host,
+        extra={"user_type": request.user_type.value, "message_length": len(request.message)}
+    )
+    
+    # Shed load before the 200 and event-stream headers go out
+    try:
+        bot.check_admission()
+    except ServiceOverloadedError as e:
+        return _overloaded_response(e, http_request)
+    
+    async def event_stream() -> AsyncIterator[str]:
+        try:
+            async for event, data in bot.stream_response(
+                query=request.message,
+                user_type=request.user_type
+            ):
+                if event == "done":
+                    record_response(request.user_type.value, data["source"], data["confidence_score"])
+                    logger.info(
+                        "Chat stream response - Source: %s, Confidence: %s",
+                        data["source"], data["confidence_score"],
+                        extra={"source": data["source"], "confidence": data["confidence_score"]}
+                    )
+                yield _sse_event(event, data)
+                
+        except Exception as e:
+            # Headers are already sent, so report the failure in-band
+            logger.error(f"Error in chat stream request: {str(e)}")
+            yield _sse_event("error", {"message": "Failed to generate response"})
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field
+from typing import List, Optional
 from enum import Enum
 
 class UserType(str, Enum):
@@ -25,7 +25,7 @@ class ChatResponse(BaseModel):
     )
     source: str = Field(
         "faq",
-        description="Source of the response: 'faq' or 'gpt'"
+        description="Source of the response: 'faq', 'gpt', 'precomputed', or 'faq_degraded' / 'fallback' while the LLM is unavailable"
     )
     confidence_score: Optional[float] = Field(
         None,
@@ -33,6 +33,64 @@ class ChatResponse(BaseModel):
         ge=0.0,
         le=1.0
     )
+    cached: bool = Field(
+        False,
+        description="Whether the answer was served from the response cache"
+    )
+
+class ChatBatchRequest(BaseModel):
+    items: List[ChatRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Chat requests to answer, max 100 items"
+    )
+
+class ChatBatchItem(BaseModel):
+    response: Optional[ChatResponse] = Field(
+        None,
+        description="Response for the item, absent if it failed"
+    )
+    error: Optional[str] = Field(
+        None,
+        description="Error message if the item failed"
+    )
+
+class ChatBatchResponse(BaseModel):
+    results: List[ChatBatchItem] = Field(
+        ...,
+        description="Results in the same order as the request items"
+    )
+
+class FAQRecord(BaseModel):
+    """One FAQ entry as accepted by bulk ingestion; nested field names are accepted too"""
+    model_config = ConfigDict(str_strip_whitespace=True)
+
+    question: str = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        validation_alias=AliasChoices("question", "question_text"),
+        description="Question text"
+    )
+    answer: str = Field(
+        ...,
+        min_length=1,
+        max_length=10000,
+        validation_alias=AliasChoices("answer", "answer_text"),
+        description="Answer text"
+    )
+    category: str = Field(
+        ...,
+        min_length=1,
+        max_length=200,
+        validation_alias=AliasChoices("category", "category_name"),
+        description="Category the question is listed under"
+    )
+    user_type: UserType = Field(
+        ...,
+        description="Type of user the entry is for"
+    )
 
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error code or identifier")
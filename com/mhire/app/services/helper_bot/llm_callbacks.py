@@ -0,0 +1,38 @@
+import logging
+from typing import Any, Dict, Tuple
+
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from com.mhire.app.common.metrics import record_token_usage
+
+logger = logging.getLogger(__name__)
+
+
+def token_usage(response: LLMResult) -> Tuple[int, int]:
+    """Extract (prompt, completion) token counts from an LLM result"""
+    usage: Dict[str, Any] = (response.llm_output or {}).get("token_usage") or {}
+    if usage:
+        return usage.get("prompt_tokens", 0) or 0, usage.get("completion_tokens", 0) or 0
+
+    # Streaming results report usage on the message instead
+    prompt_tokens = completion_tokens = 0
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+            prompt_tokens += metadata.get("input_tokens", 0)
+            completion_tokens += metadata.get("output_tokens", 0)
+    return prompt_tokens, completion_tokens
+
+
+class TokenUsageCallback(AsyncCallbackHandler):
+    """LangChain callback that counts prompt and completion tokens reported by the model"""
+
+    async def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        prompt_tokens, completion_tokens = token_usage(response)
+        record_token_usage(prompt_tokens, completion_tokens)
+        logger.info(
+            "LLM token usage - Prompt: %d, Completion: %d",
+            prompt_tokens, completion_tokens,
+            extra={"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens}
+        )
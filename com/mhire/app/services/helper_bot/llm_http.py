@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import os
+import random
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import httpx
+
+from com.mhire.app.common.metrics import LLM_HTTP_CONNECTIONS, LLM_HTTP_CONNECTIONS_OPENED, LLM_HTTP_RETRIES
+from com.mhire.app.common.profiling import current_profile
+from com.mhire.app.config.config import Config
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: rate limiting and transient upstream failures
+_RETRYABLE_STATUS = frozenset({408, 409, 429, 500, 502, 503, 504})
+
+# Failures while connecting, before any of the request was sent. Later failures, e.g. a
+# dropped connection, may come after the API accepted a completion, so a retry could bill twice
+_RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+
+class RetryingTransport(httpx.AsyncBaseTransport):
+    """Connection-pooling transport that retries transient failures with jittered backoff
+
+    Backoff is "full jitter": a random delay up to an exponentially growing cap, or the
+    server's Retry-After when it sends one, so retries from many workers do not align.
+
+    Pool occupancy comes from httpcore's connection pool, which httpx does not expose
+    publicly; those reads are guarded and report nothing if the internals change, so no
+    particular httpx or httpcore version is required.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncHTTPTransport,
+        limits: httpx.Limits,
+        http2: bool,
+        max_retries: int,
+        backoff_seconds: float,
+        max_backoff_seconds: float
+    ):
+        self._transport = transport
+        self.limits = limits
+        self.http2 = http2
+        self.max_retries = max(max_retries, 0)
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.requests = 0
+        self.retries = 0
+        self.in_flight = 0
+        self.connections_opened = 0
+        self._known_connections: Set[int] = set()
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            try:
+                retry_after = float(response.headers.get("retry-after", ""))
+                return min(max(retry_after, 0.0), self.max_backoff_seconds)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_backoff_seconds, self.backoff_seconds * 2 ** attempt))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        profile = current_profile()
+        start = time.perf_counter()
+        try:
+            attempt = 0
+            while True:
+                try:
+                    response = await self._transport.handle_async_request(request)
+                except _RETRYABLE_ERRORS as e:
+                    if attempt >= self.max_retries:
+                        raise
+                    reason = type(e).__name__
+                    delay = self._backoff(attempt)
+                else:
+                    if response.status_code not in _RETRYABLE_STATUS or attempt >= self.max_retries:
+                        return response
+                    reason = str(response.status_code)
+                    delay = self._backoff(attempt, response)
+                    await response.aclose()
+
+                attempt += 1
+                self.retries += 1
+                LLM_HTTP_RETRIES.labels(reason=reason).inc()
+                logger.warning(
+                    "Retrying LLM API request (%s, attempt %d of %d) in %.2fs",
+                    reason, attempt, self.max_retries, delay
+                )
+                await asyncio.sleep(delay)
+        finally:
+            self.in_flight -= 1
+            self._update_pool_metrics()
+            if profile is not None:
+                # Until the response headers, retries included; the rest of LLM time is client-side
+                profile.add_span(f"llm_http{request.url.path}", start, time.perf_counter() - start)
+
+    def _pool(self) -> Any:
+        return getattr(self._transport, "_pool", None)
+
+    def _pool_connections(self) -> List[Any]:
+        try:
+            return list(getattr(self._pool(), "connections", None) or [])
+        except Exception:
+            return []
+
+    @staticmethod
+    def _flag(item: Any, name: str) -> bool:
+        """A boolean state of a pool internal, whether exposed as a method or an attribute"""
+        try:
+            value = getattr(item, name, False)
+            return bool(value() if callable(value) else value)
+        except Exception:
+            return False
+
+    def _update_pool_metrics(self) -> Dict[str, int]:
+        connections = self._pool_connections()
+        current = {id(connection) for connection in connections}
+        opened = len(current - self._known_connections)
+        if opened:
+            self.connections_opened += opened
+            LLM_HTTP_CONNECTIONS_OPENED.inc(opened)
+        self._known_connections = current
+
+        idle = sum(1 for connection in connections if self._flag(connection, "is_idle"))
+        LLM_HTTP_CONNECTIONS.labels(state="idle").set(idle)
+        LLM_HTTP_CONNECTIONS.labels(state="active").set(len(connections) - idle)
+        return {"connections": len(connections), "idle": idle, "active": len(connections) - idle}
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool occupancy and reuse counters for sizing the pool"""
+        try:
+            requests = list(getattr(self._pool(), "_requests"))
+        except Exception:
+            requests = None
+        queued = sum(1 for request in requests if self._flag(request, "is_queued")) if requests is not None else None
+        return {
+            **self._update_pool_metrics(),
+            "queued_requests": queued,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "retries": self.retries,
+            "connections_opened": self.connections_opened,
+            "requests_per_connection": round(self.requests / self.connections_opened, 2) if self.connections_opened else None,
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+            "http2": self.http2
+        }
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def create_llm_http_transport(config: Config) -> RetryingTransport:
+    """Pooled keep-alive transport for the OpenAI API, configured from LLM_HTTP_* settings"""
+    http2 = config.llm_http2
+    if http2 and not _http2_available():
+        logger.warning("LLM_HTTP2 is enabled but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    limits = httpx.Limits(
+        max_connections=config.llm_http_max_connections,
+        max_keepalive_connections=config.llm_http_max_keepalive,
+        keepalive_expiry=config.llm_http_keepalive_expiry
+    )
+    return RetryingTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+        limits=limits,
+        http2=http2,
+        max_retries=config.llm_http_max_retries,
+        backoff_seconds=config.llm_http_retry_backoff_seconds,
+        max_backoff_seconds=config.llm_http_retry_max_backoff_seconds
+    )
+
+
+def create_llm_http_client(config: Config) -> httpx.AsyncClient:
+    """Pooled keep-alive client for the OpenAI API"""
+    return httpx.AsyncClient(transport=create_llm_http_transport(config), timeout=llm_http_timeout(config))
+
+
+def llm_http_timeout(config: Config) -> httpx.Timeout:
+    """Per-phase timeouts for LLM API requests"""
+    return httpx.Timeout(
+        config.llm_http_read_timeout,
+        connect=config.llm_http_connect_timeout,
+        pool=config.llm_http_pool_timeout
+    )
+
+
+_client: Optional[httpx.AsyncClient] = None
+# The shared client's transport, kept here because httpx does not expose it
+_transport: Optional[RetryingTransport] = None
+_client_pid: Optional[int] = None
+
+
+def get_llm_http_client() -> httpx.AsyncClient:
+    """The worker's shared LLM API client, created on first use
+
+    A client inherited from a parent process is never reused, since its
+    connections belong to the parent.
+    """
+    global _client, _transport, _client_pid
+    if _client is None or _client.is_closed or _client_pid != os.getpid():
+        config = Config()
+        _transport = create_llm_http_transport(config)
+        _client = httpx.AsyncClient(transport=_transport, timeout=llm_http_timeout(config))
+        _client_pid = os.getpid()
+        logger.info("Created pooled LLM HTTP client")
+    return _client
+
+
+def llm_http_stats() -> Optional[Dict[str, Any]]:
+    """Pool statistics of the shared client, or None before the first LLM call"""
+    if _client is None or _client.is_closed or _client_pid != os.getpid():
+        return None
+    return _transport.stats()
+
+
+async def close_llm_http_client() -> None:
+    """Close the shared client's connections, e.g. on worker shutdown"""
+    global _client, _transport
+    if _client is not None and _client_pid == os.getpid():
+        await _client.aclose()
+    _client = None
+    _transport = None
@@ -0,0 +1,128 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from rapidfuzz import fuzz, process
+from rapidfuzz.distance import OSA
+
+from com.mhire.app.services.helper_bot.faq_index import tokenize
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+
+
+# Politeness and hedging words that paraphrases add or drop without changing the question
+_FILLER_WORDS = frozenset({
+    "able", "am", "any", "app", "could", "hello", "hi", "just", "know", "like", "need",
+    "please", "possible", "should", "tell", "thanks", "there", "want", "way", "would",
+})
+
+
+# Prefixes that turn a word into its opposite: deactivate/activate, unsubscribe/subscribe
+_NEGATING_PREFIXES = ("anti", "dis", "non", "de", "il", "im", "in", "ir", "re", "un")
+
+# Candidate signatures checked term by term after the whole-signature similarity cutoff
+_CANDIDATES = 5
+
+
+def query_signature(query: str) -> str:
+    """Order-insensitive form of a query: its distinct search terms without filler words, sorted"""
+    terms = set(tokenize(query))
+    return " ".join(sorted(terms - _FILLER_WORDS or terms))
+
+
+def _allowed_edits(term: str) -> int:
+    """Typos tolerated in a term: none for short words, where one edit changes the word"""
+    if len(term) >= 8:
+        return 2
+    return 1 if len(term) >= 4 else 0
+
+
+def _same_term(a: str, b: str) -> bool:
+    """Whether two terms are the same word up to a small typo, but not a negated form"""
+    if a == b:
+        return True
+    shorter, longer = sorted((a, b), key=len)
+    for prefix in _NEGATING_PREFIXES:
+        if longer.startswith(prefix) and not shorter.startswith(prefix):
+            if OSA.distance(longer[len(prefix):], shorter) <= _allowed_edits(shorter):
+                return False
+    return OSA.distance(a, b) <= _allowed_edits(shorter)
+
+
+def terms_match(signature: str, candidate: str) -> bool:
+    """Whether two signatures have the same terms, each identical or a typo of the other"""
+    terms, candidate_terms = signature.split(), candidate.split()
+    if len(terms) != len(candidate_terms):
+        return False
+    unmatched = [term for term in candidate_terms if term not in terms]
+    for term in terms:
+        if term in candidate_terms:
+            continue
+        partner = next((other for other in unmatched if _same_term(term, other)), None)
+        if partner is None:
+            return False
+        unmatched.remove(partner)
+    return True
+
+
+def closest_signature(signature: str, candidates: Sequence[str], similarity: float) -> Optional[int]:
+    """Position of the most similar candidate whose terms all match, or None
+
+    Character similarity alone accepts negations ("account deactivate" scores 94 against
+    "account activate"), so candidates above the cutoff are checked term by term.
+    """
+    matches = process.extract(signature, candidates, scorer=fuzz.ratio, score_cutoff=similarity, limit=_CANDIDATES)
+    for candidate, _, position in matches:
+        if terms_match(signature, candidate):
+            return position
+    return None
+
+
+class PrecomputedAnswers:
+    """In-memory lookup of answers generated offline for frequent LLM-fallback questions
+
+    A query matches an entry when its signature is one of the entry's signatures, or
+    has the same terms as one of them up to small typos, for paraphrases not seen offline.
+    """
+
+    def __init__(self, similarity_threshold: float = 90.0):
+        self.similarity_threshold = similarity_threshold
+        self._entries: List[Dict[str, Any]] = []
+        self._exact: Dict[UserType, Dict[str, int]] = {user_type: {} for user_type in UserType}
+        self._signatures: Dict[UserType, List[str]] = {user_type: [] for user_type in UserType}
+        self._signature_entries: Dict[UserType, List[int]] = {user_type: [] for user_type in UserType}
+
+    def build(self, entries: Iterable[Dict[str, Any]]) -> "PrecomputedAnswers":
+        """Index entries with user_type, signatures and answer fields"""
+        for entry in entries:
+            try:
+                user_type = UserType(entry.get("user_type"))
+            except ValueError:
+                continue
+            if not entry.get("answer"):
+                continue
+            position = len(self._entries)
+            self._entries.append(entry)
+            for signature in entry.get("signatures") or []:
+                if signature and signature not in self._exact[user_type]:
+                    self._exact[user_type][signature] = position
+                    self._signatures[user_type].append(signature)
+                    self._signature_entries[user_type].append(position)
+        return self
+
+    def lookup(self, query: str, user_type: UserType) -> Optional[Dict[str, Any]]:
+        """Return the entry answering a query, or None"""
+        signature = query_signature(query)
+        if not signature:
+            return None
+
+        position = self._exact[user_type].get(signature)
+        if position is not None:
+            return self._entries[position]
+
+        if not self._signatures[user_type]:
+            return None
+        match = closest_signature(signature, self._signatures[user_type], self.similarity_threshold)
+        if match is None:
+            return None
+        return self._entries[self._signature_entries[user_type][match]]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,144 @@
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Rough characters per token for English text when no tokenizer is available
+_CHARS_PER_TOKEN = 4
+
+# Tokens reserved after the longest candidate answer, since the model may copy it verbatim
+_OUTPUT_TOKEN_MARGIN = 16
+
+# Candidates whose answer would have to be cut below this many tokens are left out
+_MIN_ANSWER_TOKENS = 24
+
+
+class TokenCounter:
+    """Counts and truncates text in model tokens
+
+    Uses tiktoken when it is installed and its encoding is available, otherwise a
+    character-based estimate that errs on the high side.
+    """
+
+    def __init__(self, model: Optional[str] = None):
+        self.model = model
+        self._encoding: Any = None
+        self._loaded = False
+
+    def _get_encoding(self) -> Any:
+        if not self._loaded:
+            self._loaded = True
+            try:
+                import tiktoken
+                try:
+                    self._encoding = tiktoken.encoding_for_model(self.model or "")
+                except KeyError:
+                    self._encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # Missing package or encoding files that cannot be downloaded
+                logger.warning(f"tiktoken unavailable, estimating token counts: {str(e)}")
+                self._encoding = None
+        return self._encoding
+
+    @property
+    def exact(self) -> bool:
+        return self._get_encoding() is not None
+
+    def count(self, text: str) -> int:
+        encoding = self._get_encoding()
+        if encoding is not None:
+            return len(encoding.encode(text))
+        return math.ceil(len(text) / _CHARS_PER_TOKEN)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to at most max_tokens, preferring to end on a sentence boundary"""
+        if self.count(text) <= max_tokens:
+            return text
+        if max_tokens <= 0:
+            return ""
+
+        encoding = self._get_encoding()
+        if encoding is not None:
+            # Leave one token for the ellipsis
+            head = encoding.decode(encoding.encode(text)[:max(max_tokens - 1, 0)])
+        else:
+            head = text[:max((max_tokens - 1) * _CHARS_PER_TOKEN, 0)]
+
+        # Drop a trailing partial sentence unless that would lose most of the text
+        sentence_end = max(head.rfind(". "), head.rfind("! "), head.rfind("? "), head.rfind("\n"))
+        if sentence_end >= len(head) * 0.6:
+            return head[:sentence_end + 1].rstrip() + " …"
+        return head.rstrip() + "…"
+
+
+@dataclass
+class BuiltPrompt:
+    """FAQ context for the LLM prompt and its token accounting"""
+    faq_context: str
+    prompt_tokens: int
+    max_output_tokens: int
+    candidates_included: int
+    candidates_truncated: int
+
+
+class PromptBuilder:
+    """Packs FAQ candidates into the prompt by relevance within an input-token budget"""
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        render_prompt: Callable[[str, str], str],
+        input_token_budget: int,
+        answer_max_tokens: int,
+        min_output_tokens: int,
+        max_output_tokens: int
+    ):
+        self.counter = counter
+        self.render_prompt = render_prompt
+        self.input_token_budget = input_token_budget
+        self.answer_max_tokens = answer_max_tokens
+        self.min_output_tokens = min_output_tokens
+        self.max_output_tokens = max(max_output_tokens, min_output_tokens)
+
+    def build(self, query: str, faq_results: List[Dict[str, Any]]) -> BuiltPrompt:
+        """Build the FAQ context for a query; faq_results must be ordered by relevance"""
+        header = "Available FAQ matches:\n" if faq_results else "No FAQ matches found."
+        base_tokens = self.counter.count(self.render_prompt(query, header))
+        remaining = self.input_token_budget - base_tokens
+
+        entries: List[str] = []
+        answer_tokens: List[int] = []
+        truncated = 0
+        for faq in faq_results:
+            score = faq.get("textScore", 0) or faq.get("score", 0)
+            frame = f"Question: {faq['question']}\nAnswer: \nScore: {score:.2f}\n\n"
+            frame_tokens = self.counter.count(frame)
+            answer_budget = min(self.answer_max_tokens, remaining - frame_tokens)
+            if answer_budget < _MIN_ANSWER_TOKENS:
+                break
+
+            answer = self.counter.truncate(faq["answer"], answer_budget)
+            if answer != faq["answer"]:
+                truncated += 1
+            entry = f"Question: {faq['question']}\nAnswer: {answer}\nScore: {score:.2f}\n\n"
+            entries.append(entry)
+            answer_tokens.append(self.counter.count(answer))
+            remaining -= self.counter.count(entry)
+
+        if faq_results and not entries:
+            header = "No FAQ matches found."
+        faq_context = header + "".join(entries)
+
+        # Room to repeat the longest included answer, within the configured bounds
+        wanted = max(answer_tokens, default=0) + _OUTPUT_TOKEN_MARGIN
+        max_output_tokens = min(max(wanted, self.min_output_tokens), self.max_output_tokens)
+
+        return BuiltPrompt(
+            faq_context=faq_context,
+            prompt_tokens=self.counter.count(self.render_prompt(query, faq_context)),
+            max_output_tokens=max_output_tokens,
+            candidates_included=len(entries),
+            candidates_truncated=truncated
+        )
@@ -0,0 +1,182 @@
+import hashlib
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from com.mhire.app.common.exceptions import ConfigurationError
+from com.mhire.app.config.config import Config
+from com.mhire.app.services.helper_bot.faq_index import normalize_text
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(query: str, user_type: UserType, faq_context: str) -> str:
+    """Build a cache key from the normalized query, user type and the FAQ context sent to the LLM"""
+    context_hash = hashlib.sha256(faq_context.encode("utf-8")).hexdigest()
+    raw = f"{user_type.value}\0{normalize_text(query)}\0{context_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ResponseCache(ABC):
+    """Cache of generated LLM answers"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the cached answer for a key, or None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str) -> None:
+        """Store an answer under a key"""
+
+    async def close(self) -> None:
+        """Release any resources held by the cache"""
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit and miss counters for this worker"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0
+        }
+
+
+class NullResponseCache(ResponseCache):
+    """Cache that never stores anything"""
+
+    async def get(self, key: str) -> Optional[str]:
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str) -> None:
+        return None
+
+
+class LocalResponseCache(ResponseCache):
+    """In-process LRU cache bounded by entry count and total answer size, with a TTL"""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._size_bytes = 0
+        # key -> (answer, expires_at, size in bytes)
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds, size)
+        self._size_bytes += size
+
+        while len(self._entries) > self.max_entries or self._size_bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._size_bytes -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **super().stats(),
+            "backend": "local",
+            "entries": len(self._entries),
+            "size_bytes": self._size_bytes,
+            "evictions": self.evictions
+        }
+
+
+class RedisResponseCache(ResponseCache):
+    """Redis-backed cache shared by all gunicorn workers
+
+    Entries expire by TTL; configure Redis with an LRU maxmemory-policy to bound memory.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float, prefix: str = "helper_bot:response:"):
+        super().__init__()
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise ConfigurationError("The redis package is required for the redis response cache")
+
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self.errors = 0
+        self._client = redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self._client.get(self.prefix + key)
+        except Exception as e:
+            # A cache outage should only cost a cache miss
+            self.errors += 1
+            logger.error(f"Response cache read failed: {str(e)}")
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str) -> None:
+        try:
+            await self._client.set(self.prefix + key, value, ex=max(int(self.ttl_seconds), 1))
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Response cache write failed: {str(e)}")
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**super().stats(), "backend": "redis", "errors": self.errors}
+
+
+def get_response_cache(config: Config) -> ResponseCache:
+    """Create the response cache selected by RESPONSE_CACHE_BACKEND"""
+    backend = config.response_cache_backend
+    if backend == "local":
+        return LocalResponseCache(
+            max_entries=config.response_cache_max_entries,
+            max_bytes=config.response_cache_max_bytes,
+            ttl_seconds=config.response_cache_ttl_seconds
+        )
+    if backend == "redis":
+        if not config.redis_url:
+            raise ConfigurationError("REDIS_URL is required for the redis response cache")
+        return RedisResponseCache(config.redis_url, ttl_seconds=config.response_cache_ttl_seconds)
+    if backend == "none":
+        return NullResponseCache()
+    raise ConfigurationError(f"Unknown response cache backend: {backend}")
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from com.mhire.app.common.metrics import MISS_PREDICTIONS, SPECULATIVE_HEAD_START, SPECULATIVE_LLM_CALLS
+from com.mhire.app.services.helper_bot.faq_index import normalize_text, tokenize
+from com.mhire.app.services.helper_bot.helper_bot_schema import ChatResponse, UserType
+
+# Weight of each new outcome in the per-bucket miss rates
+_LEARNING_RATE = 0.05
+
+# Recently missed queries remembered per worker
+_RECENT_MISSES = 2048
+
+# Queries longer than this many search terms are conversational rather than FAQ-like
+_LONG_QUERY_TERMS = 8
+
+
+@dataclass
+class MissPrediction:
+    """Predicted probability that the FAQ search finds no candidates for a query, and the features it came from"""
+    probability: float
+    bucket: Tuple[str, UserType]
+    repeat: bool = False
+
+
+class MissPredictor:
+    """Predicts FAQ misses from cheap query features and recent outcomes
+
+    A miss is a search that returns no FAQ candidates at all, the only case a
+    speculative answer, generated without FAQ context, can stand in for.
+
+    Queries are bucketed by how much of their vocabulary the FAQ index knows and by
+    length. Each bucket keeps an exponentially weighted miss rate learned from
+    outcomes, starting from a prior of one minus the vocabulary coverage. A query
+    that missed recently is predicted to miss again.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._rates: Dict[Tuple[str, UserType], float] = {}
+        self._recent_misses: "OrderedDict[Tuple[str, UserType], None]" = OrderedDict()
+        self.predictions = 0
+        self.correct = 0
+
+    @staticmethod
+    def _bucket(coverage: Optional[float], term_count: int, user_type: UserType) -> Tuple[str, UserType]:
+        if coverage is None:
+            band = "unknown"
+        elif coverage == 0:
+            band = "none"
+        elif coverage < 0.5:
+            band = "low"
+        elif coverage < 1:
+            band = "partial"
+        else:
+            band = "full"
+        length = "long" if term_count > _LONG_QUERY_TERMS else "short"
+        return f"{band}/{length}", user_type
+
+    def predict(self, query: str, user_type: UserType, coverage: Optional[float]) -> MissPrediction:
+        """Estimate the miss probability; coverage is None when no in-memory index is available"""
+        bucket = self._bucket(coverage, len(tokenize(query)), user_type)
+        if (normalize_text(query), user_type) in self._recent_misses:
+            return MissPrediction(probability=1.0, bucket=bucket, repeat=True)
+        prior = 0.5 if coverage is None else 1 - coverage
+        return MissPrediction(probability=self._rates.get(bucket, prior), bucket=bucket)
+
+    def should_speculate(self, prediction: MissPrediction) -> bool:
+        return prediction.probability >= self.threshold
+
+    def record(self, query: str, user_type: UserType, prediction: MissPrediction, missed: bool) -> None:
+        """Learn from the actual outcome of a predicted query"""
+        rate = self._rates.get(prediction.bucket, prediction.probability)
+        self._rates[prediction.bucket] = rate + _LEARNING_RATE * (float(missed) - rate)
+
+        key = (normalize_text(query), user_type)
+        if missed:
+            self._recent_misses[key] = None
+            self._recent_misses.move_to_end(key)
+            if len(self._recent_misses) > _RECENT_MISSES:
+                self._recent_misses.popitem(last=False)
+        else:
+            self._recent_misses.pop(key, None)
+
+        predicted = self.should_speculate(prediction)
+        self.predictions += 1
+        self.correct += predicted == missed
+        MISS_PREDICTIONS.labels(predicted="miss" if predicted else "hit", actual="miss" if missed else "hit").inc()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "predictions": self.predictions,
+            "accuracy": round(self.correct / self.predictions, 4) if self.predictions else None,
+            "miss_rates": {f"{user_type.value}:{band}": round(rate, 3) for (band, user_type), rate in self._rates.items()}
+        }
+
+
+class SpeculativeCall:
+    """An LLM answer generated while the FAQ search runs; used on a miss, cancelled otherwise"""
+
+    def __init__(
+        self,
+        task: "asyncio.Task[ChatResponse]",
+        stats: Dict[str, int],
+        deferred_metrics: Optional[List[Callable[[], None]]] = None
+    ):
+        self.task = task
+        self.started = time.monotonic()
+        self._stats = stats
+        # Prompt and cache metric updates of the call, applied only if its answer is used
+        self._deferred_metrics = deferred_metrics if deferred_metrics is not None else []
+        self._settled = False
+
+    async def result(self) -> ChatResponse:
+        """Use the speculative answer"""
+        self._settled = True
+        self._stats["used"] += 1
+        SPECULATIVE_LLM_CALLS.labels(outcome="used").inc()
+        SPECULATIVE_HEAD_START.observe(time.monotonic() - self.started)
+        response = await self.task
+        for update in self._deferred_metrics:
+            update()
+        return response
+
+    def discard(self, reason: str) -> None:
+        """Cancel the call and count it as wasted"""
+        if self._settled:
+            return
+        self._settled = True
+        outcome = f"wasted_{reason}"
+        self._stats[outcome] = self._stats.get(outcome, 0) + 1
+        SPECULATIVE_LLM_CALLS.labels(outcome=outcome).inc()
+        if self.task.done():
+            # Retrieve the outcome so a failed call is not reported as an unhandled task exception
+            if not self.task.cancelled():
+                self.task.exception()
+        else:
+            self.task.cancel()
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from com.mhire.app.services.helper_bot.embeddings import EmbeddingProvider
+from com.mhire.app.services.helper_bot.faq_index import FAQIndex
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+
+logger = logging.getLogger(__name__)
+
+
+def similarity_to_score(similarity: float, high: float, medium: float, low: float) -> float:
+    """Map a cosine similarity onto the legacy FAQ score bands (0.5 / 0.8 / 1.5 / 3.0)"""
+    if similarity >= high:
+        return 1.5 + 1.5 * min((similarity - high) / max(1.0 - high, 1e-6), 1.0)
+    if similarity >= medium:
+        return 0.8 + 0.7 * (similarity - medium) / max(high - medium, 1e-6)
+    if similarity >= low:
+        return 0.5 + 0.3 * (similarity - low) / max(medium - low, 1e-6)
+    return 0.0
+
+
+def _fingerprint(provider: EmbeddingProvider, questions: List[str]) -> str:
+    """Identify the embedded corpus so stale matrices on disk are rebuilt"""
+    digest = hashlib.sha256(f"{provider.name}:{provider.dimension}".encode("utf-8"))
+    for question in questions:
+        digest.update(b"\0")
+        digest.update(question.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _question_key(question: str) -> str:
+    """Identify one embedded question so its row can be reused when the corpus changes"""
+    return hashlib.sha256(question.encode("utf-8")).hexdigest()[:32]
+
+
+class VectorIndex:
+    """Per-user-type matrices of unit-normalized FAQ question embeddings"""
+
+    def __init__(self, matrices: Dict[str, np.ndarray], documents: Dict[str, List[Dict[str, Any]]]):
+        self._matrices = matrices
+        self._documents = documents
+
+    @classmethod
+    async def load_or_build(
+        cls,
+        faq_index: FAQIndex,
+        provider: EmbeddingProvider,
+        directory: str
+    ) -> "VectorIndex":
+        """Memory-map persisted embeddings, re-embedding only the changed questions of a stale user type"""
+        base = os.path.join(directory, provider.name)
+        os.makedirs(base, exist_ok=True)
+
+        matrices: Dict[str, np.ndarray] = {}
+        documents: Dict[str, List[Dict[str, Any]]] = {}
+        for user_type in UserType:
+            docs = faq_index.documents(user_type)
+            if not docs:
+                continue
+            questions = [doc["question"] for doc in docs]
+            fingerprint = _fingerprint(provider, questions)
+            matrix_path = os.path.join(base, f"{user_type.value}.npy")
+            meta_path = os.path.join(base, f"{user_type.value}.json")
+
+            matrix = cls._load_matrix(matrix_path, meta_path, fingerprint, len(docs))
+            if matrix is None:
+                embedded = await cls._embed(provider, questions, cls._previous_rows(matrix_path, meta_path, provider))
+                logger.info(f"Embedded {len(questions)} FAQ questions for user type {user_type.value}")
+                cls._save_matrix(matrix_path, meta_path, fingerprint, embedded, questions, provider.dimension)
+                matrix = np.load(matrix_path, mmap_mode="r")
+
+            matrices[user_type.value] = matrix
+            documents[user_type.value] = docs
+        return cls(matrices, documents)
+
+    @staticmethod
+    def _load_matrix(matrix_path: str, meta_path: str, fingerprint: str, count: int) -> Optional[np.ndarray]:
+        """Memory-map a persisted matrix if it matches the current corpus"""
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            if meta.get("fingerprint") != fingerprint:
+                return None
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.dtype != np.float32 or matrix.shape[0] != count:
+                return None
+            return matrix
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _previous_rows(matrix_path: str, meta_path: str, provider: EmbeddingProvider) -> Dict[str, np.ndarray]:
+        """Rows of the persisted matrix by question key, for reuse after the corpus changed"""
+        try:
+            with open(meta_path, "r", encoding="utf-8") as meta_file:
+                meta = json.load(meta_file)
+            keys = meta.get("questions")
+            if not keys or meta.get("dimension") != provider.dimension:
+                return {}
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.dtype != np.float32 or matrix.shape[0] != len(keys):
+                return {}
+            return {key: matrix[row] for row, key in enumerate(keys)}
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    async def _embed(provider: EmbeddingProvider, questions: List[str], previous: Dict[str, np.ndarray]) -> np.ndarray:
+        """Embedding matrix for the questions, embedding only those without a previous row"""
+        keys = [_question_key(question) for question in questions]
+        missing = [row for row, key in enumerate(keys) if key not in previous]
+        if len(missing) < len(questions):
+            logger.info(f"Reusing {len(questions) - len(missing)} FAQ question embeddings, embedding {len(missing)}")
+        embedded = await provider.embed_documents([questions[row] for row in missing]) if missing else None
+        matrix = np.empty((len(questions), provider.dimension), dtype=np.float32)
+        for row, key in enumerate(keys):
+            if key in previous:
+                matrix[row] = previous[key]
+        if embedded is not None:
+            matrix[missing] = embedded
+        return matrix
+
+    @staticmethod
+    def _save_matrix(
+        matrix_path: str,
+        meta_path: str,
+        fingerprint: str,
+        matrix: np.ndarray,
+        questions: List[str],
+        dimension: int
+    ) -> None:
+        """Persist a matrix atomically so concurrent readers never see a partial file"""
+        tmp_matrix = f"{matrix_path}.{os.getpid()}.tmp"
+        with open(tmp_matrix, "wb") as matrix_file:
+            np.save(matrix_file, np.ascontiguousarray(matrix, dtype=np.float32))
+        os.replace(tmp_matrix, matrix_path)
+
+        tmp_meta = f"{meta_path}.{os.getpid()}.tmp"
+        with open(tmp_meta, "w", encoding="utf-8") as meta_file:
+            json.dump({
+                "fingerprint": fingerprint,
+                "count": int(matrix.shape[0]),
+                "dimension": dimension,
+                "questions": [_question_key(question) for question in questions]
+            }, meta_file)
+        os.replace(tmp_meta, meta_path)
+
+    def search(self, query_vector: np.ndarray, user_type: UserType, limit: int = 3) -> List[Dict[str, Any]]:
+        """Return the top-k FAQ entries by cosine similarity as {**faq, "similarity": float}"""
+        matrix = self._matrices.get(user_type.value)
+        if matrix is None or matrix.shape[0] == 0:
+            return []
+
+        similarities = matrix @ query_vector.astype(np.float32, copy=False)
+        k = min(limit, similarities.shape[0])
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top], kind="stable")]
+        docs = self._documents[user_type.value]
+        return [{**docs[doc_id], "similarity": float(similarities[doc_id])} for doc_id in top]
@@ -0,0 +1,208 @@
+"""Local OpenAI-compatible server for exercising the real HTTP path without the OpenAI API
+
+Serves /v1/chat/completions (plain and streamed) and /v1/embeddings with configurable
+latency, token rate and injected transient failures, and counts the TCP connections
+it sees so connection reuse can be checked from /mock/stats.
+
+    python -m com.mhire.app.testing.mock_openai_server --port 8089 --latency 0.3
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1 OPENAI_API_KEY=test OPENAI_API_MODEL=mock ...
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+@dataclass
+class MockOpenAIState:
+    """Behaviour knobs and counters of a mock server"""
+    latency: float = 0.05
+    tokens_per_second: float = 500.0
+    response_tokens: int = 40
+    failure_rate: float = 0.0
+    failure_status: int = 503
+    fail_first: int = 0
+    requests: int = 0
+    failures: int = 0
+    connections: Set[Tuple[str, int]] = field(default_factory=set)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"requests": self.requests, "failures": self.failures, "connections": len(self.connections)}
+
+
+def _prompt_tokens(messages: List[Dict[str, Any]]) -> int:
+    return sum(len(str(message.get("content", "")).split()) for message in messages)
+
+
+def create_mock_openai_app(state: Optional[MockOpenAIState] = None) -> FastAPI:
+    """Build the mock API; pass a state to configure it and read its counters"""
+    state = state or MockOpenAIState()
+    app = FastAPI(title="Mock OpenAI API")
+    app.state.mock = state
+
+    def admit(request: Request) -> Optional[JSONResponse]:
+        """Count the request and return an injected failure, if any"""
+        state.requests += 1
+        if request.client is not None:
+            state.connections.add((request.client.host, request.client.port))
+        if state.fail_first > 0 or random.random() < state.failure_rate:
+            state.fail_first = max(state.fail_first - 1, 0)
+            state.failures += 1
+            return JSONResponse(
+                {"error": {"message": "Injected transient failure", "type": "server_error"}},
+                status_code=state.failure_status,
+                headers={"Retry-After": "0"}
+            )
+        return None
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        failure = admit(request)
+        if failure is not None:
+            return failure
+
+        body = await request.json()
+        max_tokens = body.get("max_completion_tokens") or body.get("max_tokens") or state.response_tokens
+        tokens = [f"word{i} " for i in range(min(state.response_tokens, max_tokens))]
+        usage = {
+            "prompt_tokens": _prompt_tokens(body.get("messages", [])),
+            "completion_tokens": len(tokens),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "mock")
+        await asyncio.sleep(state.latency)
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(tokens) / state.tokens_per_second)
+            return {
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                    "finish_reason": "stop"
+                }],
+                "usage": usage
+            }
+
+        include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+        async def events() -> AsyncIterator[str]:
+            def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None, **extra: Any) -> str:
+                payload = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                    **extra
+                }
+                return f"data: {json.dumps(payload)}\n\n"
+
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                await asyncio.sleep(1 / state.tokens_per_second)
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason="stop")
+            if include_usage:
+                payload = {"id": completion_id, "object": "chat.completion.chunk", "created": created,
+                           "model": model, "choices": [], "usage": usage}
+                yield f"data: {json.dumps(payload)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        failure = admit(request)
+        if failure is not None:
+            return failure
+
+        body = await request.json()
+        inputs = body.get("input", [])
+        inputs = [inputs] if isinstance(inputs, (str, int)) or (inputs and isinstance(inputs[0], int)) else inputs
+        dimension = body.get("dimensions") or 1536
+        await asyncio.sleep(state.latency)
+        data = []
+        for position, text in enumerate(inputs):
+            # Deterministic vectors so identical inputs embed identically
+            seed = int.from_bytes(hashlib.sha1(str(text).encode("utf-8")).digest()[:4], "little")
+            vector = np.random.default_rng(seed).standard_normal(dimension).astype(np.float32)
+            vector /= np.linalg.norm(vector)
+            data.append({"object": "embedding", "index": position, "embedding": vector.tolist()})
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "mock"),
+            "usage": {"prompt_tokens": len(inputs), "total_tokens": len(inputs)}
+        }
+
+    @app.get("/mock/stats")
+    async def stats():
+        return state.stats()
+
+    return app
+
+
+@asynccontextmanager
+async def serve_mock_openai(state: Optional[MockOpenAIState] = None, port: int = 0) -> AsyncIterator[str]:
+    """Run the mock server on the current event loop and yield its /v1 base URL"""
+    app = create_mock_openai_app(state)
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        host="127.0.0.1",
+        port=port,
+        log_level="warning",
+        timeout_keep_alive=75,
+        lifespan="off"
+    ))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://127.0.0.1:{bound_port}/v1"
+    finally:
+        server.should_exit = True
+        await task
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve a mock OpenAI-compatible API")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=0.3, help="Seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=50.0)
+    parser.add_argument("--response-tokens", type=int, default=40)
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of requests answered with --failure-status")
+    parser.add_argument("--failure-status", type=int, default=503)
+    args = parser.parse_args()
+
+    state = MockOpenAIState(
+        latency=args.latency,
+        tokens_per_second=args.tokens_per_second,
+        response_tokens=args.response_tokens,
+        failure_rate=args.failure_rate,
+        failure_status=args.failure_status
+    )
+    uvicorn.run(create_mock_openai_app(state), host="127.0.0.1", port=args.port, timeout_keep_alive=75)
+
+
+if __name__ == "__main__":
+    main()
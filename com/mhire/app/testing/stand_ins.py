@@ -0,0 +1,326 @@
+import asyncio
+import copy
+import random
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from bson import ObjectId
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# Local stand-ins for MongoDB and the OpenAI chat model, used by benchmarks and offline jobs.
+# They implement only the subset of the Motor and LangChain interfaces this app relies on.
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    """Evaluate equality, $ne, $in, $nin and $exists conditions on top-level fields"""
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict) and any(key.startswith("$") for key in condition):
+            for operator, operand in condition.items():
+                if operator == "$ne" and value == operand:
+                    return False
+                if operator == "$in" and value not in operand:
+                    return False
+                if operator == "$nin" and value in operand:
+                    return False
+                if operator == "$exists" and (field in document) != bool(operand):
+                    return False
+                if operator not in ("$ne", "$in", "$nin", "$exists"):
+                    raise NotImplementedError(f"Operator {operator} is not supported by the stand-in")
+        elif field.startswith("$"):
+            raise NotImplementedError(f"Operator {field} is not supported by the stand-in")
+        elif value != condition:
+            return False
+    return True
+
+
+def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Apply an inclusion projection on top-level fields"""
+    if not projection:
+        return copy.deepcopy(document)
+    included = {field for field, flag in projection.items() if flag and field != "_id"}
+    result = {field: copy.deepcopy(document[field]) for field in included if field in document}
+    if projection.get("_id", 1) and "_id" in document:
+        result["_id"] = document["_id"]
+    return result
+
+
+class InMemoryCursor:
+    """Cursor over a snapshot of matching documents"""
+
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self._documents = documents
+
+    def sort(self, *args: Any, **kwargs: Any) -> "InMemoryCursor":
+        return self
+
+    def limit(self, count: int) -> "InMemoryCursor":
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._documents if length is None else self._documents[:length]
+
+    def __aiter__(self) -> AsyncIterator[Dict[str, Any]]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Dict[str, Any]]:
+        for document in self._documents:
+            yield document
+
+
+class _WriteResult:
+    def __init__(self, **counts: int):
+        self.inserted_count = counts.get("inserted_count", 0)
+        self.upserted_count = counts.get("upserted_count", 0)
+        self.modified_count = counts.get("modified_count", 0)
+        self.matched_count = counts.get("matched_count", 0)
+        self.deleted_count = counts.get("deleted_count", 0)
+
+
+class InMemoryCollection:
+    """Motor-compatible collection backed by a list of documents"""
+
+    def __init__(self, name: str, latency: float = 0.0):
+        self.name = name
+        self.latency = latency
+        self.indexes: List[Any] = []
+        self._documents: List[Dict[str, Any]] = []
+
+    async def _round_trip(self) -> None:
+        # Simulated network latency; zero by default
+        await asyncio.sleep(self.latency)
+
+    def find(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> InMemoryCursor:
+        query = query or {}
+        return InMemoryCursor([_project(doc, projection) for doc in self._documents if _matches(doc, query)])
+
+    async def find_one(self, query: Optional[Dict[str, Any]] = None, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        await self._round_trip()
+        for document in self._documents:
+            if _matches(document, query or {}):
+                return _project(document, projection)
+        return None
+
+    async def insert_many(self, documents: Iterable[Dict[str, Any]]) -> _WriteResult:
+        await self._round_trip()
+        count = 0
+        for document in documents:
+            document.setdefault("_id", ObjectId())
+            self._documents.append(copy.deepcopy(document))
+            count += 1
+        return _WriteResult(inserted_count=count)
+
+    async def replace_one(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool = False) -> _WriteResult:
+        await self._round_trip()
+        return self._replace(query, replacement, upsert)
+
+    def _replace(self, query: Dict[str, Any], replacement: Dict[str, Any], upsert: bool) -> _WriteResult:
+        for position, document in enumerate(self._documents):
+            if _matches(document, query):
+                replacement = copy.deepcopy(replacement)
+                replacement["_id"] = document["_id"]
+                self._documents[position] = replacement
+                return _WriteResult(matched_count=1, modified_count=1)
+        if upsert:
+            replacement = copy.deepcopy(replacement)
+            replacement.setdefault("_id", query.get("_id", ObjectId()))
+            self._documents.append(replacement)
+            return _WriteResult(upserted_count=1)
+        return _WriteResult()
+
+    async def bulk_write(self, requests: List[Any], ordered: bool = True) -> _WriteResult:
+        """Apply ReplaceOne requests"""
+        await self._round_trip()
+        upserted = modified = 0
+        for request in requests:
+            result = self._replace(request._filter, request._doc, request._upsert)
+            upserted += result.upserted_count
+            modified += result.modified_count
+        return _WriteResult(upserted_count=upserted, modified_count=modified)
+
+    async def delete_many(self, query: Dict[str, Any]) -> _WriteResult:
+        await self._round_trip()
+        kept = [doc for doc in self._documents if not _matches(doc, query)]
+        deleted = len(self._documents) - len(kept)
+        self._documents = kept
+        return _WriteResult(deleted_count=deleted)
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        await self._round_trip()
+        return sum(1 for doc in self._documents if _matches(doc, query))
+
+    async def create_index(self, keys: Any, **kwargs: Any) -> str:
+        self.indexes.append((keys, kwargs))
+        return kwargs.get("name", str(keys))
+
+
+class InMemoryDatabase:
+    """Motor-compatible database holding in-memory collections"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._collections: Dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = InMemoryCollection(name, latency=self.latency)
+        return self._collections[name]
+
+    async def command(self, name: str, *args: Any, **kwargs: Any) -> Dict[str, Any]:
+        return {"ok": 1.0}
+
+
+class InMemoryMongoClient:
+    """Drop-in replacement for AsyncIOMotorClient that keeps all data in process"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._databases: Dict[str, InMemoryDatabase] = {}
+        self.admin = InMemoryDatabase()
+
+    def __getitem__(self, name: str) -> InMemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = InMemoryDatabase(latency=self.latency)
+        return self._databases[name]
+
+    def close(self) -> None:
+        return None
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with configurable time-to-first-token and token rate
+
+    Answers echo a fixed sentence sized to ``response_tokens`` words.
+    """
+
+    latency: float = 0.3
+    tokens_per_second: float = 50.0
+    response_tokens: int = 40
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def _answer_tokens(self, max_tokens: Optional[int] = None) -> List[str]:
+        count = self.response_tokens if max_tokens is None else min(self.response_tokens, max_tokens)
+        return [f"word{i} " for i in range(count)]
+
+    def _usage(self, messages: List[BaseMessage], completion_tokens: int) -> Dict[str, int]:
+        prompt_tokens = sum(len(str(message.content).split()) for message in messages)
+        return {
+            "input_tokens": prompt_tokens,
+            "output_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        raise NotImplementedError("FakeChatModel only supports async calls")
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> ChatResult:
+        self.calls += 1
+        tokens = self._answer_tokens(kwargs.get("max_tokens"))
+        await asyncio.sleep(self.latency + len(tokens) / self.tokens_per_second)
+        message = AIMessage(content="".join(tokens).strip(), usage_metadata=self._usage(messages, len(tokens)))
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        tokens = self._answer_tokens(kwargs.get("max_tokens"))
+        for position, token in enumerate(tokens):
+            await asyncio.sleep(1 / self.tokens_per_second)
+            usage = self._usage(messages, len(tokens)) if position == len(tokens) - 1 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+            if run_manager:
+                await run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+_WORDS = [
+    "account", "password", "payment", "invoice", "booking", "schedule", "engineer", "profile",
+    "address", "refund", "rating", "review", "warranty", "appliance", "repair", "install",
+    "cancel", "reschedule", "notification", "email", "phone", "document", "certificate", "tool",
+    "job", "quote", "deposit", "receipt", "report", "photo", "location", "availability",
+    "subscription", "discount", "voucher", "support", "chat", "language", "currency", "tax",
+]
+_VERBS = ["change", "update", "view", "add", "remove", "download", "share", "verify", "reset", "track"]
+
+
+def synthetic_faq_documents(size: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Generate nested FAQ documents with ``size`` questions spread over categories and user types"""
+    rng = random.Random(seed)
+    categories: Dict[str, List[Dict[str, Any]]] = {}
+    seen = set()
+    while len(seen) < size:
+        verb = rng.choice(_VERBS)
+        first, second = rng.sample(_WORDS, 2)
+        question = f"How do I {verb} my {first} {second}?"
+        if len(seen) >= len(_VERBS) * len(_WORDS) * (len(_WORDS) - 1):
+            question = f"{question} ({len(seen)})"
+        if question in seen:
+            continue
+        seen.add(question)
+        user_type = "customer" if len(seen) % 2 else "engineer"
+        answer = (
+            f"To {verb} your {first} {second}, open the {first} section in the app, "
+            f"choose {second} and follow the steps on screen."
+        )
+        categories.setdefault(first.title(), []).append({
+            "question_text": question,
+            "answer_text": answer,
+            "user_type": user_type
+        })
+    return [{
+        "name": "Synthetic FAQ",
+        "categories": [
+            {"category_name": name, "questions": questions}
+            for name, questions in sorted(categories.items())
+        ]
+    }]
+
+
+_FALLBACK_TOPICS = [
+    "pay with crypto", "book two engineers at once", "get an invoice in french",
+    "change the language of notifications", "use the app offline", "tip my engineer",
+    "split a payment", "transfer my warranty", "pause my subscription", "request a female engineer",
+    "book a repair for a rental property", "export my job history", "add a second address",
+    "get paid weekly", "join as a company", "see my engineer on a map",
+]
+_FALLBACK_OPENERS = ["Can I", "can i", "Is it possible to", "How can I", "Am I able to"]
+_FALLBACK_SUFFIXES = ["?", "", "??", " please?", " in the app?"]
+
+
+def synthetic_fallback_queries(count: int, seed: int = 7) -> List[Dict[str, str]]:
+    """Generate a query log of FAQ misses: a few popular topics asked many ways, and a long tail"""
+    rng = random.Random(seed)
+    # Zipf-like popularity so a handful of topics dominate, as in production logs
+    weights = [1 / (rank + 1) for rank in range(len(_FALLBACK_TOPICS))]
+    records = []
+    for _ in range(count):
+        user_type = rng.choice(["customer", "engineer"])
+        if rng.random() < 0.15:
+            # One-off questions that no precomputed answer should cover
+            words = rng.sample(_WORDS, 3)
+            records.append({"query": f"What about {' '.join(words)}?", "user_type": user_type})
+            continue
+        topic = rng.choices(_FALLBACK_TOPICS, weights=weights)[0]
+        query = f"{rng.choice(_FALLBACK_OPENERS)} {topic}{rng.choice(_FALLBACK_SUFFIXES)}"
+        records.append({"query": query, "user_type": user_type})
+    return records
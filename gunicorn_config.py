@@ -1,4 +1,29 @@
 # gunicorn_config.py
+import os
+import shutil
+
 bind = "0.0.0.0:8000"
 workers = 4
-worker_class = "uvicorn.workers.UvicornWorker"
\ No newline at end of file
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Fast-start mode: import the app once in the master so workers share it copy-on-write.
+# Connections and FAQ data are still created per worker during the app lifespan.
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+# Workers write Prometheus metrics to a shared directory so /metrics aggregates all of them.
+# It is reset here, before a preloaded app creates any metric files.
+prometheus_multiproc_dir = os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+
+
+def on_starting(server):
+    # A preloading master also imports the LLM stack so workers never load it themselves
+    if preload_app:
+        from com.mhire.app.services.helper_bot.helper_bot import import_llm_modules
+        import_llm_modules()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
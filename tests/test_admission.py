@@ -0,0 +1,35 @@
+import asyncio
+
+from com.mhire.app.services.helper_bot.admission import ConcurrencyLimiter
+
+
+def _limiter() -> ConcurrencyLimiter:
+    return ConcurrencyLimiter("test", max_concurrency=1, max_queue=4, retry_after=1)
+
+
+def test_timed_out_acquire_keeps_permits():
+    async def scenario():
+        limiter = _limiter()
+        assert await limiter.acquire()
+        assert not await limiter.acquire(timeout=0.01)
+        limiter.release()
+        assert await limiter.acquire(timeout=0.01)
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_as_permit_is_released_keeps_permits():
+    async def scenario():
+        limiter = _limiter()
+        assert await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire(timeout=1))
+        await asyncio.sleep(0)
+        # The release hands the permit to the waiter, which is cancelled before it resumes
+        limiter.release()
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+        assert limiter.waiting == 0 and limiter.active == 0
+        assert await limiter.acquire(timeout=0.01)
+
+    asyncio.run(scenario())
@@ -0,0 +1,55 @@
+import pytest
+
+from com.mhire.app.services.helper_bot.faq_index import FAQIndex
+from com.mhire.app.services.helper_bot.faq_snapshot import FAQSnapshot, publish_snapshot
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+
+# HelperBot._faq_response answers directly from the FAQ at or above this score
+HIGH_CONFIDENCE_SCORE = 1.5
+
+CORPUS = [
+    {"question": "How do I update my payment method?", "answer": "Open Settings > Payments.", "category": "Billing"},
+    {"question": "How do I cancel a booking?", "answer": "Open the booking and tap Cancel.", "category": "Bookings"},
+    {"question": "How do I reset my password?", "answer": "Use the Forgot password link.", "category": "Account"},
+]
+
+
+@pytest.fixture(params=["memory", "snapshot"])
+def index(request, tmp_path):
+    user_type = list(UserType)[0].value
+    built = FAQIndex.build({**faq, "user_type": user_type} for faq in CORPUS)
+    if request.param == "memory":
+        return built
+    version = publish_snapshot(built, str(tmp_path), keep=1)
+    return FAQSnapshot.open(str(tmp_path), version)
+
+
+@pytest.mark.parametrize("query", [
+    "payment crypto bitcoin wallet tip",
+    "cancel my subscription to the newsletter",
+])
+def test_partial_overlap_stays_below_high_confidence(index, query):
+    results = index.search(query, list(UserType)[0])
+    assert results
+    assert results[0]["score"] < HIGH_CONFIDENCE_SCORE
+
+
+@pytest.mark.parametrize("query", [
+    "update payment method",
+    "how can I cancel booking",
+])
+def test_full_overlap_keeps_high_confidence(index, query):
+    results = index.search(query, list(UserType)[0])
+    assert results[0]["score"] >= HIGH_CONFIDENCE_SCORE
+
+
+def test_snapshot_files_stay_inside_the_version_directory(tmp_path):
+    directory = tmp_path / "snapshot"
+    user_type = "../../escaped"
+    built = FAQIndex.build({**faq, "user_type": user_type} for faq in CORPUS)
+    version = publish_snapshot(built, str(directory), keep=1)
+
+    assert not list(tmp_path.glob("escaped*"))
+    assert all(path.parent == directory / version for path in (directory / version).rglob("*.npy"))
+    snapshot = FAQSnapshot.open(str(directory), version)
+    assert len(snapshot) == len(CORPUS)
@@ -0,0 +1,70 @@
+import asyncio
+import json
+
+import pytest
+
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.database.faq_ingest import ingest_faq_stream
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.testing.stand_ins import InMemoryMongoClient, synthetic_faq_documents
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+@pytest.fixture
+def seeded(monkeypatch):
+    """A DBManager over legacy multi-question FAQ documents, one with an invalid entry"""
+    docs = synthetic_faq_documents(30, seed=3)
+    docs[0]["categories"][0]["questions"].append({"question_text": "", "answer_text": "x", "user_type": "customer"})
+    mongo = InMemoryMongoClient()
+    asyncio.run(mongo["stand_in"]["faq"].insert_many(docs))
+    db_manager = DBManager(client=mongo)
+    monkeypatch.setattr(db_manager, "faq_collection", mongo["stand_in"]["faq"])
+    monkeypatch.setattr(db_manager, "faq_questions_collection", None)
+    question = docs[0]["categories"][0]["questions"][0]
+    record = {
+        "question": question["question_text"],
+        "answer": "EDITED",
+        "category": docs[0]["categories"][0]["category_name"],
+        "user_type": question["user_type"]
+    }
+    return db_manager, record
+
+
+def _legacy_count(db_manager):
+    return asyncio.run(db_manager.faq_collection.count_documents({"ingest_version": {"$exists": False}}))
+
+
+def test_ingest_leaves_legacy_documents_alone_by_default(seeded):
+    db_manager, record = seeded
+    before = _legacy_count(db_manager)
+    report = asyncio.run(ingest_faq_stream(db_manager, _chunks(json.dumps(record).encode())))
+    assert report["legacy_migration"] is None
+    assert _legacy_count(db_manager) == before
+
+
+def test_opt_in_migration_keeps_uploaded_answers(seeded):
+    db_manager, record = seeded
+    entries = len(asyncio.run(db_manager.load_faq_index()))
+
+    report = asyncio.run(ingest_faq_stream(db_manager, _chunks(json.dumps(record).encode()), migrate_legacy=True))
+
+    assert report["legacy_migration"]["kept_existing"] == 1
+    assert report["legacy_migration"]["kept_invalid"] == 1
+    # Only the document holding the invalid entry stays in the legacy shape
+    assert _legacy_count(db_manager) == 1
+    index = asyncio.run(db_manager.load_faq_index())
+    assert len(index) == entries
+    assert index.lookup(record["question"], UserType(record["user_type"]))["answer"] == "EDITED"
+
+
+def test_aborted_upload_does_not_migrate(seeded):
+    db_manager, record = seeded
+    before = _legacy_count(db_manager)
+    body = f"[{json.dumps(record)}, {{broken".encode()
+    report = asyncio.run(ingest_faq_stream(db_manager, _chunks(body), data_format="json", migrate_legacy=True))
+    assert not report["completed"]
+    assert report["legacy_migration"] is None
+    assert _legacy_count(db_manager) == before
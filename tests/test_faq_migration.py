@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from com.mhire.app.common.exceptions import ConfigurationError
+from com.mhire.app.database.db_manager import FAQ_DATA, DBManager
+from com.mhire.app.database.faq_migration import sync_faq_questions
+from com.mhire.app.testing.stand_ins import InMemoryMongoClient, synthetic_faq_documents
+
+
+@pytest.fixture
+def db_manager(monkeypatch):
+    """A DBManager over nested FAQ documents with an empty question collection"""
+    mongo = InMemoryMongoClient()
+    asyncio.run(mongo["stand_in"]["faq"].insert_many(synthetic_faq_documents(20, seed=5)))
+    manager = DBManager(client=mongo)
+    monkeypatch.setattr(manager, "faq_collection", mongo["stand_in"]["faq"])
+    monkeypatch.setattr(manager, "faq_questions_collection", mongo["stand_in"]["faq_questions"])
+    monkeypatch.setattr(manager, "data_versions_collection", mongo["stand_in"]["data_versions"])
+    return manager
+
+
+def test_sync_flattens_every_question(db_manager):
+    stats = asyncio.run(sync_faq_questions(db_manager, batch_size=7))
+
+    assert stats["documents"] == 1
+    assert stats["questions"] == stats["upserted"] == 20
+    questions = asyncio.run(db_manager.faq_questions_collection.find({}).to_list(None))
+    assert len(questions) == 20
+    assert {question["user_type"] for question in questions} == {"customer", "engineer"}
+    assert all(question["question_normalized"] for question in questions)
+    assert asyncio.run(db_manager.data_version(FAQ_DATA, fresh=True)) is not None
+
+
+def test_sync_removes_questions_gone_from_the_source(db_manager):
+    asyncio.run(sync_faq_questions(db_manager))
+    version = asyncio.run(db_manager.data_version(FAQ_DATA, fresh=True))
+
+    async def drop_first_category():
+        document = await db_manager.faq_collection.find_one({})
+        removed = len(document["categories"][0]["questions"])
+        document["categories"] = document["categories"][1:]
+        await db_manager.faq_collection.replace_one({"_id": document["_id"]}, document)
+        return removed
+
+    removed = asyncio.run(drop_first_category())
+    stats = asyncio.run(sync_faq_questions(db_manager))
+
+    assert stats["deleted"] == removed
+    assert stats["upserted"] == 0
+    assert asyncio.run(db_manager.faq_questions_collection.count_documents({})) == 20 - removed
+    assert asyncio.run(db_manager.data_version(FAQ_DATA, fresh=True)) != version
+
+
+def test_sync_requires_the_question_collection(db_manager, monkeypatch):
+    monkeypatch.setattr(db_manager, "faq_questions_collection", None)
+    with pytest.raises(ConfigurationError):
+        asyncio.run(sync_faq_questions(db_manager))
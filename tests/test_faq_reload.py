@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import pytest
+
+from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.database.faq_ingest import ingest_faq_stream
+from com.mhire.app.services.helper_bot.embeddings import HashingEmbeddingProvider
+from com.mhire.app.services.helper_bot.faq_index import FAQIndex
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.services.helper_bot.vector_index import VectorIndex
+from com.mhire.app.testing.stand_ins import InMemoryMongoClient, synthetic_faq_documents
+
+USER_TYPE = list(UserType)[0]
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+def _worker(mongo: InMemoryMongoClient) -> DBManager:
+    db_manager = DBManager(client=mongo)
+    db_manager.faq_collection = mongo["stand_in"]["faq"]
+    db_manager.faq_questions_collection = None
+    db_manager.data_versions_collection = mongo["stand_in"]["data_versions"]
+    return db_manager
+
+
+def test_memory_index_follows_changes_made_by_another_worker(monkeypatch):
+    config = Config()
+    monkeypatch.setattr(config, "faq_search_backend", "memory")
+    monkeypatch.setattr(config, "faq_search_mode", "lexical")
+    monkeypatch.setattr(config, "data_version_check_seconds", 0.0)
+
+    async def scenario():
+        mongo = InMemoryMongoClient()
+        await mongo["stand_in"]["faq"].insert_many(synthetic_faq_documents(10, seed=3))
+        serving, admin = _worker(mongo), _worker(mongo)
+        await serving.load_faq_index()
+
+        record = {"question": "Can I pay with vouchers?", "answer": "Yes.", "category": "Payment", "user_type": USER_TYPE.value}
+        await ingest_faq_stream(admin, _chunks(json.dumps(record).encode()))
+        assert (await serving.get_faq_index()).lookup(record["question"], USER_TYPE) is None
+
+        # The version check started a background rebuild; searches keep the old index until it lands
+        await serving._faq_reload
+        assert (await serving.get_faq_index()).lookup(record["question"], USER_TYPE)["answer"] == "Yes."
+        assert serving._faq_reload.done()
+
+    asyncio.run(scenario())
+
+
+class _CountingProvider(HashingEmbeddingProvider):
+    def __init__(self):
+        super().__init__(dimension=64)
+        self.embedded = 0
+
+    async def embed_documents(self, texts):
+        self.embedded += len(texts)
+        return await super().embed_documents(texts)
+
+
+@pytest.mark.parametrize("changed", [0, 1])
+def test_vector_index_embeds_only_changed_questions(tmp_path, changed):
+    records = [
+        {"question": f"How do I change setting {number}?", "answer": "In Settings.", "category": "Settings", "user_type": USER_TYPE.value}
+        for number in range(20)
+    ]
+
+    async def scenario():
+        provider = _CountingProvider()
+        await VectorIndex.load_or_build(FAQIndex.build(records), provider, str(tmp_path))
+        assert provider.embedded == len(records)
+
+        updated = records[:-1] + [{**records[-1], "question": "How do I delete my account?"}] if changed else records
+        provider.embedded = 0
+        index = await VectorIndex.load_or_build(FAQIndex.build(updated), provider, str(tmp_path))
+        assert provider.embedded == changed
+
+        fresh = await VectorIndex.load_or_build(FAQIndex.build(updated), _CountingProvider(), str(tmp_path / "fresh"))
+        query = await provider.embed_query(updated[-1]["question"])
+        assert index.search(query, USER_TYPE, 3) == fresh.search(query, USER_TYPE, 3)
+
+    asyncio.run(scenario())
@@ -0,0 +1,41 @@
+import asyncio
+import json
+
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.database.faq_ingest import ingest_faq_stream
+from com.mhire.app.services.helper_bot.faq_router import _validators
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.testing.stand_ins import InMemoryMongoClient, synthetic_faq_documents
+
+USER_TYPE = list(UserType)[0]
+
+
+async def _chunks(data: bytes):
+    yield data
+
+
+def _worker(mongo: InMemoryMongoClient) -> DBManager:
+    db_manager = DBManager(client=mongo)
+    db_manager.faq_collection = mongo["stand_in"]["faq"]
+    db_manager.faq_questions_collection = None
+    db_manager.data_versions_collection = mongo["stand_in"]["data_versions"]
+    return db_manager
+
+
+def test_last_modified_comes_from_the_data_not_the_build():
+    async def scenario():
+        mongo = InMemoryMongoClient()
+        await mongo["stand_in"]["faq"].insert_many(synthetic_faq_documents(10, seed=3))
+
+        first = await _worker(mongo).load_faq_index()
+        await asyncio.sleep(1.1)
+        # Another worker, or a restart, builds the same data later
+        second = await _worker(mongo).load_faq_index()
+        assert _validators(first) == _validators(second)
+
+        record = {"question": "Can I pay with vouchers?", "answer": "Yes.", "category": "Payment", "user_type": USER_TYPE.value}
+        await ingest_faq_stream(_worker(mongo), _chunks(json.dumps(record).encode()))
+        changed = await _worker(mongo).load_faq_index()
+        assert changed.built_at > first.built_at
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+import asyncio
+
+import httpx
+import pytest
+
+from com.mhire.app.services.helper_bot.llm_http import RetryingTransport
+
+
+class _FailingTransport(httpx.AsyncBaseTransport):
+    """Fails the first attempts with the given error, then answers"""
+
+    def __init__(self, error: Exception, failures: int):
+        self.error = error
+        self.failures = failures
+        self.attempts = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise self.error
+        return httpx.Response(200, request=request)
+
+
+def _retrying(transport: httpx.AsyncBaseTransport) -> RetryingTransport:
+    return RetryingTransport(
+        transport,
+        limits=httpx.Limits(max_connections=4),
+        http2=False,
+        max_retries=2,
+        backoff_seconds=0.0,
+        max_backoff_seconds=0.0
+    )
+
+
+def _post() -> httpx.Request:
+    return httpx.Request("POST", "https://api.openai.com/v1/chat/completions", json={"messages": []})
+
+
+def test_connect_errors_are_retried():
+    inner = _FailingTransport(httpx.ConnectError("refused"), failures=1)
+    response = asyncio.run(_retrying(inner).handle_async_request(_post()))
+    assert response.status_code == 200
+    assert inner.attempts == 2
+
+
+def test_errors_after_the_request_was_sent_are_not_retried():
+    # The API may already have accepted the completion, so a retry could bill it twice
+    inner = _FailingTransport(httpx.RemoteProtocolError("connection closed"), failures=1)
+    with pytest.raises(httpx.RemoteProtocolError):
+        asyncio.run(_retrying(inner).handle_async_request(_post()))
+    assert inner.attempts == 1
+
+
+def test_stats_without_pool_internals():
+    stats = _retrying(_FailingTransport(httpx.ConnectError("refused"), failures=0)).stats()
+    assert stats["connections"] == 0
+    assert stats["queued_requests"] is None
@@ -0,0 +1,60 @@
+import logging
+from typing import List
+
+from com.mhire.app.common.logging_config import RequestContextFilter, flush_sampled_records, start_request_context
+
+
+class _ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+def _logger(name: str, handler: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.propagate = False
+    logger.setLevel(logging.DEBUG)
+    return logger
+
+
+def test_slow_request_replays_records_below_the_log_level():
+    handler = _ListHandler()
+    handler.addFilter(RequestContextFilter({logging.DEBUG: 0.0}, level=logging.INFO))
+    logger = _logger("com.mhire.test_slow", handler)
+
+    start_request_context("slow")
+    logger.debug("FAQ #%d", 1)
+    logger.info("Query")
+    assert [record.getMessage() for record in handler.records] == ["Query"]
+
+    logger.warning("Slow request", extra={"slow_request": True})
+    flush_sampled_records()
+    assert [record.getMessage() for record in handler.records] == ["Query", "Slow request", "FAQ #1"]
+    assert all(record.request_id == "slow" for record in handler.records)
+
+
+def test_fast_request_drops_records_below_the_log_level():
+    handler = _ListHandler()
+    handler.addFilter(RequestContextFilter({}, level=logging.INFO))
+    logger = _logger("com.mhire.test_fast", handler)
+
+    start_request_context("fast")
+    logger.debug("FAQ #%d", 1)
+    start_request_context("next")
+    flush_sampled_records()
+    assert handler.records == []
+
+
+def test_slow_request_line_is_never_sampled_out():
+    handler = _ListHandler()
+    handler.addFilter(RequestContextFilter({logging.WARNING: 0.0}, level=logging.INFO))
+    logger = _logger("com.mhire.test_sampled", handler)
+
+    start_request_context("sampled")
+    logger.warning("Other warning")
+    logger.warning("Slow request", extra={"slow_request": True})
+    assert [record.getMessage() for record in handler.records] == ["Slow request"]
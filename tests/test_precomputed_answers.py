@@ -0,0 +1,31 @@
+import pytest
+
+from com.mhire.app.services.helper_bot.answer_precompute import cluster_queries
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.services.helper_bot.precomputed_answers import PrecomputedAnswers, query_signature
+
+USER_TYPE = list(UserType)[0]
+
+
+@pytest.fixture
+def answers():
+    return PrecomputedAnswers(similarity_threshold=90).build([
+        {"user_type": USER_TYPE.value, "answer": "Activate it in Settings.", "signatures": [query_signature("activate account")]},
+        {"user_type": USER_TYPE.value, "answer": "Tap Subscribe.", "signatures": [query_signature("newsletter subscribe")]},
+    ])
+
+
+@pytest.mark.parametrize("query", ["How do I deactivate my account?", "unsubscribe from the newsletter"])
+def test_negated_query_does_not_reuse_answer(answers, query):
+    assert answers.lookup(query, USER_TYPE) is None
+
+
+@pytest.mark.parametrize("query", ["how to activte my account", "subscribe to the newsleter please"])
+def test_typo_reuses_answer(answers, query):
+    assert answers.lookup(query, USER_TYPE) is not None
+
+
+def test_negated_queries_get_their_own_cluster():
+    queries = [("activate my account", USER_TYPE)] * 3 + [("deactivate my account", USER_TYPE)]
+    leaders = {cluster.leader for cluster in cluster_queries(queries, similarity=90)}
+    assert leaders == {"account activate", "account deactivate"}
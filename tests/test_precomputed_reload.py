@@ -0,0 +1,58 @@
+import asyncio
+
+from com.mhire.app.config.config import Config
+from com.mhire.app.database.db_manager import DBManager
+from com.mhire.app.services.helper_bot.answer_precompute import write_precomputed_answers
+from com.mhire.app.services.helper_bot.helper_bot import HelperBot
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.services.helper_bot.precomputed_answers import query_signature
+from com.mhire.app.services.helper_bot.response_cache import NullResponseCache
+from com.mhire.app.testing.stand_ins import FakeChatModel, InMemoryMongoClient, synthetic_faq_documents
+
+USER_TYPE = list(UserType)[0]
+QUERY = "can a zqx vlorp repair my kestrel"
+
+
+def _db_manager(mongo: InMemoryMongoClient) -> DBManager:
+    db_manager = DBManager(client=mongo)
+    db_manager.faq_collection = mongo["stand_in"]["faq"]
+    db_manager.faq_questions_collection = None
+    db_manager.precomputed_answers_collection = mongo["stand_in"]["precomputed_answers"]
+    db_manager.data_versions_collection = mongo["stand_in"]["data_versions"]
+    return db_manager
+
+
+def test_serving_worker_picks_up_newly_precomputed_answers(monkeypatch):
+    config = Config()
+    monkeypatch.setattr(config, "faq_search_backend", "memory")
+    monkeypatch.setattr(config, "faq_search_mode", "lexical")
+    monkeypatch.setattr(config, "speculative_llm", False)
+    monkeypatch.setattr(config, "data_version_check_seconds", 0.0)
+
+    async def scenario():
+        mongo = InMemoryMongoClient()
+        await mongo["stand_in"]["faq"].insert_many(synthetic_faq_documents(10, seed=3))
+        bot = HelperBot(
+            db_manager=_db_manager(mongo),
+            response_cache=NullResponseCache(),
+            llm=FakeChatModel(latency=0.01, tokens_per_second=10000)
+        )
+        await bot.startup()
+        assert (await bot.get_response(QUERY, USER_TYPE)).source == "gpt"
+
+        # The offline job runs in its own process with its own connection
+        await write_precomputed_answers(_db_manager(mongo), [{
+            "_id": "entry-1",
+            "user_type": USER_TYPE.value,
+            "signatures": [query_signature(QUERY)],
+            "answer": "Precomputed.",
+            "representative": QUERY
+        }])
+
+        await bot.get_response(QUERY, USER_TYPE)
+        await bot._precomputed_reload
+        response = await bot.get_response(QUERY, USER_TYPE)
+        assert response.source == "precomputed" and response.message == "Precomputed."
+        await bot.close()
+
+    asyncio.run(scenario())
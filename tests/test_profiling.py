@@ -0,0 +1,65 @@
+import asyncio
+
+from starlette.requests import Request
+from starlette.responses import StreamingResponse
+
+from com.mhire.app.common import profiling
+from com.mhire.app.config.config import Config
+from com.mhire.app.main import profile_requests
+
+
+def _request() -> Request:
+    return Request({
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/chat/stream",
+        "query_string": b"",
+        "headers": [(profiling.PROFILE_HEADER.lower().encode("latin-1"), b"secret")]
+    })
+
+
+def test_cpu_profile_stops_when_handler_returns(monkeypatch, tmp_path):
+    config = Config()
+    monkeypatch.setattr(config, "admin_api_token", "secret")
+    monkeypatch.setattr(config, "profile_cpu", True)
+    monkeypatch.setattr(config, "profile_dir", str(tmp_path))
+
+    async def call_next(request):
+        async def body():
+            yield b"answer"
+        return StreamingResponse(body())
+
+    async def scenario():
+        response = await profile_requests(_request(), call_next)
+        # The client went away before the body was sent
+        assert "X-Profile-ID" in response.headers
+        assert profiling._cpu_profiler_lock.acquire(blocking=False)
+        profiling._cpu_profiler_lock.release()
+
+        # The body still saves the profile with the CPU time of the handler
+        chunks = [chunk async for chunk in response.body_iterator]
+        assert chunks == [b"answer"]
+        saved = profiling.get_profile_store().load(response.headers["X-Profile-ID"])
+        assert saved["cpu"] is not None
+
+    asyncio.run(scenario())
+
+
+def test_cpu_profile_stops_when_handler_fails(monkeypatch, tmp_path):
+    config = Config()
+    monkeypatch.setattr(config, "admin_api_token", "secret")
+    monkeypatch.setattr(config, "profile_cpu", True)
+    monkeypatch.setattr(config, "profile_dir", str(tmp_path))
+
+    async def call_next(request):
+        raise RuntimeError("handler failed")
+
+    async def scenario():
+        try:
+            await profile_requests(_request(), call_next)
+        except RuntimeError:
+            pass
+        assert profiling._cpu_profiler_lock.acquire(blocking=False)
+        profiling._cpu_profiler_lock.release()
+
+    asyncio.run(scenario())
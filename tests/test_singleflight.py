@@ -0,0 +1,46 @@
+import asyncio
+
+from com.mhire.app.services.helper_bot.singleflight import SingleFlight
+
+
+def test_caller_after_last_waiter_cancelled_gets_fresh_call():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def work():
+            calls.append(len(calls))
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                # Cleanup keeps the cancelled call in flight for a moment
+                await asyncio.sleep(0.01)
+                raise
+            return len(calls)
+
+        first = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        # The cancelled call has not finished yet when the second caller arrives
+        second = await flight.do("key", work)
+        assert first.cancelled()
+        assert second == 2
+        assert flight.stats() == {"executed": 2, "coalesced": 0, "in_flight": 0}
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_callers_share_one_call():
+    async def scenario():
+        flight = SingleFlight()
+
+        async def work():
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(3)))
+        assert results == ["answer"] * 3
+        assert flight.stats()["executed"] == 1 and flight.stats()["coalesced"] == 2
+
+    asyncio.run(scenario())
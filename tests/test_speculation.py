@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from prometheus_client import REGISTRY
+
+from com.mhire.app.config.config import Config
+from com.mhire.app.services.helper_bot.helper_bot import HelperBot
+from com.mhire.app.services.helper_bot.helper_bot_schema import UserType
+from com.mhire.app.services.helper_bot.response_cache import NullResponseCache
+from com.mhire.app.testing.stand_ins import FakeChatModel
+
+USER_TYPE = list(UserType)[0]
+
+
+class _SlowSearch:
+    """Search backend returning fixed candidates after a delay"""
+
+    precomputed_answers_collection = None
+
+    def __init__(self, results):
+        self.results = results
+
+    def term_coverage(self, query, user_type):
+        return 0.0
+
+    async def search_faq(self, query, user_type):
+        await asyncio.sleep(0.05)
+        return self.results
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def speculative_config(monkeypatch):
+    config = Config()
+    monkeypatch.setattr(config, "speculative_llm", True)
+    monkeypatch.setattr(config, "speculative_llm_threshold", 0.5)
+
+
+def _bot(results):
+    return HelperBot(
+        db_manager=_SlowSearch(results),
+        response_cache=NullResponseCache(),
+        llm=FakeChatModel(latency=0.01, tokens_per_second=10000)
+    )
+
+
+def test_weak_match_discards_speculation_without_counting_it(speculative_config):
+    bot = _bot([{"question": "How do I pay?", "answer": "With a card.", "score": 0.2}])
+    prompts = _sample("helper_bot_llm_prompt_tokens_estimated_count")
+    cache_misses = _sample("helper_bot_response_cache_requests_total", result="miss")
+
+    response = asyncio.run(bot.get_response("zqx vlorp kestrel", USER_TYPE))
+
+    assert response.source == "gpt"
+    assert bot.speculation_counts["wasted_faq_context"] == 1
+    # Only the real call, built with the FAQ candidates, is counted
+    assert _sample("helper_bot_llm_prompt_tokens_estimated_count") == prompts + 1
+    assert _sample("helper_bot_response_cache_requests_total", result="miss") == cache_misses + 1
+    # A weak match is not an empty result, so the predictor stops speculating on it
+    assert bot.miss_predictor.predict("zqx vlorp kestrel", USER_TYPE, 0.0).probability < 1.0
+
+
+def test_empty_result_uses_speculation_and_counts_it_once(speculative_config):
+    bot = _bot([])
+    prompts = _sample("helper_bot_llm_prompt_tokens_estimated_count")
+
+    response = asyncio.run(bot.get_response("zqx vlorp kestrel", USER_TYPE))
+
+    assert response.source == "gpt"
+    assert bot.speculation_counts["used"] == 1
+    assert bot.llm.calls == 1
+    assert _sample("helper_bot_llm_prompt_tokens_estimated_count") == prompts + 1
+    assert bot.miss_predictor.predict("zqx vlorp kestrel", USER_TYPE, 0.0).repeat